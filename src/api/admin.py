@@ -1,8 +1,105 @@
+import datetime
+
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+from .busqueda import MAX_RESULTADOS, buscar_clientes
 from .models import Cliente, Empleado, Servicio, Producto, Turno
-# Register your models here.
-admin.site.register(Cliente)
-admin.site.register(Empleado)
-admin.site.register(Servicio)
-admin.site.register(Producto)
-admin.site.register(Turno)
+
+# Hasta donde cuenta el paginador del admin de turnos: mas alla las paginas no se numeran
+MAX_CONTEO_TURNOS = 10000
+
+
+class PaginadorAcotado(Paginator):
+    """Cuenta a lo sumo MAX_CONTEO_TURNOS filas, en lugar de un COUNT(*) de toda la tabla."""
+
+    @cached_property
+    def count(self):
+        return self.object_list.order_by()[:MAX_CONTEO_TURNOS].count()
+
+
+def _truncar(fecha, kind):
+    if kind == 'year':
+        return datetime.date(fecha.year, 1, 1)
+    if kind == 'month':
+        return datetime.date(fecha.year, fecha.month, 1)
+    return fecha
+
+
+class FechasPorIndice(QuerySet):
+    """
+    Para el date_hierarchy: las fechas distintas salen del indice (fecha, hora) y se agrupan por
+    anio o mes en Python, en lugar de truncar la fecha de cada turno en la base.
+    """
+
+    def dates(self, field_name, kind, order='ASC'):
+        fechas = self.order_by().values_list(field_name, flat=True).distinct()
+        return sorted({_truncar(fecha, kind) for fecha in fechas}, reverse=order == 'DESC')
+
+
+@admin.register(Servicio)
+class ServicioAdmin(admin.ModelAdmin):
+    list_display = ('nombre', 'updated_at')
+    search_fields = ('^nombre',)
+    ordering = ('nombre',)
+
+
+@admin.register(Producto)
+class ProductoAdmin(admin.ModelAdmin):
+    list_display = ('nombre', 'servicio', 'precio')
+    list_select_related = ('servicio',)
+    autocomplete_fields = ('servicio',)
+    search_fields = ('^nombre',)
+    ordering = ('nombre',)
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # __str__ usa el servicio: tambien en el autocompletado y en el formulario
+        return super().get_queryset(request).select_related('servicio')
+
+
+@admin.register(Cliente)
+class ClienteAdmin(admin.ModelAdmin):
+    list_display = ('nro_socio', 'nombre', 'apellido', 'usuario', 'email', 'celular')
+    search_fields = ('nombre', 'apellido', 'usuario', 'email', 'celular', 'nro_socio')
+    ordering = ('nro_socio',)
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        # La misma busqueda por terminos normalizados que /clientes/buscar/ (busqueda.py)
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(id__in=buscar_clientes(search_term, limite=MAX_RESULTADOS)), False
+
+
+@admin.register(Empleado)
+class EmpleadoAdmin(admin.ModelAdmin):
+    list_display = ('legajo', 'nombre', 'apellido', 'usuario', 'servicio')
+    list_select_related = ('servicio',)
+    autocomplete_fields = ('servicio',)
+    search_fields = ('=legajo', '^usuario', '^email')
+    ordering = ('legajo',)
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('servicio')
+
+
+@admin.register(Turno)
+class TurnoAdmin(admin.ModelAdmin):
+    list_display = ('fecha', 'hora', 'cliente', 'empleado', 'producto')
+    list_select_related = ('cliente', 'empleado__servicio', 'producto__servicio')
+    autocomplete_fields = ('cliente', 'empleado', 'producto')
+    date_hierarchy = 'fecha'
+    # (fecha, hora, id) descendente recorre turno_fecha_hora_idx; ordenar por otra columna
+    # obligaria a ordenar toda la tabla
+    ordering = ('-fecha', '-hora')
+    sortable_by = ()
+    paginator = PaginadorAcotado
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return FechasPorIndice(self.model, query=queryset.query, using=queryset.db)
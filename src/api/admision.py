@@ -0,0 +1,252 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from inspect import iscoroutinefunction
+
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+from rest_framework.throttling import BaseThrottle
+
+from .replicas import METODOS_LECTURA
+
+# Rutas que no se limitan: el monitoreo tiene que responder justamente cuando hay saturacion
+SIN_LIMITE = ('metrics',)
+
+
+def tipo_de(metodo):
+    return 'lectura' if metodo in METODOS_LECTURA else 'escritura'
+
+
+def clase_de(ruta):
+    """Clase de endpoint: el primer segmento de la ruta si esta en ADMISION_CLASES, si no 'otras'."""
+    segmento = ruta.strip('/').split('/', 1)[0]
+    if segmento in SIN_LIMITE:
+        return None
+    return segmento if segmento in settings.ADMISION_CLASES else 'otras'
+
+
+def _resolver(aviso):
+    if not aviso.done():
+        aviso.set_result(True)
+
+
+class Compuerta:
+    """
+    Deja pasar hasta `limite` peticiones a la vez. Las que sobran esperan en orden de llegada
+    hasta `espera` segundos, con a lo sumo `cola` esperando; al salir una peticion su lugar pasa
+    directo a la primera de la cola. Sirve a hilos (WSGI) y a corrutinas (ASGI) del mismo proceso.
+    """
+
+    def __init__(self, limite, cola, espera):
+        self.limite = limite
+        self.cola = cola
+        self.espera = espera
+        self.lock = threading.Lock()
+        self.en_curso = 0
+        self.esperando = deque()
+        self.admitidas = 0
+        self.rechazadas = 0
+
+    def _intentar(self, aviso):
+        """True si entra, False si la cola esta llena; None si quedo encolado con `aviso`."""
+        with self.lock:
+            if self.en_curso < self.limite and not self.esperando:
+                self.en_curso += 1
+                self.admitidas += 1
+                return True
+            if len(self.esperando) >= self.cola:
+                self.rechazadas += 1
+                return False
+            self.esperando.append(aviso)
+            return None
+
+    def _abandonar(self, aviso):
+        """Saca `aviso` de la cola. True si no estaba porque ya le habian pasado un lugar."""
+        with self.lock:
+            try:
+                self.esperando.remove(aviso)
+            except ValueError:
+                return True
+            self.rechazadas += 1
+            return False
+
+    def entrar(self):
+        aviso = threading.Event()
+        admitida = self._intentar(aviso)
+        if admitida is not None:
+            return admitida
+        return aviso.wait(self.espera) or self._abandonar(aviso)
+
+    async def aentrar(self):
+        aviso = asyncio.get_running_loop().create_future()
+        admitida = self._intentar(aviso)
+        if admitida is not None:
+            return admitida
+        try:
+            await asyncio.wait_for(asyncio.shield(aviso), self.espera)
+            return True
+        except asyncio.TimeoutError:
+            return self._abandonar(aviso)
+        except asyncio.CancelledError:
+            if self._abandonar(aviso):
+                self.salir()
+            raise
+
+    def salir(self):
+        with self.lock:
+            if not self.esperando:
+                self.en_curso -= 1
+                return
+            aviso = self.esperando.popleft()
+            self.admitidas += 1
+        if isinstance(aviso, threading.Event):
+            aviso.set()
+        else:
+            aviso.get_loop().call_soon_threadsafe(_resolver, aviso)
+
+
+class Compuertas:
+    """Una Compuerta por (clase de endpoint, lectura o escritura), con los limites de settings."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.compuertas = {}
+        self.cubetas_rechazadas = {'lectura': 0, 'escritura': 0}
+
+    def obtener(self, clase, tipo):
+        compuerta = self.compuertas.get((clase, tipo))
+        if compuerta is None:
+            with self.lock:
+                compuerta = self.compuertas.get((clase, tipo))
+                if compuerta is None:
+                    limite = settings.ADMISION_CONCURRENCIA_POR_CLASE.get(clase, {}).get(
+                        tipo, settings.ADMISION_CONCURRENCIA[tipo])
+                    compuerta = Compuerta(limite, settings.ADMISION_COLA, settings.ADMISION_ESPERA)
+                    self.compuertas[(clase, tipo)] = compuerta
+        return compuerta
+
+    def rechazo_de_cubeta(self, tipo):
+        with self.lock:
+            self.cubetas_rechazadas[tipo] += 1
+
+    def limpiar(self):
+        with self.lock:
+            self.compuertas.clear()
+            self.cubetas_rechazadas = dict.fromkeys(self.cubetas_rechazadas, 0)
+
+    def exportar(self):
+        """Texto en formato de exposicion de Prometheus, para sumar al de metricas.registro."""
+        with self.lock:
+            compuertas = sorted(self.compuertas.items())
+            cubetas = sorted(self.cubetas_rechazadas.items())
+        lineas = []
+        for nombre, tipo_metrica, ayuda, valor in (
+            ('api_admision_en_curso', 'gauge', 'Peticiones en curso.', lambda c: c.en_curso),
+            ('api_admision_cola', 'gauge', 'Peticiones esperando lugar.', lambda c: len(c.esperando)),
+            ('api_admision_admitidas_total', 'counter', 'Peticiones admitidas.', lambda c: c.admitidas),
+            ('api_admision_rechazadas_total', 'counter', 'Peticiones rechazadas con 503.', lambda c: c.rechazadas),
+        ):
+            lineas.append(f'# HELP {nombre} {ayuda}')
+            lineas.append(f'# TYPE {nombre} {tipo_metrica}')
+            for (clase, tipo), compuerta in compuertas:
+                lineas.append(f'{nombre}{{clase="{clase}",tipo="{tipo}"}} {valor(compuerta)}')
+        lineas.append('# HELP api_cubeta_rechazadas_total Peticiones rechazadas con 429 por la cubeta del usuario.')
+        lineas.append('# TYPE api_cubeta_rechazadas_total counter')
+        for tipo, cantidad in cubetas:
+            lineas.append(f'api_cubeta_rechazadas_total{{tipo="{tipo}"}} {cantidad}')
+        return '\n'.join(lineas) + '\n'
+
+
+compuertas = Compuertas()
+
+
+def saturado():
+    respuesta = JsonResponse({'error': 'El servidor esta saturado, reintente en unos segundos.'}, status=503)
+    respuesta['Retry-After'] = str(max(1, math.ceil(settings.ADMISION_ESPERA)))
+    return respuesta
+
+
+class AdmisionMiddleware:
+    """
+    Limita las peticiones simultaneas por clase de endpoint (primer segmento de la ruta), con
+    lecturas y escrituras por separado, para que una rafaga no agote las conexiones de la base.
+    Las que exceden ADMISION_CONCURRENCIA esperan hasta ADMISION_ESPERA segundos y despues
+    reciben 503 con Retry-After. Los limites son por proceso.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.ADMISION_HABILITADA:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        compuerta = self.compuerta(request)
+        if compuerta is None:
+            return self.get_response(request)
+        if not compuerta.entrar():
+            return saturado()
+        try:
+            return self.get_response(request)
+        finally:
+            compuerta.salir()
+
+    async def __acall__(self, request):
+        compuerta = self.compuerta(request)
+        if compuerta is None:
+            return await self.get_response(request)
+        if not await compuerta.aentrar():
+            return saturado()
+        try:
+            return await self.get_response(request)
+        finally:
+            compuerta.salir()
+
+    @staticmethod
+    def compuerta(request):
+        clase = clase_de(request.path_info)
+        return None if clase is None else compuertas.obtener(clase, tipo_de(request.method))
+
+
+class CubetaPorUsuario(BaseThrottle):
+    """
+    Token bucket por usuario (o por IP sin autenticar), con lecturas y escrituras por separado,
+    guardado en la cache configurada: ADMISION_CUBETA[tipo] = (capacidad, tokens por segundo).
+    Como el throttling de DRF, lee y escribe sin bloqueo, asi que con varios procesos
+    concurrentes puede dejar pasar algun pedido de mas.
+    """
+
+    def allow_request(self, request, view):
+        tipo = tipo_de(request.method)
+        tasa = (settings.ADMISION_CUBETA or {}).get(tipo)
+        if not tasa:
+            return True
+        capacidad, por_segundo = tasa
+        usuario = request.user.pk if request.user and request.user.is_authenticated else self.get_ident(request)
+        clave = f'cubeta:{tipo}:{usuario}'
+        ahora = time.time()
+        tokens, instante = cache.get(clave) or (capacidad, ahora)
+        tokens = min(capacidad, tokens + (ahora - instante) * por_segundo)
+        # Pasado este tiempo la cubeta estaria llena de nuevo: la entrada puede vencer
+        vencimiento = math.ceil(capacidad / por_segundo)
+        if tokens < 1:
+            cache.set(clave, (tokens, ahora), vencimiento)
+            self.espera = (1 - tokens) / por_segundo
+            compuertas.rechazo_de_cubeta(tipo)
+            return False
+        cache.set(clave, (tokens - 1, ahora), vencimiento)
+        return True
+
+    def wait(self):
+        return self.espera
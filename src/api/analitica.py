@@ -0,0 +1,166 @@
+import datetime
+from collections import Counter
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+
+from .disponibilidad import SLOTS
+from .models import Empleado, Producto, ResumenDiario, Turno
+
+# Campos de Producto con el id y el nombre de cada grupo de ingresos()
+AGRUPACIONES = {
+    'servicio': ('servicio_id', 'servicio__nombre'),
+    'producto': ('id', 'nombre'),
+}
+PERIODOS = ('dia', 'mes')
+SLOTS_POR_DIA = len(SLOTS)
+
+
+def clave(turno):
+    return turno.fecha, turno.empleado_id, turno.producto_id
+
+
+def _fila(clave, turnos):
+    fecha, empleado_id, producto_id = clave
+    return ResumenDiario(fecha=fecha, empleado_id=empleado_id, producto_id=producto_id, turnos=turnos)
+
+
+def sumar(claves, signo=1):
+    """
+    Suma (o resta, con `signo=-1`) un turno por cada clave (fecha, empleado_id, producto_id), con
+    una cantidad fija de consultas. Lo llaman las senales de Turno y guardar_lote, dentro de la
+    transaccion que escribe los turnos.
+    """
+    conteos = Counter(claves)
+    if not conteos:
+        return
+    fechas, empleados, productos = (set(valores) for valores in zip(*conteos))
+    existentes = {
+        (fecha, empleado_id, producto_id): pk
+        for pk, fecha, empleado_id, producto_id in ResumenDiario.objects.filter(
+            fecha__in=fechas, empleado_id__in=empleados, producto_id__in=productos,
+        ).values_list('pk', 'fecha', 'empleado_id', 'producto_id')
+        if (fecha, empleado_id, producto_id) in conteos
+    }
+    if existentes and signo > 0:
+        _incrementar({pk: conteos[clave] for clave, pk in existentes.items()})
+    elif existentes:
+        _descontar({pk: conteos[clave] for clave, pk in existentes.items()})
+    nuevas = [clave for clave in conteos if clave not in existentes] if signo > 0 else []
+    if not nuevas:
+        return
+    try:
+        with transaction.atomic():
+            ResumenDiario.objects.bulk_create([_fila(clave, conteos[clave]) for clave in nuevas])
+    except IntegrityError:
+        # Otra transaccion creo alguna de las filas despues de la consulta: se reintenta y ahora se actualizan
+        sumar([clave for clave in nuevas for _ in range(conteos[clave])])
+
+
+def _incrementar(deltas):
+    ResumenDiario.objects.filter(pk__in=deltas).update(
+        turnos=F('turnos') + Case(*(When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()), default=Value(0))
+    )
+
+
+def _descontar(cantidades):
+    # Si el resumen se desvio no puede quedar negativo ni hacer fallar el borrado del turno: queda en 0
+    # (reconstruir lo corrige). Las filas en 0 se borran
+    ResumenDiario.objects.filter(pk__in=cantidades).update(turnos=Case(
+        *(When(pk=pk, turnos__gt=cantidad, then=F('turnos') - cantidad) for pk, cantidad in cantidades.items()),
+        default=Value(0),
+    ))
+    ResumenDiario.objects.filter(pk__in=cantidades, turnos=0).delete()
+
+
+def agregados(turnos):
+    """Filas de ResumenDiario (sin guardar) con los conteos de `turnos`, agrupados en la base."""
+    filas = turnos.order_by().values('fecha', 'empleado_id', 'producto_id').annotate(cantidad=Count('id'))
+    for fila in filas.iterator(chunk_size=5000):
+        yield _fila((fila['fecha'], fila['empleado_id'], fila['producto_id']), fila['cantidad'])
+
+
+def reconstruir(desde, hasta, dias_por_tanda=31, lote=5000):
+    """
+    Regenera ResumenDiario entre `desde` y `hasta` a partir de los turnos, por tandas de dias
+    en transacciones cortas. Para datos cargados sin pasar por save() o si el resumen se desvio.
+    Devuelve la cantidad de filas escritas.
+    """
+    total = 0
+    inicio = desde
+    while inicio <= hasta:
+        fin = min(inicio + datetime.timedelta(days=dias_por_tanda - 1), hasta)
+        with transaction.atomic():
+            ResumenDiario.objects.filter(fecha__gte=inicio, fecha__lte=fin).delete()
+            filas = list(agregados(Turno.objects.filter(fecha__gte=inicio, fecha__lte=fin)))
+            ResumenDiario.objects.bulk_create(filas, batch_size=lote)
+        total += len(filas)
+        inicio = fin + datetime.timedelta(days=1)
+    return total
+
+
+def _periodo(fecha, periodo):
+    return fecha.isoformat() if periodo == 'dia' else fecha.strftime('%Y-%m')
+
+
+def sumas_por_dia(filtro, campo):
+    # Agrupa por dia en la base (indices cubrientes resumen_*_idx) y por mes, si hace falta, en Python:
+    # TruncMonth en SQLite es una funcion de Python por fila
+    return ResumenDiario.objects.filter(filtro).values_list('fecha', campo).annotate(cantidad=Sum('turnos')).order_by()
+
+
+def ingresos(desde, hasta, agrupar='servicio', periodo='dia'):
+    """Turnos e ingresos (precio actual del producto por turnos) por periodo y servicio o producto."""
+    filas = [fila for fila in sumas_por_dia(Q(fecha__gte=desde, fecha__lte=hasta), 'producto_id') if fila[2]]
+    campo, nombre = AGRUPACIONES[agrupar]
+    productos = {
+        pk: (grupo, etiqueta, precio)
+        for pk, grupo, etiqueta, precio in Producto.objects.filter(id__in={fila[1] for fila in filas})
+        .values_list('id', campo, nombre, 'precio')
+    }
+    totales = {}
+    for fecha, producto_id, cantidad in filas:
+        grupo, etiqueta, precio = productos[producto_id]
+        total = totales.setdefault((_periodo(fecha, periodo), grupo), {'nombre': etiqueta, 'turnos': 0, 'ingresos': Decimal(0)})
+        total['turnos'] += cantidad
+        total['ingresos'] += precio * cantidad
+    return [
+        {'periodo': clave_periodo, agrupar: grupo, 'nombre': total['nombre'], 'turnos': total['turnos'],
+         'ingresos': f'{total["ingresos"]:.2f}'}
+        for (clave_periodo, grupo), total in sorted(totales.items())
+    ]
+
+
+def _dias_del_periodo(fecha, desde, hasta, periodo):
+    if periodo == 'dia':
+        return 1
+    inicio = fecha.replace(day=1)
+    siguiente = (inicio + datetime.timedelta(days=32)).replace(day=1)
+    return (min(siguiente - datetime.timedelta(days=1), hasta) - max(inicio, desde)).days + 1
+
+
+def ocupacion(desde, hasta, periodo='dia', empleado=None, servicio=None):
+    """
+    Turnos de cada empleado por periodo contra su capacidad (SLOTS_POR_DIA por dia del periodo
+    dentro del rango). Solo aparecen los empleados con turnos en el periodo.
+    """
+    filtro = Q(fecha__gte=desde, fecha__lte=hasta)
+    if empleado is not None:
+        filtro &= Q(empleado_id=empleado)
+    if servicio is not None:
+        filtro &= Q(empleado_id__in=Empleado.objects.filter(servicio_id=servicio).values('id'))
+    totales = {}
+    for fecha, empleado_id, cantidad in sumas_por_dia(filtro, 'empleado_id'):
+        if cantidad:
+            clave_total = (_periodo(fecha, periodo), empleado_id)
+            turnos, _ = totales.get(clave_total, (0, fecha))
+            totales[clave_total] = (turnos + cantidad, fecha)
+    resultado = []
+    for (clave_periodo, empleado_id), (turnos, fecha) in sorted(totales.items()):
+        capacidad = _dias_del_periodo(fecha, desde, hasta, periodo) * SLOTS_POR_DIA
+        resultado.append({
+            'periodo': clave_periodo, 'empleado': empleado_id, 'turnos': turnos,
+            'capacidad': capacidad, 'ocupacion': round(turnos / capacidad, 4),
+        })
+    return resultado
@@ -0,0 +1,47 @@
+from asgiref.sync import sync_to_async
+from inspect import isawaitable
+from rest_framework.views import APIView
+
+from .documentacion import copiar
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView con handlers `async def`. La autenticacion, permisos, throttling y negociacion
+    de DRF (`initial`) son sincronos y pueden tocar la base (sesion, usuario del JWT), asi que
+    se ejecutan con sync_to_async y mantienen exactamente la misma semantica que las vistas
+    sincronas.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def mismo_schema(handler_sincrono):
+    """Reusa la documentacion de swagger_auto_schema del handler sincrono equivalente."""
+    def decorador(handler):
+        copiar(handler_sincrono, handler)
+        return handler
+    return decorador
@@ -0,0 +1,94 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class CacheTTL:
+    """LRU acotada a `maximo` entradas que ademas vencen a los `ttl` segundos. Es por proceso."""
+
+    def __init__(self, maximo, ttl):
+        self.maximo = maximo
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entradas = OrderedDict()
+
+    def obtener(self, clave):
+        with self.lock:
+            entrada = self.entradas.get(clave)
+            if entrada is None:
+                return None
+            vence, valor = entrada
+            if vence < time.monotonic():
+                del self.entradas[clave]
+                return None
+            self.entradas.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave, valor):
+        with self.lock:
+            self.entradas[clave] = (time.monotonic() + self.ttl, valor)
+            self.entradas.move_to_end(clave)
+            while len(self.entradas) > self.maximo:
+                self.entradas.popitem(last=False)
+
+    def descartar(self, clave):
+        with self.lock:
+            self.entradas.pop(clave, None)
+
+    def limpiar(self):
+        with self.lock:
+            self.entradas.clear()
+
+
+usuarios = CacheTTL(getattr(settings, 'JWT_USUARIOS_MAX', 10000), getattr(settings, 'JWT_USUARIOS_TTL', 60))
+
+
+def _clave_revocado(jti):
+    return f'jwt:revocado:{jti}'
+
+
+def revocar(token):
+    """Agrega el token a la lista de revocados hasta que vence por si solo."""
+    restante = int(token['exp'] - time.time())
+    if restante > 0:
+        cache.set(_clave_revocado(token[jwt_settings.JTI_CLAIM]), 1, restante)
+
+
+def revocado(token):
+    return cache.get(_clave_revocado(token.get(jwt_settings.JTI_CLAIM))) is not None
+
+
+class JWTAuthenticationCacheada(JWTAuthentication):
+    """
+    Confia en los claims del token ya validado y resuelve el usuario desde `usuarios` en lugar
+    de consultarlo en cada peticion. La entrada se descarta cuando el usuario se guarda o se
+    borra (signals.py), lo que cubre desactivarlo y cambiarle la clave; en otros procesos vence
+    a los JWT_USUARIOS_TTL segundos. Con JWT_REVOCACION tambien rechaza los tokens revocados.
+    """
+
+    def get_user(self, validated_token):
+        if settings.JWT_REVOCACION and revocado(validated_token):
+            raise AuthenticationFailed('El token fue revocado', code='token_revocado')
+        if not settings.JWT_USUARIOS_TTL:
+            return super().get_user(validated_token)
+        try:
+            usuario_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('El token no identifica al usuario')
+        usuario = usuarios.obtener(str(usuario_id))
+        if usuario is None:
+            # La primera vez valida contra la base (existe, activo, clave sin cambiar) y se guarda
+            usuario = super().get_user(validated_token)
+            usuarios.guardar(str(usuario_id), usuario)
+        elif jwt_settings.CHECK_REVOKE_TOKEN and validated_token.get(jwt_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(usuario.password):
+            raise AuthenticationFailed('La clave del usuario cambio', code='password_changed')
+        # Copia para que una peticion no modifique el usuario que ven las demas
+        return copy.copy(usuario)
@@ -0,0 +1,340 @@
+import datetime
+import io
+import json
+import statistics
+import subprocess
+import sys
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .autenticacion import JWTAuthenticationCacheada, usuarios
+from .compresion import comprimir, disponibles
+from .disponibilidad import SLOTS
+from .json_rapido import JSONParserRapido, JSONRendererRapido
+from .models import Cliente, Empleado, Producto, Servicio, Turno
+from .representacion import representacion
+from .serializers import ClienteSerializer, EmpleadoSerializer, ProductoSerializer, ServicioSerializer, TurnoSerializer, prefetch_turnos
+from .urls import urlpatterns
+
+# Dia sin turnos sembrados, para que las escrituras no choquen con las restricciones de Turno
+FECHA_LIBRE = datetime.date(2099, 1, 5)
+
+
+class Escenario:
+    __slots__ = ('nombre', 'metodo', 'url', 'datos')
+
+    def __init__(self, nombre, metodo, url, datos=None):
+        self.nombre = nombre
+        self.metodo = metodo
+        self.url = url
+        self.datos = datos
+
+
+def muestras(desde):
+    """Ids existentes para armar las URLs de detalle. Toma el primer registro de cada tabla."""
+    empleado = Empleado.objects.order_by('id').first()
+    return {
+        'servicio': empleado.servicio_id,
+        'producto': Producto.objects.order_by('id').values_list('id', flat=True).first(),
+        'cliente': Cliente.objects.order_by('id').values_list('id', flat=True).first(),
+        'empleado': empleado.id,
+        'turno': Turno.objects.order_by('id').values_list('id', flat=True).first(),
+        'clientes': list(Cliente.objects.order_by('id').values_list('id', flat=True)[:len(SLOTS)]),
+        'desde': desde,
+    }
+
+
+def turno_nuevo(ids, indice=0):
+    return {
+        'cliente': ids['clientes'][indice], 'empleado': ids['empleado'], 'producto': ids['producto'],
+        'fecha': FECHA_LIBRE.isoformat(), 'hora': SLOTS[indice].strftime('%H:%M'),
+    }
+
+
+def escenarios(ids):
+    """Escenarios por nombre de ruta de api/urls.py."""
+    rango = f'desde={ids["desde"]}&hasta={ids["desde"] + datetime.timedelta(days=6)}'
+    semestre = f'desde={ids["desde"]}&hasta={ids["desde"] + datetime.timedelta(days=180)}'
+    return {
+        'inicio': [Escenario('inicio', 'get', reverse('inicio'))],
+        'metricas': [Escenario('metricas', 'get', reverse('metricas'))],
+        'producto-lista': [
+            Escenario('producto-lista', 'get', reverse('producto-lista')),
+            Escenario('producto-lista POST', 'post', reverse('producto-lista'),
+                      {'servicio': ids['servicio'], 'nombre': 'Producto bench', 'precio': '1000.00'}),
+        ],
+        'producto-detalle': [Escenario('producto-detalle', 'get', reverse('producto-detalle', args=[ids['producto']]))],
+        'cliente-lista': [Escenario('cliente-lista', 'get', reverse('cliente-lista'))],
+        'cliente-buscar': [Escenario('cliente-buscar', 'get', f'{reverse("cliente-buscar")}?q=cliente+sint')],
+        'cliente-detalle': [Escenario('cliente-detalle', 'get', reverse('cliente-detalle', args=[ids['cliente']]))],
+        'empleado-lista': [Escenario('empleado-lista', 'get', reverse('empleado-lista'))],
+        'empleado-detalle': [Escenario('empleado-detalle', 'get', reverse('empleado-detalle', args=[ids['empleado']]))],
+        'empleado-disponibilidad': [Escenario(
+            'empleado-disponibilidad', 'get', f'{reverse("empleado-disponibilidad", args=[ids["empleado"]])}?{rango}')],
+        'servicio-disponibilidad': [Escenario(
+            'servicio-disponibilidad', 'get', f'{reverse("servicio-disponibilidad")}?servicio={ids["servicio"]}&{rango}')],
+        'turno-lista': [
+            Escenario('turno-lista', 'get', reverse('turno-lista')),
+            Escenario('turno-lista filtrada', 'get', f'{reverse("turno-lista")}?empleado={ids["empleado"]}&{rango}&ordering=-fecha'),
+            Escenario('turno-lista POST', 'post', reverse('turno-lista'), turno_nuevo(ids)),
+        ],
+        'turno-lote': [Escenario('turno-lote', 'post', reverse('turno-lote'),
+                                 [turno_nuevo(ids, indice) for indice in range(len(ids['clientes']))])],
+        'turno-exportar': [Escenario('turno-exportar', 'get', f'{reverse("turno-exportar")}?formato=ndjson&{rango}')],
+        'turno-detalle': [Escenario('turno-detalle', 'get', reverse('turno-detalle', args=[ids['turno']]))],
+        'servicio-lista': [Escenario('servicio-lista', 'get', reverse('servicio-lista'))],
+        'servicio-detalle': [Escenario('servicio-detalle', 'get', reverse('servicio-detalle', args=[ids['servicio']]))],
+        'analitica-ingresos': [
+            Escenario('analitica-ingresos', 'get', f'{reverse("analitica-ingresos")}?{rango}&agrupar=producto'),
+            Escenario('analitica-ingresos mes', 'get', f'{reverse("analitica-ingresos")}?{semestre}&periodo=mes'),
+        ],
+        'analitica-ocupacion': [
+            Escenario('analitica-ocupacion', 'get', f'{reverse("analitica-ocupacion")}?{rango}'),
+            Escenario('analitica-ocupacion mes', 'get', f'{reverse("analitica-ocupacion")}?{semestre}&periodo=mes'),
+        ],
+    }
+
+
+def rutas_sin_escenario(disponibles):
+    return [patron.name for patron in urlpatterns if patron.name not in disponibles]
+
+
+def _ejecutar(cliente, escenario):
+    if escenario.datos is None:
+        respuesta = getattr(cliente, escenario.metodo)(escenario.url)
+    else:
+        respuesta = getattr(cliente, escenario.metodo)(
+            escenario.url, json.dumps(escenario.datos), content_type='application/json')
+    if respuesta.streaming:
+        return respuesta.status_code, sum(len(parte) for parte in respuesta.streaming_content)
+    return respuesta.status_code, len(respuesta.content)
+
+
+def medir(cliente, escenario, repeticiones, calentamiento=2):
+    """
+    Ejecuta el escenario `repeticiones` veces y devuelve latencias p50/p95/p99 (ms), consultas
+    y bytes de la ultima ejecucion. Las escrituras se deshacen para que cada repeticion vea
+    los mismos datos.
+    """
+    tiempos = []
+    for numero in range(calentamiento + repeticiones):
+        with transaction.atomic(), CaptureQueriesContext(connection) as consultas:
+            inicio = perf_counter()
+            estado, tamanio = _ejecutar(cliente, escenario)
+            duracion = perf_counter() - inicio
+            transaction.set_rollback(True)
+        if numero >= calentamiento:
+            tiempos.append(duracion * 1000)
+    cuantiles = statistics.quantiles(tiempos, n=100, method='inclusive') if len(tiempos) > 1 else tiempos * 99
+    return {
+        'metodo': escenario.metodo.upper(),
+        'url': escenario.url,
+        'estado': estado,
+        'p50_ms': round(cuantiles[49], 3),
+        'p95_ms': round(cuantiles[94], 3),
+        'p99_ms': round(cuantiles[98], 3),
+        # Sin contar el SAVEPOINT / ROLLBACK del atomic que envuelve cada repeticion
+        'consultas': sum(1 for consulta in consultas if not consulta['sql'].upper().startswith(('SAVEPOINT', 'RELEASE', 'ROLLBACK', 'BEGIN'))),
+        'bytes': tamanio,
+    }
+
+
+def comparar(actual, base, tolerancia):
+    """Devuelve (lineas del reporte, regresiones) comparando p95 y consultas contra la linea base."""
+    lineas, regresiones = [], []
+    for nombre, medicion in actual.items():
+        anterior = base.get(nombre)
+        if anterior is None:
+            lineas.append(f'{nombre}: sin linea base')
+            continue
+        cambio = (medicion['p95_ms'] - anterior['p95_ms']) / anterior['p95_ms'] if anterior['p95_ms'] else 0
+        lineas.append(
+            f'{nombre}: p95 {anterior["p95_ms"]:.2f} -> {medicion["p95_ms"]:.2f} ms ({cambio:+.0%}), '
+            f'consultas {anterior["consultas"]} -> {medicion["consultas"]}, '
+            f'bytes {anterior["bytes"]} -> {medicion["bytes"]}'
+        )
+        if cambio > tolerancia:
+            regresiones.append(f'{nombre}: p95 {cambio:+.0%}')
+        if medicion['consultas'] > anterior['consultas']:
+            regresiones.append(f'{nombre}: {medicion["consultas"] - anterior["consultas"]} consultas mas')
+    return lineas, regresiones
+
+
+def listados():
+    return {
+        'servicio': (Servicio.objects.order_by('id'), ServicioSerializer),
+        'producto': (Producto.objects.order_by('id'), ProductoSerializer),
+        'cliente': (Cliente.objects.prefetch_related(prefetch_turnos('cliente_turno')).order_by('id'), ClienteSerializer),
+        'empleado': (Empleado.objects.prefetch_related(prefetch_turnos('empleado_turno')).order_by('id'), EmpleadoSerializer),
+        'turno': (Turno.objects.order_by('fecha', 'hora', 'id'), TurnoSerializer),
+    }
+
+
+def _mejor_tiempo(funcion, repeticiones):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = perf_counter()
+        funcion()
+        duracion = perf_counter() - inicio
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor
+
+
+def throughput_listados(filas, repeticiones=5):
+    """Filas por segundo al serializar `filas` registros de cada listado con el serializer y con representacion.py."""
+    resultados = {}
+    for nombre, (queryset, serializer_class) in listados().items():
+        rapida = representacion(serializer_class)
+        cantidad = len(queryset[:filas].values_list('id'))
+        if not cantidad:
+            continue
+        serializer = _mejor_tiempo(lambda: serializer_class(list(queryset[:filas]), many=True).data, repeticiones)
+        rapido = _mejor_tiempo(lambda: rapida.convertir(list(rapida.valores(queryset[:filas]))), repeticiones)
+        resultados[nombre] = {
+            'filas': cantidad,
+            'serializer_filas_s': round(cantidad / serializer),
+            'rapido_filas_s': round(cantidad / rapido),
+            'aceleracion': round(serializer / rapido, 2),
+        }
+    return resultados
+
+
+def codificacion_json(filas, repeticiones=5):
+    """
+    Milisegundos para renderizar y parsear `filas` registros de cada listado con el JSON de DRF y
+    con json_rapido (verificando que den los mismos bytes), y bytes a enviar con cada compresion.
+    """
+    resultados = {}
+    for nombre, (queryset, serializer_class) in listados().items():
+        rapida = representacion(serializer_class)
+        datos = rapida.convertir(list(rapida.valores(queryset[:filas])))
+        if not datos:
+            continue
+        contenido = JSONRenderer().render(datos)
+        medicion = {
+            'filas': len(datos),
+            'iguales': JSONRendererRapido().render(datos) == contenido,
+            'render_ms': round(_mejor_tiempo(lambda: JSONRenderer().render(datos), repeticiones) * 1000, 2),
+            'render_rapido_ms': round(_mejor_tiempo(lambda: JSONRendererRapido().render(datos), repeticiones) * 1000, 2),
+            'parse_ms': round(_mejor_tiempo(lambda: JSONParser().parse(io.BytesIO(contenido)), repeticiones) * 1000, 2),
+            'parse_rapido_ms': round(_mejor_tiempo(lambda: JSONParserRapido().parse(io.BytesIO(contenido)), repeticiones) * 1000, 2),
+            'bytes': len(contenido),
+        }
+        for codificacion in disponibles():
+            medicion[f'bytes_{codificacion}'] = len(comprimir(contenido, codificacion))
+            medicion[f'{codificacion}_ms'] = round(_mejor_tiempo(lambda: comprimir(contenido, codificacion), repeticiones) * 1000, 2)
+        resultados[nombre] = medicion
+    return resultados
+
+
+def autenticacion(usuario, repeticiones=200):
+    """Consultas y microsegundos por peticion para resolver el usuario del JWT, sin y con la cache de usuarios."""
+    peticion = Request(RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(usuario)}'))
+    usuarios.limpiar()
+    resultados = {}
+    for nombre, clase in (('jwt', JWTAuthentication), ('jwt_cacheada', JWTAuthenticationCacheada)):
+        autenticador = clase()
+        autenticador.authenticate(peticion)
+        with CaptureQueriesContext(connection) as consultas:
+            autenticador.authenticate(peticion)
+        resultados[nombre] = {
+            'consultas': len(consultas),
+            'us': round(_mejor_tiempo(lambda: autenticador.authenticate(peticion), repeticiones) * 1e6, 1),
+        }
+    return resultados
+
+
+def _cliente_nuevo(numero):
+    return {
+        'nombre': 'Bench', 'apellido': 'Escritura', 'usuario': f'bench{numero}', 'edad': 30,
+        'email': f'bench{numero}@bench.com', 'celular': f'{9000000000 + numero}', 'nro_socio': 10 ** 9 + numero,
+    }
+
+
+def _empleado_nuevo(numero, servicio_id):
+    return {
+        'nombre': 'Bench', 'apellido': 'Escritura', 'usuario': f'bench{numero}', 'email': f'bench{numero}@bench.com',
+        'legajo': 10 ** 9 + numero, 'sueldo': '1000.00', 'servicio': servicio_id,
+    }
+
+
+def escrituras(repeticiones=200):
+    """
+    Altas por segundo y consultas por alta de clientes y empleados con la unicidad verificada
+    campo por campo (un UniqueValidator por campo) y en una sola consulta. Se deshacen al terminar.
+    """
+    ejecutadas = []
+
+    def contar(execute, sql, params, many, context):
+        ejecutadas.append(sql)
+        return execute(sql, params, many, context)
+
+    resultados = {}
+    for nombre, serializer_class, datos in (('cliente', ClienteSerializer, _cliente_nuevo),
+                                            ('empleado', EmpleadoSerializer, _empleado_nuevo)):
+        resultados[nombre] = {}
+        for variante, una_consulta in (('por_campo', False), ('una_consulta', True)):
+            clase = type(serializer_class.__name__, (serializer_class,), {'unicidad_en_una_consulta': una_consulta})
+            with transaction.atomic():
+                servicio_id = Servicio.objects.create(nombre='Bench').pk
+                ejecutadas.clear()
+                inicio = perf_counter()
+                with connection.execute_wrapper(contar):
+                    for numero in range(repeticiones):
+                        serializer = clase(data=datos(numero, servicio_id) if nombre == 'empleado' else datos(numero))
+                        serializer.is_valid(raise_exception=True)
+                        serializer.save()
+                duracion = perf_counter() - inicio
+                transaction.set_rollback(True)
+            resultados[nombre][variante] = {
+                'escrituras_s': round(repeticiones / duracion),
+                'consultas': round(len(ejecutadas) / repeticiones, 1),
+            }
+    return resultados
+
+# Lo que hace un worker al arrancar: configurar Django y cargar las rutas (y con ellas las vistas)
+_ARRANQUE = """
+import json, resource, sys, time
+inicio = time.perf_counter()
+import django
+django.setup()
+import config.urls
+{extra}
+print(json.dumps({{
+    'ms': (time.perf_counter() - inicio) * 1000,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'drf_yasg': any(modulo.startswith('drf_yasg.') for modulo in sys.modules),
+}}))
+"""
+
+# Lo que cargaban antes config/urls.py (get_schema_view) y los swagger_auto_schema de las vistas
+_CON_DRF_YASG = 'import drf_yasg.views\nfrom api.documentacion import aplicar\naplicar()'
+
+
+def _arrancar(extra):
+    salida = subprocess.run([sys.executable, '-c', _ARRANQUE.format(extra=extra)], cwd=settings.BASE_DIR,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(salida)
+
+
+def arranque(repeticiones=5):
+    """Mediana del tiempo de arranque y la RSS maxima de un proceso nuevo, sin y con drf_yasg cargado."""
+    resultados = {}
+    for nombre, extra in (('sin_drf_yasg', ''), ('con_drf_yasg', _CON_DRF_YASG)):
+        medidas = [_arrancar(extra) for _ in range(repeticiones)]
+        resultados[nombre] = {
+            'ms': round(statistics.median(medida['ms'] for medida in medidas), 1),
+            'rss_mb': round(statistics.median(medida['rss_mb'] for medida in medidas), 1),
+            'drf_yasg': medidas[0]['drf_yasg'],
+        }
+    return resultados
@@ -0,0 +1,124 @@
+import re
+import unicodedata
+
+from django.db.models import Exists, OuterRef
+
+from .models import Cliente, TerminoCliente
+
+CAMPOS_BUSQUEDA = ('nombre', 'apellido', 'usuario', 'email', 'celular', 'nro_socio')
+MAX_RESULTADOS = 50
+# Palabras de la consulta que se tienen en cuenta; la primera ordena los resultados
+MAX_PALABRAS = 4
+# Valores de TerminoCliente.rango, en el orden en que se devuelven
+COMIENZO, MEDIO = 0, 1
+
+_PALABRA = re.compile(r'[^\W_]+')
+_LARGO = TerminoCliente._meta.get_field('termino').max_length
+
+
+def normalizar(texto):
+    """Minusculas y sin acentos: 'Martínez' -> 'martinez'."""
+    descompuesto = unicodedata.normalize('NFKD', str(texto))
+    return ''.join(caracter for caracter in descompuesto if not unicodedata.combining(caracter)).lower()
+
+
+def palabras(texto):
+    return [palabra[:_LARGO] for palabra in _PALABRA.findall(normalizar(texto))]
+
+
+def terminos(valores):
+    """
+    Terminos de busqueda -> rango, a partir de los valores de CAMPOS_BUSQUEDA. Cada campo
+    aporta sus palabras y ademas el campo entero sin separadores, para que '11 4444-5555'
+    se encuentre como '1144445555' y 'juan.perez' como 'juanperez'.
+    """
+    resultado = {}
+    for valor in valores:
+        partes = palabras(valor)
+        for posicion, palabra in enumerate(partes):
+            resultado[palabra] = min(resultado.get(palabra, MEDIO), COMIENZO if posicion == 0 else MEDIO)
+        if len(partes) > 1:
+            resultado[''.join(partes)[:_LARGO]] = COMIENZO
+    return resultado
+
+
+def indexar(clientes, nuevos=False):
+    """
+    Regenera los terminos de `clientes` (instancias). Lo llama la senal post_save; las altas
+    con bulk_create, que no la disparan, lo llaman con `nuevos=True`.
+    """
+    if not nuevos:
+        TerminoCliente.objects.filter(cliente__in=[cliente.pk for cliente in clientes]).delete()
+    elif any(cliente.pk is None for cliente in clientes):
+        # En MySQL bulk_create no devuelve las claves; se buscan por nro_socio
+        ids = dict(Cliente.objects.filter(nro_socio__in=[cliente.nro_socio for cliente in clientes]).values_list('nro_socio', 'id'))
+        for cliente in clientes:
+            cliente.pk = ids[cliente.nro_socio]
+    TerminoCliente.objects.bulk_create([
+        TerminoCliente(cliente_id=cliente.pk, termino=termino, rango=rango)
+        for cliente in clientes
+        for termino, rango in terminos(getattr(cliente, campo) for campo in CAMPOS_BUSQUEDA).items()
+    ])
+
+
+def reindexar_todos(lote=1000):
+    """Regenera los terminos de todos los clientes; para datos cargados sin pasar por save()."""
+    clientes = Cliente.objects.order_by('id').only(*CAMPOS_BUSQUEDA)
+    total = 0
+    parte = list(clientes[:lote])
+    while parte:
+        indexar(parte)
+        total += len(parte)
+        parte = list(clientes.filter(id__gt=parte[-1].pk)[:lote])
+    return total
+
+
+def _prefijo(palabra):
+    # Rango en lugar de LIKE 'x%': SQLite no usa el indice para LIKE sin COLLATE NOCASE
+    siguiente = palabra[:-1] + chr(ord(palabra[-1]) + 1)
+    return {'termino__gte': palabra, 'termino__lt': siguiente}
+
+
+def consulta_terminos(primera, resto, rango):
+    """Ids de cliente con un termino que empieza con `primera` y otro por cada palabra de `resto`."""
+    consulta = TerminoCliente.objects.filter(rango=rango, **_prefijo(primera))
+    for palabra in resto:
+        consulta = consulta.filter(Exists(
+            TerminoCliente.objects.filter(cliente_id=OuterRef('cliente_id'), **_prefijo(palabra))
+        ))
+    return consulta.order_by('termino', 'cliente_id').values_list('cliente_id', flat=True)
+
+
+def _clientes(primera, resto, rango, limite, excluir):
+    consulta = consulta_terminos(primera, resto, rango)
+    # Un cliente puede coincidir con varios terminos: se lee por tandas hasta juntar `limite` distintos
+    encontrados = []
+    desde, tanda = 0, limite * 2
+    while len(encontrados) < limite:
+        ids = list(consulta[desde:desde + tanda])
+        for cliente_id in ids:
+            if cliente_id not in excluir and cliente_id not in encontrados:
+                encontrados.append(cliente_id)
+                if len(encontrados) == limite:
+                    break
+        if len(ids) < tanda:
+            break
+        desde += tanda
+    return encontrados
+
+
+def buscar_clientes(texto, limite=10):
+    """
+    Ids de los clientes cuyos terminos empiezan con cada palabra de `texto`. Primero los que
+    tienen un campo que empieza con la primera palabra, despues los que la tienen en el medio
+    de un campo ('perez' en 'juan.perez@mail.com'). Cada tanda es un rango sobre
+    termino_busqueda_idx, sin recorrer la tabla de clientes.
+    """
+    consulta = palabras(texto)[:MAX_PALABRAS]
+    if not consulta:
+        return []
+    ids = []
+    for rango in (COMIENZO, MEDIO):
+        if len(ids) < limite:
+            ids += _clientes(consulta[0], consulta[1:], rango, limite - len(ids), set(ids))
+    return ids
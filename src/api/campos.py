@@ -0,0 +1,114 @@
+from functools import lru_cache
+
+from rest_framework import serializers
+from rest_framework.exceptions import APIException
+
+from .documentacion import Parameter, IN_QUERY, TYPE_STRING
+from .serializers import ClienteSerializer, EmpleadoSerializer, ProductoSerializer, ServicioSerializer, TurnoSerializer
+
+# Relaciones que se pueden incluir con ?expand=, por serializer
+EXPANSIBLES = {
+    TurnoSerializer: {'cliente': ClienteSerializer, 'empleado': EmpleadoSerializer, 'producto': ProductoSerializer},
+    ProductoSerializer: {'servicio': ServicioSerializer},
+    EmpleadoSerializer: {'servicio': ServicioSerializer},
+}
+
+parametros_seleccion = [
+    Parameter('fields', IN_QUERY, description='Campos a devolver separados por coma, por ejemplo id,nombre', type=TYPE_STRING),
+    Parameter('expand', IN_QUERY, description='Relaciones a incluir completas, por ejemplo cliente,empleado,producto', type=TYPE_STRING),
+]
+
+
+class SeleccionInvalida(APIException):
+    status_code = 400
+    default_code = 'seleccion_invalida'
+
+
+@lru_cache(maxsize=None)
+def expandido(serializer_class):
+    """Variante de solo lectura sin campos calculados (los turnos anidados), para incluir dentro de otra respuesta."""
+    class Expandido(serializer_class):
+        def get_fields(self):
+            return {
+                nombre: campo for nombre, campo in super().get_fields().items()
+                if not isinstance(campo, serializers.SerializerMethodField)
+            }
+    Expandido.__name__ = f'{serializer_class.__name__}Expandido'
+    return Expandido
+
+
+@lru_cache(maxsize=None)
+def campos_de(serializer_class):
+    """Campos de salida del serializer -> campo del modelo que leen (None para los calculados)."""
+    modelo = serializer_class.Meta.model
+    return {
+        nombre: None if isinstance(campo, serializers.SerializerMethodField) else modelo._meta.get_field(campo.source).name
+        for nombre, campo in serializer_class().fields.items() if not campo.write_only
+    }
+
+
+class Seleccion:
+    """Campos pedidos con ?fields= (None = todos) y relaciones pedidas con ?expand= para un serializer."""
+
+    def __init__(self, serializer_class, campos=None, expandir=()):
+        self.serializer_class = serializer_class
+        self.expandir = tuple(expandir)
+        if campos is not None:
+            campos = tuple(dict.fromkeys(campos + self.expandir))
+        self.campos = campos
+
+    @property
+    def vacia(self):
+        return self.campos is None and not self.expandir
+
+    def clave(self):
+        return f'{",".join(self.campos) if self.campos else ""}|{",".join(self.expandir)}'
+
+    def incluye(self, nombre):
+        return self.campos is None or nombre in self.campos
+
+    def aplicar(self, serializer):
+        """Recorta y expande los campos de una instancia del serializer (ver CamposDinamicos)."""
+        if self.campos is not None:
+            for nombre in list(serializer.fields):
+                if nombre not in self.campos:
+                    serializer.fields.pop(nombre)
+        for nombre in self.expandir:
+            serializer.fields[nombre] = expandido(EXPANSIBLES[self.serializer_class][nombre])(read_only=True)
+
+    def queryset(self, queryset, extra=()):
+        """Trae solo las columnas de los campos pedidos y une las relaciones expandidas en la misma consulta."""
+        if self.vacia:
+            return queryset
+        if self.expandir:
+            queryset = queryset.select_related(*self.expandir)
+        if not self.incluye('turnos'):
+            queryset = queryset.prefetch_related(None)
+        if self.campos is None:
+            return queryset
+        fuentes = campos_de(self.serializer_class)
+        columnas = {'id', *(campo.lstrip('-') for campo in extra)}
+        columnas.update(fuentes[nombre] for nombre in self.campos if fuentes[nombre])
+        return queryset.only(*columnas)
+
+
+def _lista(request, parametro):
+    valor = request.query_params.get(parametro)
+    if valor is None:
+        return None
+    return tuple(nombre.strip() for nombre in valor.split(',') if nombre.strip())
+
+
+def seleccion_de(request, serializer_class):
+    campos = _lista(request, 'fields')
+    expandir = _lista(request, 'expand') or ()
+    if campos is not None:
+        desconocidos = [nombre for nombre in campos if nombre not in campos_de(serializer_class)]
+        if desconocidos:
+            raise SeleccionInvalida({'error': f'Campos desconocidos: {", ".join(desconocidos)}'})
+    if expandir:
+        permitidos = EXPANSIBLES.get(serializer_class, {})
+        desconocidos = [nombre for nombre in expandir if nombre not in permitidos]
+        if desconocidos:
+            raise SeleccionInvalida({'error': f'No se puede expandir: {", ".join(desconocidos)}'})
+    return Seleccion(serializer_class, campos, expandir)
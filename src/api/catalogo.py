@@ -0,0 +1,63 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .replicas import en_primaria
+
+
+def _clave_version(modelo):
+    return f'catalogo:{modelo._meta.model_name}:version'
+
+
+def version(modelo):
+    clave = _clave_version(modelo)
+    actual = cache.get(clave)
+    if actual is None:
+        # Si el contador se pierde (expulsion, reinicio) arranca desde un valor nuevo para no reusar claves viejas
+        cache.add(clave, time.time_ns(), timeout=None)
+        actual = cache.get(clave)
+    return actual
+
+
+def invalidar(modelo):
+    clave = _clave_version(modelo)
+    try:
+        cache.incr(clave)
+    except ValueError:
+        cache.add(clave, time.time_ns(), timeout=None)
+
+
+def _clave(modelo, tipo, identificador):
+    sufijo = hashlib.md5(str(identificador).encode()).hexdigest()
+    return f'catalogo:{modelo._meta.model_name}:v{version(modelo)}:{tipo}:{sufijo}'
+
+
+def obtener(modelo, tipo, identificador, construir):
+    """
+    Lectura a traves de cache: la clave incluye la version del modelo, asi que despues de
+    `invalidar` ninguna lectura vuelve a ver datos anteriores a la escritura. Por eso se
+    construye desde la primaria: una replica atrasada guardaria datos viejos con la version nueva.
+    Si `construir` devuelve None el resultado no se guarda.
+    """
+    clave = _clave(modelo, tipo, identificador)
+    datos = cache.get(clave)
+    if datos is None:
+        with en_primaria():
+            datos = construir()
+        if datos is not None:
+            cache.set(clave, datos, getattr(settings, 'CATALOGO_CACHE_TIMEOUT', 300))
+    return datos
+
+
+async def aobtener(modelo, tipo, identificador, construir):
+    """Version async de `obtener`; `construir` es una corutina."""
+    clave = _clave(modelo, tipo, identificador)
+    datos = await cache.aget(clave)
+    if datos is None:
+        with en_primaria():
+            datos = await construir()
+        if datos is not None:
+            await cache.aset(clave, datos, getattr(settings, 'CATALOGO_CACHE_TIMEOUT', 300))
+    return datos
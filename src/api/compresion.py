@@ -0,0 +1,132 @@
+import gzip
+import re
+import zlib
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Solo respuestas de datos: sin HTML (admin, API navegable) no hay token CSRF que exponer a BREACH
+TIPOS = ('application/json', 'application/x-ndjson', 'text/csv')
+# Sufijo que se agrega al ETag de una respuesta comprimida, p. ej. "<hash>-gzip"
+_SUFIJO = re.compile(r'-(br|gzip)"')
+
+
+def disponibles():
+    """Codificaciones que sabe generar el servidor, en orden de preferencia ante empate."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negociar(accept_encoding):
+    """La codificacion aceptada con mayor q (RFC 9110 12.5.3), o None para enviar sin comprimir."""
+    calidades = {}
+    for parte in accept_encoding.split(','):
+        nombre, _, parametros = parte.partition(';')
+        nombre = nombre.strip().lower()
+        if not nombre:
+            continue
+        calidad = 1.0
+        parametro, _, valor = parametros.partition('=')
+        if parametro.strip().lower() == 'q':
+            try:
+                calidad = float(valor)
+            except ValueError:
+                calidad = 0.0
+        calidades[nombre] = calidad
+    comodin = calidades.get('*', 0.0)
+    mejor, mejor_calidad = None, 0.0
+    for nombre in disponibles():
+        calidad = calidades.get(nombre, comodin)
+        if calidad > mejor_calidad:
+            mejor, mejor_calidad = nombre, calidad
+    return mejor
+
+
+def comprimir(contenido, codificacion):
+    nivel = settings.COMPRESION_NIVEL[codificacion]
+    if codificacion == 'br':
+        return brotli.compress(contenido, quality=nivel)
+    return gzip.compress(contenido, compresslevel=nivel, mtime=0)
+
+
+def comprimir_secuencia(partes, codificacion):
+    nivel = settings.COMPRESION_NIVEL[codificacion]
+    if codificacion == 'br':
+        compresor = brotli.Compressor(quality=nivel)
+        agregar, terminar = compresor.process, compresor.finish
+    else:
+        compresor = zlib.compressobj(nivel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        agregar, terminar = compresor.compress, compresor.flush
+    for parte in partes:
+        salida = agregar(parte)
+        # El compresor junta la salida en bloques: se envia a medida que los completa
+        if salida:
+            yield salida
+    yield terminar()
+
+
+class CompresionMiddleware(MiddlewareMixin):
+    """
+    Comprime con brotli (si esta instalado) o gzip segun el Accept-Encoding de cada peticion las
+    respuestas de datos de al menos COMPRESION_MINIMO bytes, y las exportaciones en streaming.
+    """
+
+    def __init__(self, get_response):
+        if not settings.COMPRESION_HABILITADA:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_request(self, request):
+        # Las vistas calculan el ETag sin codificacion: se le quita el sufijo a las precondiciones
+        sufijo = _SUFIJO.search(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        request.codificacion_etag = sufijo and sufijo.group(1)
+        for cabecera in ('HTTP_IF_MATCH', 'HTTP_IF_NONE_MATCH'):
+            valor = request.META.get(cabecera)
+            if valor:
+                request.META[cabecera] = _SUFIJO.sub('"', valor)
+
+    def process_response(self, request, response):
+        if response.status_code == 304:
+            return self.etag_con_sufijo(request, response)
+        if response.has_header('Content-Encoding') or response.get('Content-Type', '').split(';')[0] not in TIPOS:
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESION_MINIMO:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        codificacion = negociar(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if codificacion is None:
+            return response
+        if response.streaming:
+            # Las respuestas con iterador async se envian sin comprimir
+            if response.is_async:
+                return response
+            response.streaming_content = comprimir_secuencia(response.streaming_content, codificacion)
+            del response.headers['Content-Length']
+        else:
+            comprimido = comprimir(response.content, codificacion)
+            if len(comprimido) >= len(response.content):
+                return response
+            response.content = comprimido
+            response.headers['Content-Length'] = str(len(comprimido))
+        # Cada codificacion tiene su propio ETag fuerte, asi If-Match (comparacion fuerte) sigue
+        # funcionando con el ETag de una respuesta comprimida
+        etag = response.get('ETag')
+        if etag and etag.endswith('"'):
+            response.headers['ETag'] = f'{etag[:-1]}-{codificacion}"'
+        response.headers['Content-Encoding'] = codificacion
+        return response
+
+    @staticmethod
+    def etag_con_sufijo(request, response):
+        """Un 304 lleva el mismo ETag que tendria el 200: el de la codificacion que envio el cliente."""
+        etag = response.get('ETag')
+        codificacion = getattr(request, 'codificacion_etag', None)
+        if etag and etag.endswith('"') and codificacion:
+            response.headers['ETag'] = f'{etag[:-1]}-{codificacion}"'
+        return response
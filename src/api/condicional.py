@@ -0,0 +1,160 @@
+import datetime
+import hashlib
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from asgiref.sync import sync_to_async
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from . import catalogo
+from .pagination import PaginacionCursor
+
+
+def resumen(queryset):
+    """(MAX(updated_at), COUNT(*)) de `queryset` en una sola consulta."""
+    datos = queryset.aggregate(ultima=Max('updated_at'), cantidad=Count('id'))
+    return datos['ultima'], datos['cantidad']
+
+
+def _texto(valor):
+    if valor is None:
+        return ''
+    return valor.isoformat() if isinstance(valor, datetime.datetime) else str(valor)
+
+
+def validadores(request, *estados, incluir_query=True):
+    """
+    Arma (etag, ultima_modificacion) a partir del estado de las filas que forman la respuesta:
+    resumenes de tablas o filas sueltas. Sin `incluir_query` igual se distinguen ?fields= y
+    ?expand=, que cambian el contenido.
+    """
+    fechas = [valor for estado in estados for valor in estado if isinstance(valor, datetime.datetime)]
+    partes = [request.path, request.accepted_media_type or '']
+    if incluir_query:
+        partes.append(request.META.get('QUERY_STRING', ''))
+    else:
+        partes.extend(request.GET.get(parametro, '') for parametro in ('fields', 'expand'))
+    partes.extend(':'.join(map(_texto, estado)) for estado in estados)
+    etag = hashlib.md5('|'.join(partes).encode()).hexdigest()
+    return etag, max(fechas) if fechas else None
+
+
+def expandidos(request, modelo):
+    """Claves foraneas pedidas con ?expand= (los nombres invalidos los rechaza la vista)."""
+    campos = []
+    for nombre in request.GET.get('expand', '').split(','):
+        try:
+            campo = modelo._meta.get_field(nombre.strip())
+        except FieldDoesNotExist:
+            continue
+        if campo.many_to_one and campo not in campos:
+            campos.append(campo)
+    return campos
+
+
+def estado_catalogo(modelo):
+    """
+    Para las respuestas que sirve catalogo.obtener: el ETag sale de la version que catalogo.invalidar
+    incrementa al confirmar cada escritura, asi que con la respuesta en cache no se consulta la base.
+    En los detalles el pk va en la ruta y de la query solo cuentan ?fields= y ?expand=, como en la
+    clave de la cache; si el recurso no existe lo responde la vista con los datos de la cache.
+    """
+    def obtener(request, **kwargs):
+        etag, _ = validadores(request, (catalogo.version(modelo),), incluir_query=not kwargs)
+        return etag, None
+    return obtener
+
+
+def estado_pagina(modelo, filtrar=None, paginacion=PaginacionCursor, relacionado=None, relacion=None):
+    """
+    Para los listados paginados: el ETag sale de las filas de la pagina pedida (id y updated_at,
+    y el de cada relacion expandida, en una sola consulta por indice) en lugar de un resumen de
+    toda la tabla, asi que solo cambia si cambia esa pagina. Las filas de `relacionado` anidadas
+    en la respuesta se resumen solo para los ids de la pagina. El total de ?count= se cuenta
+    solo si se pide, como en la vista.
+    """
+    def obtener(request):
+        queryset, orden = modelo.objects.all(), None
+        if filtrar is not None:
+            queryset, orden = filtrar(queryset, request.query_params)
+        paginador = paginacion(orden)
+        pagina, _ = paginador.preparar(queryset, request)
+        columnas = ['pk', 'updated_at'] + [f'{campo.name}__updated_at' for campo in expandidos(request, modelo)]
+        filas = list(pagina.values_list(*columnas))
+        # La fila de mas solo indica si hay otra pagina
+        estados = filas[:paginador.limite] + [(len(filas) > paginador.limite,)]
+        if relacionado is not None:
+            ids = [fila[0] for fila in filas[:paginador.limite]]
+            estados.append(resumen(relacionado.objects.filter(**{f'{relacion}__in': ids})))
+        if paginador.pide_count(request):
+            estados.append((queryset.count(),))
+        etag, _ = validadores(request, *estados)
+        return etag, None
+    return obtener
+
+
+def estado_detalle(modelo, relacionado=None, relacion=None):
+    def obtener(request, **kwargs):
+        pk, = kwargs.values()
+        principal = resumen(modelo.objects.filter(pk=pk))
+        if not principal[1]:
+            return None, None
+        resumenes = [principal]
+        if relacionado is not None:
+            resumenes.append(resumen(relacionado.objects.filter(**{relacion: pk})))
+        for campo in expandidos(request, modelo):
+            relacionados = modelo.objects.filter(pk=pk).values(campo.attname)
+            resumenes.append(resumen(campo.related_model.objects.filter(pk__in=relacionados)))
+        etag, ultima = validadores(request, *resumenes, incluir_query=False)
+        # Las filas relacionadas anidadas son una coleccion: borrar una no cambia la fecha
+        return etag, None if relacionado is not None else ultima
+    return obtener
+
+
+def _preparar(obtener_validadores, request, args, kwargs):
+    etag, ultima = obtener_validadores(request, *args, **kwargs)
+    etag = quote_etag(etag) if etag else None
+    ultima = int(ultima.timestamp()) if ultima else None
+    return etag, ultima, get_conditional_response(request, etag=etag, last_modified=ultima)
+
+
+def _con_validadores(request, respuesta, etag, ultima, ejecutada):
+    if ejecutada and (request.method not in ('GET', 'HEAD') or respuesta.status_code != 200):
+        return respuesta
+    if etag:
+        respuesta['ETag'] = etag
+    if ultima:
+        respuesta['Last-Modified'] = http_date(ultima)
+    return respuesta
+
+
+def condicional(obtener_validadores):
+    """
+    Responde 304 / 412 segun If-None-Match, If-Modified-Since e If-Match antes de ejecutar
+    la vista (y antes de serializar). `obtener_validadores` devuelve (etag, ultima) o
+    (None, None) si el recurso no existe. Sirve tanto para handlers sincronos como async.
+    """
+    def decorador(metodo):
+        if iscoroutinefunction(metodo):
+            @wraps(metodo)
+            async def envoltura_async(self, request, *args, **kwargs):
+                etag, ultima, respuesta = await sync_to_async(_preparar)(obtener_validadores, request, args, kwargs)
+                ejecutada = respuesta is None
+                if ejecutada:
+                    respuesta = await metodo(self, request, *args, **kwargs)
+                return _con_validadores(request, respuesta, etag, ultima, ejecutada)
+            return envoltura_async
+
+        @wraps(metodo)
+        def envoltura(self, request, *args, **kwargs):
+            etag, ultima, respuesta = _preparar(obtener_validadores, request, args, kwargs)
+            ejecutada = respuesta is None
+            if ejecutada:
+                respuesta = metodo(self, request, *args, **kwargs)
+            return _con_validadores(request, respuesta, etag, ultima, ejecutada)
+        return envoltura
+    return decorador
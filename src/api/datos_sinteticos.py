@@ -0,0 +1,103 @@
+import datetime
+import itertools
+import random
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Max
+
+from .analitica import reconstruir
+from .busqueda import indexar
+from .disponibilidad import SLOTS
+from .models import Cliente, Empleado, Producto, Servicio, Turno
+
+
+def _lotes(iterable, tamanio):
+    iterador = iter(iterable)
+    while True:
+        lote = list(itertools.islice(iterador, tamanio))
+        if not lote:
+            return
+        yield lote
+
+
+def _siguiente(modelo, campo):
+    return (modelo.objects.aggregate(maximo=Max(campo))['maximo'] or 0) + 1
+
+
+def sembrar(servicios=5, productos=20, clientes=200, empleados=10, turnos=2000,
+            desde=datetime.date(2025, 1, 1), lote=5000, semilla=0):
+    """
+    Carga un dataset sintetico respetando las restricciones de Turno: cada empleado
+    y cada cliente tienen a lo sumo un turno por (fecha, hora).
+    Devuelve la cantidad de filas creadas por modelo.
+    """
+    if empleados > clientes:
+        raise ValueError('Se necesitan al menos tantos clientes como empleados')
+    if (productos or empleados) and not servicios:
+        raise ValueError('Se necesita al menos un servicio')
+    if turnos and not (productos and empleados):
+        raise ValueError('Se necesitan productos y empleados para crear turnos')
+    azar = random.Random(semilla)
+
+    with transaction.atomic():
+        base = _siguiente(Servicio, 'id')
+        Servicio.objects.bulk_create(
+            Servicio(nombre=f'Servicio {base + n}') for n in range(servicios)
+        )
+        servicio_ids = list(Servicio.objects.filter(id__gte=base).values_list('id', flat=True))
+
+        base = _siguiente(Producto, 'id')
+        for parte in _lotes((
+            Producto(servicio_id=servicio_ids[n % servicios], nombre=f'Producto {base + n}',
+                     precio=Decimal(azar.randint(500, 20000)))
+            for n in range(productos)
+        ), lote):
+            Producto.objects.bulk_create(parte)
+        producto_ids = list(Producto.objects.filter(id__gte=base).values_list('id', flat=True))
+
+        base = _siguiente(Cliente, 'nro_socio')
+        for parte in _lotes((
+            Cliente(nombre='Cliente', apellido='Sintetico', usuario=f'c{base + n}', edad=18 + n % 60,
+                    email=f'c{base + n}@sintetico.com', celular=f'{base + n:010d}', nro_socio=base + n)
+            for n in range(clientes)
+        ), lote):
+            Cliente.objects.bulk_create(parte)
+            indexar(parte, nuevos=True)
+        cliente_ids = list(Cliente.objects.filter(nro_socio__gte=base).order_by('id').values_list('id', flat=True))
+
+        base = _siguiente(Empleado, 'legajo')
+        for parte in _lotes((
+            Empleado(nombre='Empleado', apellido='Sintetico', usuario=f'e{base + n}', email=f'e{base + n}@sintetico.com',
+                     legajo=base + n, sueldo=Decimal('100000.00'), servicio_id=servicio_ids[n % servicios])
+            for n in range(empleados)
+        ), lote):
+            Empleado.objects.bulk_create(parte)
+        empleado_ids = list(Empleado.objects.filter(legajo__gte=base).order_by('id').values_list('id', flat=True))
+
+        def generar():
+            creados = 0
+            for dia in itertools.count():
+                fecha = desde + datetime.timedelta(days=dia)
+                for indice_slot, hora in enumerate(SLOTS):
+                    desplazamiento = azar.randrange(len(cliente_ids))
+                    for indice_empleado, empleado_id in enumerate(empleado_ids):
+                        if creados == turnos:
+                            return
+                        # Distintos empleados en el mismo horario reciben distintos clientes
+                        cliente_id = cliente_ids[(indice_empleado + desplazamiento) % len(cliente_ids)]
+                        yield Turno(cliente_id=cliente_id, empleado_id=empleado_id, hora=hora, fecha=fecha,
+                                    producto_id=producto_ids[(dia + indice_slot + indice_empleado) % len(producto_ids)])
+                        creados += 1
+
+        ultima = desde
+        for parte in _lotes(generar(), lote):
+            Turno.objects.bulk_create(parte)
+            ultima = parte[-1].fecha
+        if turnos:
+            reconstruir(desde, ultima)
+
+    return {
+        'servicios': servicios, 'productos': productos, 'clientes': clientes,
+        'empleados': empleados, 'turnos': turnos,
+    }
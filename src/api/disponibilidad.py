@@ -0,0 +1,74 @@
+import datetime
+from functools import lru_cache
+
+from .models import Turno
+
+HORA_APERTURA = datetime.time(11, 0)
+HORA_CIERRE = datetime.time(20, 0)
+MINUTOS_VALIDOS = (0, 30)
+
+# Grilla de turnos validos: 11:00, 11:30, ... 20:00 (19 slots). Cada slot es un bit de la mascara diaria.
+SLOTS = tuple(
+    datetime.time(hora, minuto)
+    for hora in range(HORA_APERTURA.hour, HORA_CIERRE.hour + 1)
+    for minuto in MINUTOS_VALIDOS
+    if HORA_APERTURA <= datetime.time(hora, minuto) <= HORA_CIERRE
+)
+BIT_SLOT = {slot: 1 << indice for indice, slot in enumerate(SLOTS)}
+DIA_COMPLETO = (1 << len(SLOTS)) - 1
+
+
+def ocupacion(ids, desde, hasta, campo='empleado_id'):
+    """Devuelve {id: {fecha: mascara_ocupada}} con una sola consulta sobre el rango."""
+    mapa = {id_: {} for id_ in ids}
+    filas = (
+        Turno.objects
+        .filter(**{f'{campo}__in': ids}, fecha__gte=desde, fecha__lte=hasta)
+        .values_list(campo, 'fecha', 'hora')
+    )
+    for id_, fecha, hora in filas:
+        bit = BIT_SLOT.get(hora)
+        if bit:
+            dias = mapa[id_]
+            dias[fecha] = dias.get(fecha, 0) | bit
+    return mapa
+
+
+def libres(empleado_ids, desde, hasta):
+    """
+    Devuelve {fecha: mascara_libre} para el rango. Con varios empleados un slot queda
+    libre si al menos uno de ellos no tiene turno a esa hora.
+    """
+    mapa = ocupacion(empleado_ids, desde, hasta)
+    resultado = {}
+    fecha = desde
+    while fecha <= hasta:
+        mascara = 0
+        for dias in mapa.values():
+            mascara |= DIA_COMPLETO & ~dias.get(fecha, 0)
+        resultado[fecha] = mascara
+        fecha += datetime.timedelta(days=1)
+    return resultado
+
+
+def alternativas(empleado_id, cliente_id, fecha, cantidad=5, dias=7):
+    """Primeros horarios desde `fecha` en que tanto el empleado como el cliente estan libres."""
+    hasta = fecha + datetime.timedelta(days=dias - 1)
+    ocupado_cliente = ocupacion([cliente_id], fecha, hasta, campo='cliente_id')[cliente_id]
+    resultado = []
+    for dia, mascara in libres([empleado_id], fecha, hasta).items():
+        mascara &= ~ocupado_cliente.get(dia, 0)
+        for hora in horas_de(mascara):
+            resultado.append({'fecha': dia.isoformat(), 'hora': hora})
+            if len(resultado) == cantidad:
+                return resultado
+    return resultado
+
+
+@lru_cache(maxsize=1024)
+def horas_de(mascara):
+    return [SLOTS[i].strftime('%H:%M') for i in range(len(SLOTS)) if mascara >> i & 1]
+
+
+def slot_valido(hora):
+    return hora in BIT_SLOT
@@ -0,0 +1,107 @@
+import hashlib
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+# Documentacion OpenAPI sin cargar drf_yasg en los workers: los decoradores y parametros de las
+# vistas se guardan tal cual y recien se convierten en los de drf_yasg al generar el esquema
+# (comando generar_esquema, en el deploy). Las vistas solo sirven el archivo generado.
+
+IN_PATH, IN_QUERY = 'path', 'query'
+TYPE_INTEGER, TYPE_STRING = 'integer', 'string'
+
+INFO = {
+    'title': 'API de Don Alfredo',
+    'default_version': 'v1',
+    'description': 'Documentacion general del proyecto API REST de DON ALFREDO',
+}
+
+_pendientes = []
+_copias = []
+_lock = threading.Lock()
+_esquema = None
+
+
+class Diferido:
+    """Objeto de drf_yasg.openapi que se construye recien al generar el esquema."""
+    clase = None
+
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+    def construir(self):
+        from drf_yasg import openapi
+        return getattr(openapi, self.clase)(*_construir(self.args), **_construir(self.kwargs))
+
+
+class Parameter(Diferido):
+    clase = 'Parameter'
+
+
+class OpenAPIResponse(Diferido):
+    clase = 'Response'
+
+
+def _construir(valor):
+    if isinstance(valor, Diferido):
+        return valor.construir()
+    if isinstance(valor, (list, tuple)):
+        return type(valor)(_construir(item) for item in valor)
+    if isinstance(valor, dict):
+        return {clave: _construir(item) for clave, item in valor.items()}
+    return valor
+
+
+def swagger_auto_schema(**kwargs):
+    """Mismos argumentos que el de drf_yasg; se aplica con `aplicar()`."""
+    def decorador(metodo):
+        _pendientes.append((metodo, kwargs))
+        return metodo
+    return decorador
+
+
+def copiar(origen, destino):
+    """Documenta `destino` igual que `origen` (que tiene que estar decorado con swagger_auto_schema)."""
+    _copias.append((origen, destino))
+
+
+def aplicar():
+    """Aplica el swagger_auto_schema de drf_yasg a los metodos decorados hasta ahora. Importa drf_yasg."""
+    from drf_yasg.utils import swagger_auto_schema as decorar
+    with _lock:
+        while _pendientes:
+            metodo, kwargs = _pendientes.pop(0)
+            decorar(**_construir(kwargs))(metodo)
+        while _copias:
+            origen, destino = _copias.pop(0)
+            destino._swagger_auto_schema = origen._swagger_auto_schema
+
+
+def generar():
+    """Esquema OpenAPI de todas las rutas, en JSON (bytes)."""
+    aplicar()
+    from drf_yasg import openapi
+    from drf_yasg.codecs import OpenAPICodecJson
+    from drf_yasg.generators import OpenAPISchemaGenerator
+    esquema = OpenAPISchemaGenerator(openapi.Info(**INFO)).get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[]).encode(esquema)
+
+
+def esquema():
+    """
+    (contenido, etag) del esquema. Se lee una vez por proceso de settings.OPENAPI_ESQUEMA; si el
+    archivo no existe o con DEBUG (el autoreload reinicia el proceso) se genera en el momento.
+    """
+    global _esquema
+    if _esquema is None:
+        ruta = Path(settings.OPENAPI_ESQUEMA)
+        contenido = generar() if settings.DEBUG or not ruta.exists() else ruta.read_bytes()
+        _esquema = (contenido, hashlib.sha256(contenido).hexdigest())
+    return _esquema
+
+
+def descartar():
+    global _esquema
+    _esquema = None
@@ -0,0 +1,82 @@
+import csv
+import json
+
+from .models import Turno
+from .pagination import filtro_keyset
+
+ORDEN = ('fecha', 'hora', 'id')
+COLUMNAS = (
+    'id', 'fecha', 'hora',
+    'cliente_id', 'cliente_nombre', 'cliente_apellido',
+    'empleado_id', 'empleado_nombre', 'empleado_apellido',
+    'servicio_id', 'servicio', 'producto_id', 'producto', 'precio',
+)
+
+
+def turnos_en_rango(desde, hasta, empleado=None, servicio=None, tamanio=2000):
+    """
+    Recorre los turnos del rango en ventanas de `tamanio` filas sobre el indice (fecha, hora).
+    Cada ventana es una consulta acotada, asi que la memoria no depende del total aunque el
+    driver (mysqlclient) traiga cada resultado completo.
+    """
+    queryset = (
+        Turno.objects
+        .filter(fecha__gte=desde, fecha__lte=hasta)
+        .select_related('cliente', 'empleado', 'producto__servicio')
+        .only(
+            'fecha', 'hora',
+            'cliente__nombre', 'cliente__apellido',
+            'empleado__nombre', 'empleado__apellido',
+            'producto__nombre', 'producto__precio', 'producto__servicio__nombre',
+        )
+        .order_by(*ORDEN)
+    )
+    if empleado is not None:
+        queryset = queryset.filter(empleado_id=empleado)
+    if servicio is not None:
+        queryset = queryset.filter(producto__servicio_id=servicio)
+
+    ventana = queryset
+    while True:
+        leidos = 0
+        for turno in ventana[:tamanio].iterator(chunk_size=tamanio):
+            leidos += 1
+            yield turno
+        if leidos < tamanio:
+            return
+        ventana = queryset.filter(filtro_keyset(ORDEN, [turno.fecha, turno.hora, turno.id]))
+
+
+def fila(turno):
+    producto = turno.producto
+    return (
+        turno.id, turno.fecha.isoformat(), turno.hora.isoformat(),
+        turno.cliente_id, turno.cliente.nombre, turno.cliente.apellido,
+        turno.empleado_id, turno.empleado.nombre, turno.empleado.apellido,
+        producto.servicio_id, producto.servicio.nombre, turno.producto_id, producto.nombre, str(producto.precio),
+    )
+
+
+class _Eco:
+    """Pseudo-buffer para csv.writer: devuelve cada linea en vez de guardarla."""
+
+    def write(self, valor):
+        return valor
+
+
+def csv_stream(turnos):
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(COLUMNAS)
+    for turno in turnos:
+        yield escritor.writerow(fila(turno))
+
+
+def ndjson_stream(turnos):
+    for turno in turnos:
+        yield json.dumps(dict(zip(COLUMNAS, fila(turno))), ensure_ascii=False) + '\n'
+
+
+FORMATOS = {
+    'csv': (csv_stream, 'text/csv; charset=utf-8'),
+    'ndjson': (ndjson_stream, 'application/x-ndjson; charset=utf-8'),
+}
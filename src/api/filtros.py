@@ -0,0 +1,68 @@
+import datetime
+from itertools import combinations
+
+from rest_framework.exceptions import APIException
+
+from .documentacion import Parameter, IN_QUERY, TYPE_INTEGER, TYPE_STRING
+from .models import Producto
+
+# Filtros de la lista de turnos: parametro -> (lookup, conversion, mensaje de error).
+# Cada combinacion tiene que resolverse por indice: planes.py las arma todas y
+# verificar_indices (y su test) falla si alguna termina en un scan o un filesort.
+FILTROS_TURNO = {
+    'desde': ('fecha__gte', datetime.date.fromisoformat, 'Las fechas deben tener el formato AAAA-MM-DD'),
+    'hasta': ('fecha__lte', datetime.date.fromisoformat, 'Las fechas deben tener el formato AAAA-MM-DD'),
+    'empleado': ('empleado_id', int, 'El empleado debe ser un numero'),
+    'cliente': ('cliente_id', int, 'El cliente debe ser un numero'),
+    'producto': ('producto_id', int, 'El producto debe ser un numero'),
+    # Por los ids de producto del servicio, para que se use (producto, fecha, hora) sin unir la tabla de productos
+    'servicio': ('producto_id__in', lambda valor: Producto.objects.filter(servicio_id=int(valor)).values('id'),
+                 'El servicio debe ser un numero'),
+}
+
+# Valores aceptados de ?ordering=; el ultimo campo es unico para la paginacion por cursor
+ORDENES_TURNO = {
+    'fecha': ('fecha', 'hora', 'id'),
+    '-fecha': ('-fecha', '-hora', '-id'),
+}
+
+parametros_filtro_turnos = [
+    Parameter('desde', IN_QUERY, description='Fecha minima inclusive (AAAA-MM-DD)', type=TYPE_STRING),
+    Parameter('hasta', IN_QUERY, description='Fecha maxima inclusive (AAAA-MM-DD)', type=TYPE_STRING),
+    Parameter('empleado', IN_QUERY, description='ID del empleado', type=TYPE_INTEGER),
+    Parameter('cliente', IN_QUERY, description='ID del cliente', type=TYPE_INTEGER),
+    Parameter('producto', IN_QUERY, description='ID del producto', type=TYPE_INTEGER),
+    Parameter('servicio', IN_QUERY, description='ID del servicio', type=TYPE_INTEGER),
+    Parameter('ordering', IN_QUERY, description=f'{" o ".join(ORDENES_TURNO)} (por defecto fecha)', type=TYPE_STRING),
+]
+
+
+class FiltroInvalido(APIException):
+    status_code = 400
+    default_code = 'filtro_invalido'
+
+
+def filtrar_turnos(queryset, parametros):
+    """Aplica los filtros de FILTROS_TURNO presentes en `parametros` y devuelve (queryset, ordering)."""
+    filtros = {}
+    for nombre, (lookup, convertir, mensaje) in FILTROS_TURNO.items():
+        if nombre in parametros:
+            try:
+                filtros[lookup] = convertir(parametros[nombre])
+            except ValueError:
+                raise FiltroInvalido({'error': mensaje})
+    if 'fecha__gte' in filtros and 'fecha__lte' in filtros and filtros['fecha__lte'] < filtros['fecha__gte']:
+        raise FiltroInvalido({'error': 'La fecha hasta no puede ser anterior a la fecha desde'})
+    orden = parametros.get('ordering', 'fecha')
+    if orden not in ORDENES_TURNO:
+        raise FiltroInvalido({'error': f'El orden debe ser {" o ".join(ORDENES_TURNO)}'})
+    return queryset.filter(**filtros), ORDENES_TURNO[orden]
+
+
+def combinaciones_de_filtros():
+    """Todas las combinaciones de filtros y ordenes, con valores de ejemplo, para revisar sus planes."""
+    ejemplos = {'desde': '2025-01-01', 'hasta': '2025-01-31', 'empleado': '1', 'cliente': '1', 'producto': '1', 'servicio': '1'}
+    for cantidad in range(len(FILTROS_TURNO) + 1):
+        for nombres in combinations(FILTROS_TURNO, cantidad):
+            for orden in ORDENES_TURNO:
+                yield {**{nombre: ejemplos.get(nombre, '1') for nombre in nombres}, 'ordering': orden}
@@ -0,0 +1,145 @@
+import csv
+import json
+from functools import partial
+from pathlib import Path
+
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from .busqueda import indexar
+from .lote_turnos import guardar_lote, validar_lote
+from .models import Cliente, Empleado, Servicio
+from .serializers import ClienteSerializer, EmpleadoSerializer
+from .validadores import mensaje_unico
+
+
+def _serializer_sin_consultas(serializer_class, unicos, relaciones):
+    """
+    Variante del serializer con las mismas reglas de campos pero sin los UniqueValidator ni los
+    PrimaryKeyRelatedField: la unicidad y las relaciones se verifican en memoria contra datos
+    cargados en bloque.
+    """
+    class Meta(serializer_class.Meta):
+        extra_kwargs = {campo: {'validators': []} for campo in unicos}
+    atributos = {'Meta': Meta}
+    atributos.update({campo: serializers.IntegerField() for campo in relaciones})
+    return type(f'{serializer_class.__name__}Importacion', (serializer_class,), atributos)
+
+
+class ImportadorModelo:
+    """Importa filas de un modelo con unicidad y relaciones verificadas en memoria."""
+
+    def __init__(self, modelo, serializer_class, unicos, relaciones, al_crear=None):
+        self.modelo = modelo
+        # bulk_create no dispara post_save: `al_crear` recibe las instancias creadas en bloque
+        self.al_crear = al_crear
+        self.unicos = unicos
+        self.relaciones = relaciones
+        self.serializer_class = _serializer_sin_consultas(serializer_class, unicos, relaciones)
+        self.vistos = {campo: set() for campo in unicos}
+        for fila in modelo.objects.values_list(*unicos):
+            for campo, valor in zip(unicos, fila):
+                self.vistos[campo].add(valor)
+        self.existentes = {
+            campo: set(relacionado.objects.values_list('pk', flat=True))
+            for campo, relacionado in relaciones.items()
+        }
+
+    def validar(self, filas):
+        instancias, errores = {}, {}
+        for indice, fila in filas:
+            serializer = self.serializer_class(data=fila)
+            if not serializer.is_valid():
+                errores[indice] = serializer.errors
+                continue
+            datos = dict(serializer.validated_data)
+            fallas = {
+                campo: [mensaje_unico(self.modelo, campo)]
+                for campo in self.unicos if datos[campo] in self.vistos[campo]
+            }
+            fallas.update({
+                campo: [str(serializers.PrimaryKeyRelatedField.default_error_messages['does_not_exist']).format(pk_value=datos[campo])]
+                for campo in self.relaciones if datos[campo] not in self.existentes[campo]
+            })
+            if fallas:
+                errores[indice] = fallas
+                continue
+            for campo in self.unicos:
+                self.vistos[campo].add(datos[campo])
+            for campo in self.relaciones:
+                datos[f'{campo}_id'] = datos.pop(campo)
+            instancias[indice] = self.modelo(**datos)
+        return instancias, errores
+
+    def guardar(self, instancias, errores):
+        try:
+            with transaction.atomic():
+                self.modelo.objects.bulk_create(list(instancias.values()))
+                if self.al_crear:
+                    self.al_crear(list(instancias.values()))
+            return len(instancias)
+        except IntegrityError:
+            # Otro proceso inserto algun valor unico mientras tanto: se guarda fila por fila
+            creadas = 0
+            for indice, instancia in instancias.items():
+                try:
+                    with transaction.atomic():
+                        instancia.save()
+                    creadas += 1
+                except IntegrityError as error:
+                    errores[indice] = {'non_field_errors': [str(error)]}
+            return creadas
+
+    def procesar(self, filas):
+        instancias, errores = self.validar(filas)
+        return self.guardar(instancias, errores), errores
+
+
+class ImportadorTurnos:
+
+    def procesar(self, filas):
+        indices = [indice for indice, _ in filas]
+        turnos, errores = validar_lote([fila for _, fila in filas])
+        creados = guardar_lote(turnos, errores, parcial=True)
+        return len(creados), {indices[posicion]: error for posicion, error in errores.items()}
+
+
+def importador(nombre):
+    if nombre == 'cliente':
+        return ImportadorModelo(Cliente, ClienteSerializer, ('usuario', 'email', 'celular', 'nro_socio'), {}, al_crear=partial(indexar, nuevos=True))
+    if nombre == 'empleado':
+        return ImportadorModelo(Empleado, EmpleadoSerializer, ('usuario', 'email', 'legajo'), {'servicio': Servicio})
+    if nombre == 'turno':
+        return ImportadorTurnos()
+    raise ValueError(f'Modelo no soportado: {nombre}')
+
+
+def _leer_csv(ruta):
+    with ruta.open(newline='', encoding='utf-8') as archivo:
+        yield from csv.DictReader(archivo)
+
+
+def _leer_ndjson(ruta):
+    with ruta.open(encoding='utf-8') as archivo:
+        for linea in archivo:
+            if linea.strip():
+                yield json.loads(linea)
+
+
+def _leer_json(ruta):
+    with ruta.open(encoding='utf-8') as archivo:
+        yield from json.load(archivo)
+
+
+LECTORES = {'.csv': _leer_csv, '.jsonl': _leer_ndjson, '.ndjson': _leer_ndjson, '.json': _leer_json}
+
+
+def leer_filas(ruta):
+    """Devuelve un iterador de dicts. Soporta .csv, .json (lista) y .jsonl / .ndjson (un objeto por linea)."""
+    ruta = Path(ruta)
+    lector = LECTORES.get(ruta.suffix.lower())
+    if lector is None:
+        raise ValueError(f'Formato no soportado: {ruta.suffix}')
+    if not ruta.is_file():
+        raise FileNotFoundError(f'No existe el archivo {ruta}')
+    return lector(ruta)
@@ -0,0 +1,63 @@
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Las fechas, horas, Decimal, etc. que no vienen ya como texto del serializer pasan por el mismo
+# default del encoder de DRF, asi que salen con el mismo formato
+OPCIONES = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS) if orjson else 0
+_convertir = JSONEncoder().default
+
+# orjson lee los enteros de mas de 64 bits como float; json los conserva. Con 19 digitos seguidos
+# se usa json (translate + busqueda es bastante mas rapido que una regex)
+A_CEROS = bytes.maketrans(b'0123456789', b'0' * 10)
+DIGITOS_DE_MAS = b'0' * 19
+
+
+def habilitado():
+    return orjson is not None and settings.JSON_RAPIDO
+
+
+class JSONRendererRapido(JSONRenderer):
+    """
+    Mismos bytes que el JSONRenderer de DRF (compacto, sin escapar unicode) armados con orjson.
+    Con indentacion, sin orjson o con JSON_RAPIDO apagado usa el de DRF, igual que con lo que
+    orjson no sabe representar. Solo difieren los float menores a 1e-4 o desde 1e16, que orjson
+    escribe con otra notacion (el mismo valor); la API no los genera.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (not habilitado() or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            contenido = orjson.dumps(data, default=_convertir, option=OPCIONES)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Como DRF: U+2028 y U+2029 escapados, que son fin de linea en JavaScript
+        return contenido.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class JSONParserRapido(JSONParser):
+    """Parser JSON con orjson; ante cualquier error vuelve al de DRF, que da el mismo ParseError."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        codificacion = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if not habilitado() or codificacion.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        contenido = stream.read()
+        if DIGITOS_DE_MAS not in contenido.translate(A_CEROS):
+            try:
+                return orjson.loads(contenido)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(contenido), media_type, parser_context)
@@ -0,0 +1,127 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework.relations import PrimaryKeyRelatedField
+
+from .analitica import clave, sumar
+from .models import Cliente, Empleado, Producto, Turno
+from .serializers import TurnoLoteSerializer
+
+RELACIONES = {'cliente': Cliente, 'empleado': Empleado, 'producto': Producto}
+MENSAJE_NO_EXISTE = PrimaryKeyRelatedField.default_error_messages['does_not_exist']
+MENSAJE_OCUPADO = 'El empleado o el cliente ya tiene un turno en ese horario'
+MENSAJE_CONCURRENTE = 'Otra reserva tomo uno de los horarios del lote, no se guardo ningun turno'
+
+
+def _existentes(validos):
+    """Ids existentes por relacion: una consulta IN por modelo."""
+    existentes = {}
+    for campo, modelo in RELACIONES.items():
+        ids = {datos[campo] for datos in validos.values()}
+        existentes[campo] = set(modelo.objects.filter(pk__in=ids).values_list('pk', flat=True)) if ids else set()
+    return existentes
+
+
+def _ocupados(validos):
+    """Horarios ya tomados por los empleados y clientes del lote, con una sola consulta por rango."""
+    if not validos:
+        return set(), set()
+    fechas = {datos['fecha'] for datos in validos.values()}
+    filas = Turno.objects.filter(
+        Q(empleado_id__in={datos['empleado'] for datos in validos.values()})
+        | Q(cliente_id__in={datos['cliente'] for datos in validos.values()}),
+        fecha__gte=min(fechas), fecha__lte=max(fechas),
+    ).values_list('empleado_id', 'cliente_id', 'fecha', 'hora')
+    empleados, clientes = set(), set()
+    for empleado_id, cliente_id, fecha, hora in filas:
+        empleados.add((empleado_id, fecha, hora))
+        clientes.add((cliente_id, fecha, hora))
+    return empleados, clientes
+
+
+def validar_lote(items):
+    """
+    Valida una lista de turnos sin consultas por item. Devuelve ({indice: Turno}, {indice: errores})
+    con los errores en el mismo formato que TurnoSerializer.
+    """
+    validos, errores = {}, {}
+    for indice, item in enumerate(items):
+        serializer = TurnoLoteSerializer(data=item)
+        if serializer.is_valid():
+            validos[indice] = serializer.validated_data
+        else:
+            errores[indice] = serializer.errors
+
+    existentes = _existentes(validos)
+    empleados_ocupados, clientes_ocupados = _ocupados(validos)
+    turnos = {}
+    for indice, datos in validos.items():
+        faltantes = {
+            campo: [str(MENSAJE_NO_EXISTE).format(pk_value=datos[campo])]
+            for campo in RELACIONES if datos[campo] not in existentes[campo]
+        }
+        if faltantes:
+            errores[indice] = faltantes
+            continue
+        clave_empleado = (datos['empleado'], datos['fecha'], datos['hora'])
+        clave_cliente = (datos['cliente'], datos['fecha'], datos['hora'])
+        if clave_empleado in empleados_ocupados or clave_cliente in clientes_ocupados:
+            errores[indice] = {'non_field_errors': [MENSAJE_OCUPADO]}
+            continue
+        # Los items siguientes del mismo lote tampoco pueden tomar este horario
+        empleados_ocupados.add(clave_empleado)
+        clientes_ocupados.add(clave_cliente)
+        turnos[indice] = Turno(
+            cliente_id=datos['cliente'], empleado_id=datos['empleado'], producto_id=datos['producto'],
+            fecha=datos['fecha'], hora=datos['hora'],
+        )
+    return turnos, errores
+
+
+def _completar_ids(turnos):
+    # En MySQL bulk_create no devuelve las claves; se recuperan con una consulta por rango
+    faltantes = [turno for turno in turnos if turno.pk is None]
+    if not faltantes:
+        return
+    fechas = [turno.fecha for turno in faltantes]
+    ids = {
+        (empleado_id, fecha, hora): pk
+        for pk, empleado_id, fecha, hora in Turno.objects.filter(
+            empleado_id__in={turno.empleado_id for turno in faltantes},
+            fecha__gte=min(fechas), fecha__lte=max(fechas),
+        ).values_list('pk', 'empleado_id', 'fecha', 'hora')
+    }
+    for turno in faltantes:
+        turno.pk = ids.get((turno.empleado_id, turno.fecha, turno.hora))
+
+
+def guardar_lote(turnos, errores, parcial, tamanio_lote=1000):
+    """
+    Inserta los turnos validos con bulk_create dentro de una transaccion.
+    En modo todo-o-nada no se escribe nada si hay algun error. Si otra transaccion toma un
+    horario entre la validacion y el insert, en modo parcial se reintenta fila por fila.
+    Devuelve la lista de turnos creados.
+    """
+    if errores and not parcial:
+        return []
+    pendientes = [turnos[indice] for indice in sorted(turnos)]
+    try:
+        with transaction.atomic():
+            Turno.objects.bulk_create(pendientes, batch_size=tamanio_lote)
+            # bulk_create no dispara las senales que mantienen el resumen diario
+            sumar(clave(turno) for turno in pendientes)
+    except IntegrityError:
+        if not parcial:
+            for indice in turnos:
+                errores[indice] = {'non_field_errors': [MENSAJE_CONCURRENTE]}
+            return []
+        creados = []
+        for indice in sorted(turnos):
+            try:
+                with transaction.atomic():
+                    turnos[indice].save()
+                creados.append(turnos[indice])
+            except IntegrityError:
+                errores[indice] = {'non_field_errors': [MENSAJE_OCUPADO]}
+        return creados
+    _completar_ids(pendientes)
+    return pendientes
@@ -0,0 +1,187 @@
+import datetime
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import Client, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.benchmark import arranque, autenticacion, codificacion_json, comparar, escrituras, escenarios, medir, muestras, rutas_sin_escenario, throughput_listados
+from api.datos_sinteticos import sembrar
+from api.models import Cliente, Empleado, Producto, Servicio, Turno
+
+DESDE = datetime.date(2025, 1, 1)
+
+
+def usar_sqlite(ruta):
+    """Apunta la conexion por defecto a un archivo SQLite descartable, sin tocar la base configurada."""
+    connections.close_all()
+    connections.settings[DEFAULT_DB_ALIAS] = connections.configure_settings({DEFAULT_DB_ALIAS: {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ruta,
+        # El archivo es descartable: se evita el fsync, pero se conserva el journal para poder hacer rollback
+        'OPTIONS': {'init_command': 'PRAGMA journal_mode=MEMORY; PRAGMA synchronous=OFF;'},
+    }})[DEFAULT_DB_ALIAS]
+    try:
+        del connections[DEFAULT_DB_ALIAS]
+    except AttributeError:
+        pass
+
+
+class Command(BaseCommand):
+    help = ('Siembra un dataset sintetico en una base SQLite descartable, recorre todas las rutas de api/urls.py '
+            'con un JWT y reporta latencias p50/p95/p99, consultas y tamanio de respuesta por endpoint')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--servicios', type=int, default=50)
+        parser.add_argument('--productos', type=int, default=2000)
+        parser.add_argument('--clientes', type=int, default=100000)
+        parser.add_argument('--empleados', type=int, default=500)
+        parser.add_argument('--turnos', type=int, default=2000000)
+        parser.add_argument('--repeticiones', type=int, default=30, help='Mediciones por endpoint')
+        parser.add_argument('--db', help='Archivo SQLite a usar; si ya tiene datos no se vuelve a sembrar y no se borra al terminar')
+        parser.add_argument('--salida', default='bench.json', help='Archivo JSON con los resultados')
+        parser.add_argument('--baseline', help='Resultados anteriores contra los que comparar')
+        parser.add_argument('--tolerancia', type=float, default=0.2,
+                            help='Aumento de p95 permitido respecto de la linea base (0.2 = 20%%)')
+        parser.add_argument('--solo', nargs='+', metavar='RUTA', help='Medir solo estas rutas')
+        parser.add_argument('--listados', type=int, default=1000, metavar='FILAS',
+                            help='Filas por listado para comparar el serializer con la lectura rapida (0 para omitir)')
+
+    def handle(self, *args, **options):
+        base = None
+        if options['baseline']:
+            try:
+                base = json.loads(Path(options['baseline']).read_text())['endpoints']
+            except (OSError, ValueError, KeyError) as error:
+                raise CommandError(f'Linea base invalida: {error}')
+
+        ruta = options['db']
+        descartable = ruta is None
+        if descartable:
+            descriptor, ruta = tempfile.mkstemp(suffix='.sqlite3', prefix='bench_')
+            os.close(descriptor)
+        try:
+            usar_sqlite(ruta)
+            call_command('migrate', verbosity=0, interactive=False)
+            dataset = self.preparar(options)
+            resultados = self.medir_todo(options)
+            rendimiento = self.medir_listados(options['listados']) if options['listados'] else {}
+            codificacion = self.medir_json(options['listados']) if options['listados'] else {}
+            usuario_jwt = self.medir_autenticacion()
+            inicio = self.medir_arranque()
+            altas = self.medir_escrituras()
+        finally:
+            connections.close_all()
+            if descartable:
+                os.remove(ruta)
+
+        Path(options['salida']).write_text(json.dumps({
+            'fecha': datetime.datetime.now().isoformat(timespec='seconds'),
+            'dataset': dataset,
+            'repeticiones': options['repeticiones'],
+            'endpoints': resultados,
+            'listados': rendimiento,
+            'json': codificacion,
+            'autenticacion': usuario_jwt,
+            'arranque': inicio,
+            'escrituras': altas,
+        }, indent=2))
+        self.stdout.write(self.style.SUCCESS(f'Resultados guardados en {options["salida"]}'))
+
+        if base is not None:
+            lineas, regresiones = comparar(resultados, base, options['tolerancia'])
+            for linea in lineas:
+                self.stdout.write(linea)
+            if regresiones:
+                raise CommandError('Regresiones respecto de la linea base:\n' + '\n'.join(regresiones))
+
+    def preparar(self, options):
+        claves = ('servicios', 'productos', 'clientes', 'empleados', 'turnos')
+        if Turno.objects.exists():
+            self.stdout.write(f'Usando los datos existentes en {connection.settings_dict["NAME"]}')
+        else:
+            self.stdout.write('Sembrando datos sinteticos...')
+            try:
+                sembrar(desde=DESDE, **{clave: options[clave] for clave in claves})
+            except ValueError as error:
+                raise CommandError(error)
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        modelos = (Servicio, Producto, Cliente, Empleado, Turno)
+        return {clave: modelo.objects.count() for clave, modelo in zip(claves, modelos)}
+
+    def medir_todo(self, options):
+        usuario, _ = User.objects.get_or_create(username='bench')
+        cliente = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(usuario)}')
+        cache.clear()
+
+        por_ruta = escenarios(muestras(DESDE))
+        faltantes = rutas_sin_escenario(por_ruta)
+        if faltantes:
+            raise CommandError(f'Rutas sin escenario de benchmark: {", ".join(faltantes)}')
+        rutas = options['solo'] or list(por_ruta)
+
+        resultados = {}
+        self.stdout.write(f'{"endpoint":<28} {"estado":>6} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"consultas":>9} {"bytes":>9}')
+        # Un solo usuario hace todas las peticiones: sin la cubeta, que lo frenaria con 429
+        with override_settings(ALLOWED_HOSTS=['testserver'], ADMISION_CUBETA=None):
+            for nombre in rutas:
+                if nombre not in por_ruta:
+                    raise CommandError(f'Ruta desconocida: {nombre}')
+                for escenario in por_ruta[nombre]:
+                    medicion = medir(cliente, escenario, options['repeticiones'])
+                    resultados[escenario.nombre] = medicion
+                    self.stdout.write(
+                        f'{escenario.nombre:<28} {medicion["estado"]:>6} {medicion["p50_ms"]:>8.2f} {medicion["p95_ms"]:>8.2f} '
+                        f'{medicion["p99_ms"]:>8.2f} {medicion["consultas"]:>9} {medicion["bytes"]:>9}'
+                    )
+        return resultados
+
+    def medir_autenticacion(self):
+        resultados = autenticacion(User.objects.get(username='bench'))
+        for nombre, medicion in resultados.items():
+            self.stdout.write(f'usuario del token ({nombre}): {medicion["consultas"]} consultas, {medicion["us"]:.1f} us por peticion')
+        return resultados
+
+    def medir_arranque(self):
+        resultados = arranque()
+        for nombre, medicion in resultados.items():
+            self.stdout.write(f'arranque de un worker ({nombre}): {medicion["ms"]:.1f} ms, {medicion["rss_mb"]:.1f} MB de RSS')
+        return resultados
+
+    def medir_escrituras(self):
+        resultados = escrituras()
+        for nombre, variantes in resultados.items():
+            for variante, medicion in variantes.items():
+                self.stdout.write(f'altas de {nombre} ({variante}): {medicion["escrituras_s"]}/s, {medicion["consultas"]} consultas por alta')
+        return resultados
+
+    def medir_json(self, filas):
+        resultados = codificacion_json(filas)
+        self.stdout.write(f'{"json":<10} {"bytes":>9} {"gzip":>8} {"br":>8} {"render ms":>10} {"rapido ms":>10} {"parse ms":>9} {"rapido ms":>10}')
+        for nombre, medicion in resultados.items():
+            self.stdout.write(
+                f'{nombre:<10} {medicion["bytes"]:>9} {medicion["bytes_gzip"]:>8} {medicion.get("bytes_br", "-"):>8} '
+                f'{medicion["render_ms"]:>10.2f} {medicion["render_rapido_ms"]:>10.2f} '
+                f'{medicion["parse_ms"]:>9.2f} {medicion["parse_rapido_ms"]:>10.2f}'
+            )
+            if not medicion['iguales']:
+                raise CommandError(f'json_rapido no genera la misma salida que DRF para {nombre}')
+        return resultados
+
+    def medir_listados(self, filas):
+        resultados = throughput_listados(filas)
+        self.stdout.write(f'{"listado":<10} {"filas":>7} {"serializer/s":>13} {"rapido/s":>10} {"x":>6}')
+        for nombre, medicion in resultados.items():
+            self.stdout.write(
+                f'{nombre:<10} {medicion["filas"]:>7} {medicion["serializer_filas_s"]:>13} '
+                f'{medicion["rapido_filas_s"]:>10} {medicion["aceleracion"]:>6.2f}'
+            )
+        return resultados
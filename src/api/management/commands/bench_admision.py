@@ -0,0 +1,126 @@
+import datetime
+import http.client
+import logging
+import os
+import statistics
+import tempfile
+import threading
+import time
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.admision import compuertas
+from api.datos_sinteticos import sembrar
+from api.management.commands.bench import usar_sqlite
+from api.models import Turno
+
+
+class ServidorConHilos(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class SinLog(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def _cliente(puerto, ruta, cabeceras, fin, latencias, estados):
+    while time.perf_counter() < fin:
+        conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=60)
+        inicio = time.perf_counter()
+        try:
+            conexion.request('GET', ruta, headers=cabeceras)
+            respuesta = conexion.getresponse()
+            respuesta.read()
+            estado = respuesta.status
+        except OSError:
+            estado = 0
+        finally:
+            conexion.close()
+        latencias.append((estado, time.perf_counter() - inicio))
+        estados[estado] = estados.get(estado, 0) + 1
+
+
+def cargar(puerto, ruta, token, concurrencia, duracion):
+    """Peticiones GET a `ruta` desde `concurrencia` hilos durante `duracion` segundos."""
+    cabeceras = {'Authorization': f'Bearer {token}', 'Accept': 'application/json'}
+    latencias, estados = [], {}
+    fin = time.perf_counter() + duracion
+    hilos = [
+        threading.Thread(target=_cliente, args=(puerto, ruta, cabeceras, fin, latencias, estados))
+        for _ in range(concurrencia)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return latencias, estados
+
+
+def _p(valores, percentil):
+    if len(valores) < 2:
+        return valores[0] * 1000 if valores else 0
+    return statistics.quantiles(valores, n=100)[percentil - 1] * 1000
+
+
+class Command(BaseCommand):
+    help = ('Prueba de carga local del control de admision: levanta un servidor WSGI con hilos sobre una SQLite '
+            'sembrada, lo satura con peticiones GET y compara las latencias sin y con ADMISION_HABILITADA')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ruta', default='/turnos/', help='Ruta a cargar')
+        parser.add_argument('--concurrencia', type=int, default=64, help='Clientes simultaneos')
+        parser.add_argument('--duracion', type=float, default=10, help='Segundos por medicion')
+        parser.add_argument('--limite', type=int, default=4, help='Lecturas simultaneas admitidas por clase')
+        parser.add_argument('--turnos', type=int, default=20000, help='Turnos a sembrar')
+
+    def handle(self, *args, **options):
+        descriptor, ruta = tempfile.mkstemp(suffix='.sqlite3', prefix='bench_admision_')
+        os.close(descriptor)
+        try:
+            usar_sqlite(ruta)
+            call_command('migrate', verbosity=0, interactive=False)
+            sembrar(servicios=5, productos=20, clientes=500, empleados=20, turnos=options['turnos'],
+                    desde=datetime.date(2025, 1, 1))
+            token = str(AccessToken.for_user(User.objects.create_user(username='bench_admision')))
+            self.stdout.write(f'{Turno.objects.count()} turnos; {options["concurrencia"]} clientes contra {options["ruta"]}')
+            self.stdout.write(f'{"modo":<14} {"req/s":>8} {"p50 ms":>8} {"p99 ms":>9} {"max ms":>9} {"503":>6} {"otros":>6}')
+            # Cada 503 se registraria como error en django.request
+            logging.getLogger('django.request').disabled = True
+            for modo, habilitada in (('sin_admision', False), ('con_admision', True)):
+                self.medir(modo, habilitada, token, options)
+        finally:
+            logging.getLogger('django.request').disabled = False
+            connections.close_all()
+            os.remove(ruta)
+
+    def medir(self, modo, habilitada, token, options):
+        limites = {'lectura': options['limite'], 'escritura': options['limite']}
+        with override_settings(ALLOWED_HOSTS=['127.0.0.1'], ADMISION_HABILITADA=habilitada, ADMISION_CUBETA=None,
+                               ADMISION_CONCURRENCIA=limites, ADMISION_CONCURRENCIA_POR_CLASE={}):
+            compuertas.limpiar()
+            servidor = make_server('127.0.0.1', 0, WSGIHandler(), server_class=ServidorConHilos, handler_class=SinLog)
+            hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+            hilo.start()
+            try:
+                latencias, estados = cargar(servidor.server_port, options['ruta'], token,
+                                            options['concurrencia'], options['duracion'])
+            finally:
+                servidor.shutdown()
+                servidor.server_close()
+        exitosas = sorted(duracion for estado, duracion in latencias if estado == 200)
+        rechazadas = estados.get(503, 0)
+        otros = sum(cantidad for estado, cantidad in estados.items() if estado not in (200, 503))
+        self.stdout.write(
+            f'{modo:<14} {len(exitosas) / options["duracion"]:>8.1f} {_p(exitosas, 50):>8.1f} {_p(exitosas, 99):>9.1f} '
+            f'{(exitosas[-1] * 1000 if exitosas else 0):>9.1f} {rechazadas:>6} {otros:>6}'
+        )
@@ -0,0 +1,97 @@
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+async def _peticion(lector, escritor, pedido):
+    escritor.write(pedido)
+    await escritor.drain()
+    cabecera = await lector.readuntil(b'\r\n\r\n')
+    estado = int(cabecera.split(b' ', 2)[1])
+    largo = 0
+    for linea in cabecera.split(b'\r\n'):
+        if linea.lower().startswith(b'content-length:'):
+            largo = int(linea.split(b':', 1)[1])
+    if largo:
+        await lector.readexactly(largo)
+    return estado
+
+
+async def _cliente(host, puerto, pedido, fin, latencias, errores):
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    try:
+        while time.perf_counter() < fin:
+            inicio = time.perf_counter()
+            try:
+                estado = await _peticion(lector, escritor, pedido)
+            except (OSError, asyncio.IncompleteReadError):
+                errores.append(0)
+                escritor.close()
+                lector, escritor = await asyncio.open_connection(host, puerto)
+                continue
+            if estado >= 400:
+                errores.append(estado)
+            else:
+                latencias.append(time.perf_counter() - inicio)
+    finally:
+        escritor.close()
+
+
+async def medir(url, token, concurrencia, duracion):
+    partes = urlsplit(url)
+    ruta = partes.path or '/'
+    if partes.query:
+        ruta += '?' + partes.query
+    cabeceras = [f'GET {ruta} HTTP/1.1', f'Host: {partes.netloc}', 'Connection: keep-alive', 'Accept: application/json']
+    if token:
+        cabeceras.append(f'Authorization: Bearer {token}')
+    pedido = ('\r\n'.join(cabeceras) + '\r\n\r\n').encode()
+    latencias, errores = [], []
+    fin = time.perf_counter() + duracion
+    await asyncio.gather(*(
+        _cliente(partes.hostname, partes.port or 80, pedido, fin, latencias, errores)
+        for _ in range(concurrencia)
+    ))
+    return latencias, errores
+
+
+class Command(BaseCommand):
+    help = ('Genera carga HTTP concurrente contra uno o mas servidores ya levantados (por ejemplo gunicorn '
+            'con config.wsgi y uvicorn con config.asgi) y reporta peticiones por segundo y latencias p50/p99')
+
+    def add_arguments(self, parser):
+        parser.add_argument('objetivos', nargs='+', metavar='NOMBRE=URL',
+                            help='Servidores a comparar, por ejemplo wsgi=http://127.0.0.1:8000/turnos/')
+        parser.add_argument('--token', default='', help='Token JWT de acceso')
+        parser.add_argument('--concurrencias', default='50,100,250,500',
+                            help='Conexiones simultaneas a probar, separadas por coma')
+        parser.add_argument('--duracion', type=float, default=10, help='Segundos por medicion')
+
+    def handle(self, *args, **options):
+        objetivos = []
+        for objetivo in options['objetivos']:
+            nombre, _, url = objetivo.partition('=')
+            if not url.startswith('http://'):
+                raise CommandError(f'Objetivo invalido: {objetivo} (se espera NOMBRE=http://...)')
+            objetivos.append((nombre, url))
+        try:
+            concurrencias = [int(valor) for valor in options['concurrencias'].split(',')]
+        except ValueError:
+            raise CommandError('Las concurrencias deben ser numeros separados por coma')
+
+        self.stdout.write(f'{"servidor":<10} {"conexiones":>10} {"req/s":>10} {"p50 ms":>8} {"p99 ms":>8} {"errores":>8}')
+        for nombre, url in objetivos:
+            for concurrencia in concurrencias:
+                latencias, errores = asyncio.run(medir(url, options['token'], concurrencia, options['duracion']))
+                if len(latencias) > 1:
+                    cuantiles = statistics.quantiles(latencias, n=100)
+                    p50, p99 = cuantiles[49] * 1000, cuantiles[98] * 1000
+                else:
+                    p50 = p99 = 0
+                self.stdout.write(
+                    f'{nombre:<10} {concurrencia:>10} {len(latencias) / options["duracion"]:>10.1f} '
+                    f'{p50:>8.1f} {p99:>8.1f} {len(errores):>8}'
+                )
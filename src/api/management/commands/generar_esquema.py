@@ -0,0 +1,19 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api import documentacion
+
+
+class Command(BaseCommand):
+    help = 'Genera el esquema OpenAPI que sirven /openapi.json, /swagger/ y /redoc/ (correr en cada deploy)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--salida', default=settings.OPENAPI_ESQUEMA, help='Por defecto settings.OPENAPI_ESQUEMA')
+
+    def handle(self, *args, **options):
+        contenido = documentacion.generar()
+        Path(options['salida']).write_bytes(contenido)
+        documentacion.descartar()
+        self.stdout.write(self.style.SUCCESS(f'Esquema guardado en {options["salida"]} ({len(contenido)} bytes)'))
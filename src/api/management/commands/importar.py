@@ -0,0 +1,73 @@
+import itertools
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.importacion import importador, leer_filas
+
+
+class Command(BaseCommand):
+    help = 'Importa clientes, empleados o turnos desde CSV / JSON en lotes con bulk_create'
+
+    def add_arguments(self, parser):
+        parser.add_argument('modelo', choices=['cliente', 'empleado', 'turno'])
+        parser.add_argument('archivo', help='Archivo .csv, .json, .jsonl o .ndjson')
+        parser.add_argument('--lote', type=int, default=1000, help='Filas por transaccion')
+        parser.add_argument('--checkpoint', help='Archivo donde se guarda el avance; si existe la importacion se reanuda desde ahi')
+        parser.add_argument('--rechazados', help='Archivo NDJSON donde se escriben las filas rechazadas con sus errores')
+
+    def handle(self, *args, **options):
+        try:
+            filas = leer_filas(options['archivo'])
+            imp = importador(options['modelo'])
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+
+        checkpoint = Path(options['checkpoint']) if options['checkpoint'] else None
+        procesadas = self.leer_checkpoint(checkpoint, options)
+        if procesadas:
+            self.stdout.write(f'Reanudando desde la fila {procesadas}')
+        numeradas = itertools.islice(enumerate(filas, start=1), procesadas, None)
+        rechazados = open(options['rechazados'], 'a', encoding='utf-8') if options['rechazados'] else None
+
+        creadas = rechazadas = 0
+        inicio = time.perf_counter()
+        try:
+            while True:
+                lote = list(itertools.islice(numeradas, options['lote']))
+                if not lote:
+                    break
+                cantidad, errores = imp.procesar(lote)
+                creadas += cantidad
+                rechazadas += len(errores)
+                if rechazados:
+                    for numero in sorted(errores):
+                        rechazados.write(json.dumps({'fila': numero, 'errores': errores[numero]}, ensure_ascii=False, default=str) + '\n')
+                    rechazados.flush()
+                procesadas = lote[-1][0]
+                if checkpoint:
+                    checkpoint.write_text(json.dumps({
+                        'modelo': options['modelo'], 'archivo': str(options['archivo']), 'procesadas': procesadas,
+                    }))
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'{procesadas} filas procesadas')
+        finally:
+            if rechazados:
+                rechazados.close()
+
+        duracion = time.perf_counter() - inicio
+        por_segundo = creadas / duracion if duracion else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'{creadas} {options["modelo"]}s importados, {rechazadas} filas rechazadas '
+            f'en {duracion:.2f}s ({por_segundo:.0f} filas/s)'
+        ))
+
+    def leer_checkpoint(self, checkpoint, options):
+        if not checkpoint or not checkpoint.exists():
+            return 0
+        datos = json.loads(checkpoint.read_text())
+        if datos.get('modelo') != options['modelo'] or datos.get('archivo') != str(options['archivo']):
+            raise CommandError(f'El checkpoint {checkpoint} corresponde a otra importacion')
+        return datos['procesadas']
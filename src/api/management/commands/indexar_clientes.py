@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.busqueda import reindexar_todos
+
+
+class Command(BaseCommand):
+    help = 'Regenera los terminos de busqueda de todos los clientes (para datos cargados sin pasar por save())'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Clientes por tanda')
+
+    def handle(self, *args, **options):
+        total = reindexar_todos(options['lote'])
+        self.stdout.write(self.style.SUCCESS(f'{total} clientes indexados'))
@@ -0,0 +1,36 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from api.analitica import reconstruir
+from api.models import Turno
+
+
+def fecha(valor):
+    try:
+        return datetime.date.fromisoformat(valor)
+    except ValueError:
+        raise CommandError(f'Fecha invalida: {valor} (se espera AAAA-MM-DD)')
+
+
+class Command(BaseCommand):
+    help = ('Regenera el resumen diario de turnos (analitica) de un rango de fechas; por defecto de todos los turnos. '
+            'Hace falta para turnos cargados sin pasar por save(), como QuerySet.update() o SQL directo')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', type=fecha, help='AAAA-MM-DD, por defecto la fecha del primer turno')
+        parser.add_argument('--hasta', type=fecha, help='AAAA-MM-DD inclusive, por defecto la fecha del ultimo turno')
+        parser.add_argument('--dias', type=int, default=31, help='Dias por transaccion')
+
+    def handle(self, *args, **options):
+        extremos = Turno.objects.aggregate(primero=Min('fecha'), ultimo=Max('fecha'))
+        desde = options['desde'] or extremos['primero']
+        hasta = options['hasta'] or extremos['ultimo']
+        if desde is None or hasta is None:
+            self.stdout.write('No hay turnos que resumir')
+            return
+        if hasta < desde:
+            raise CommandError('La fecha hasta no puede ser anterior a la fecha desde')
+        total = reconstruir(desde, hasta, dias_por_tanda=options['dias'])
+        self.stdout.write(self.style.SUCCESS(f'{total} filas de resumen entre {desde} y {hasta}'))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.datos_sinteticos import sembrar
+from api.planes import consultas_clave, filtros_de_turnos, problemas_de_plan
+
+
+class Deshacer(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta EXPLAIN sobre las consultas clave y los filtros de Turno y falla si alguna no usa indice'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sembrar', type=int, default=0, metavar='TURNOS',
+                            help='Carga TURNOS turnos sinteticos antes de analizar y los descarta al terminar')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                if options['sembrar']:
+                    sembrar(clientes=max(options['sembrar'] // 10, 10), turnos=options['sembrar'])
+                    # En MySQL ANALYZE TABLE hace commit implicito; InnoDB recalcula sus estadisticas solo
+                    if connection.vendor == 'sqlite':
+                        with connection.cursor() as cursor:
+                            cursor.execute('ANALYZE')
+                fallas = self.analizar()
+                raise Deshacer
+        except Deshacer:
+            pass
+        if fallas:
+            raise CommandError('Consultas sin indice:\n' + '\n'.join(fallas))
+        self.stdout.write(self.style.SUCCESS('Todas las consultas clave usan indices'))
+
+    def analizar(self):
+        fallas = []
+        consultas = [(nombre, queryset, True) for nombre, queryset in consultas_clave().items()]
+        consultas += [(nombre, queryset, False) for nombre, queryset in filtros_de_turnos().items()]
+        for nombre, queryset, recorrer_indice in consultas:
+            problemas = problemas_de_plan(queryset, recorrer_indice=recorrer_indice)
+            estado = self.style.ERROR('FALLA') if problemas else self.style.SUCCESS('OK')
+            self.stdout.write(f'{estado} {nombre}')
+            fallas.extend(f'{nombre}: {problema}' for problema in problemas)
+        return fallas
@@ -0,0 +1,227 @@
+import threading
+from contextvars import ContextVar
+from functools import wraps
+from inspect import iscoroutinefunction
+from time import perf_counter
+
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+# Limites de los buckets del histograma de latencia, en segundos
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Metodos que se usan como etiqueta; cualquier otro (los elige el cliente) se agrupa en OTHER
+METODOS = ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS', 'TRACE', 'CONNECT')
+
+
+class Medicion:
+    __slots__ = ('inicio', 'consultas', 'db', 'serializacion', 'render', 'inicio_render')
+
+    def __init__(self):
+        self.inicio = perf_counter()
+        self.consultas = 0
+        self.db = 0.0
+        self.serializacion = 0.0
+        self.render = 0.0
+        self.inicio_render = None
+
+
+# Contextvar y no threading.local: sync_to_async copia el contexto, asi que las consultas de
+# las vistas async que corren en otro hilo se suman a la peticion correcta
+_actual = ContextVar('medicion', default=None)
+_serializando = ContextVar('serializando', default=False)
+
+
+def registrar_consulta(execute, sql, params, many, context):
+    medicion = _actual.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    inicio = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicion.consultas += 1
+        medicion.db += perf_counter() - inicio
+
+
+def instalar(sender, connection, **kwargs):
+    """Receptor de connection_created: mide todas las consultas de cada conexion nueva."""
+    if registrar_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(registrar_consulta)
+
+
+def medir_serializacion(funcion):
+    """Suma el tiempo de `funcion` a la serializacion de la peticion, para lo que no pasa por un serializer."""
+    @wraps(funcion)
+    def envoltura(*args, **kwargs):
+        medicion = _actual.get()
+        if medicion is None or _serializando.get():
+            return funcion(*args, **kwargs)
+        token = _serializando.set(True)
+        inicio = perf_counter()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            medicion.serializacion += perf_counter() - inicio
+            _serializando.reset(token)
+    return envoltura
+
+
+class SerializacionMedida:
+    """Mixin para serializers: suma el tiempo de to_representation del serializer de mas afuera."""
+
+    def to_representation(self, instance):
+        medicion = _actual.get()
+        if medicion is None or _serializando.get():
+            return super().to_representation(instance)
+        token = _serializando.set(True)
+        inicio = perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            medicion.serializacion += perf_counter() - inicio
+            _serializando.reset(token)
+
+
+class Agregado:
+    __slots__ = ('peticiones', 'buckets', 'segundos', 'consultas', 'db', 'serializacion', 'render')
+
+    def __init__(self):
+        self.peticiones = 0
+        self.buckets = [0] * len(BUCKETS)
+        self.segundos = 0.0
+        self.consultas = 0
+        self.db = 0.0
+        self.serializacion = 0.0
+        self.render = 0.0
+
+
+class Registro:
+    """Agregados por (nombre de ruta, metodo) del proceso actual."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.agregados = {}
+
+    def sumar(self, ruta, metodo, duracion, medicion):
+        with self.lock:
+            agregado = self.agregados.get((ruta, metodo))
+            if agregado is None:
+                agregado = self.agregados[(ruta, metodo)] = Agregado()
+            agregado.peticiones += 1
+            agregado.segundos += duracion
+            for posicion, limite in enumerate(BUCKETS):
+                if duracion <= limite:
+                    agregado.buckets[posicion] += 1
+                    break
+            agregado.consultas += medicion.consultas
+            agregado.db += medicion.db
+            agregado.serializacion += medicion.serializacion
+            agregado.render += medicion.render
+
+    def limpiar(self):
+        with self.lock:
+            self.agregados.clear()
+
+    def exportar(self):
+        """Texto en formato de exposicion de Prometheus (version 0.0.4)."""
+        with self.lock:
+            agregados = sorted(self.agregados.items())
+            lineas = [
+                '# HELP api_peticion_duracion_segundos Duracion de las peticiones por ruta.',
+                '# TYPE api_peticion_duracion_segundos histogram',
+            ]
+            for (ruta, metodo), agregado in agregados:
+                etiquetas = f'ruta="{ruta}",metodo="{metodo}"'
+                acumulado = 0
+                for limite, cantidad in zip(BUCKETS, agregado.buckets):
+                    acumulado += cantidad
+                    lineas.append(f'api_peticion_duracion_segundos_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+                lineas.append(f'api_peticion_duracion_segundos_bucket{{{etiquetas},le="+Inf"}} {agregado.peticiones}')
+                lineas.append(f'api_peticion_duracion_segundos_sum{{{etiquetas}}} {agregado.segundos:.6f}')
+                lineas.append(f'api_peticion_duracion_segundos_count{{{etiquetas}}} {agregado.peticiones}')
+            for nombre, campo, ayuda in CONTADORES:
+                lineas.append(f'# HELP {nombre} {ayuda}')
+                lineas.append(f'# TYPE {nombre} counter')
+                for (ruta, metodo), agregado in agregados:
+                    valor = getattr(agregado, campo)
+                    valor = f'{valor:.6f}' if isinstance(valor, float) else valor
+                    lineas.append(f'{nombre}{{ruta="{ruta}",metodo="{metodo}"}} {valor}')
+        return '\n'.join(lineas) + '\n'
+
+
+CONTADORES = (
+    ('api_consultas_sql_total', 'consultas', 'Consultas SQL ejecutadas.'),
+    ('api_db_segundos_total', 'db', 'Tiempo en la base de datos.'),
+    ('api_serializacion_segundos_total', 'serializacion', 'Tiempo serializando respuestas.'),
+    ('api_render_segundos_total', 'render', 'Tiempo renderizando respuestas.'),
+)
+
+registro = Registro()
+
+
+def server_timing(medicion, total):
+    return (
+        f'db;dur={medicion.db * 1000:.1f};desc="{medicion.consultas} consultas", '
+        f'ser;dur={medicion.serializacion * 1000:.1f}, '
+        f'render;dur={medicion.render * 1000:.1f}, '
+        f'total;dur={total * 1000:.1f}'
+    )
+
+
+class MetricasMiddleware:
+    """
+    Mide consultas SQL, tiempo de base, de serializacion y de render de cada peticion, los
+    devuelve en el header Server-Timing y los agrega por nombre de ruta para /metrics.
+    Los agregados son por proceso: con varios workers cada uno expone los suyos.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICAS_HABILITADAS', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        medicion = Medicion()
+        token = _actual.set(medicion)
+        try:
+            respuesta = self.get_response(request)
+        finally:
+            _actual.reset(token)
+        return self.terminar(request, respuesta, medicion)
+
+    async def __acall__(self, request):
+        medicion = Medicion()
+        token = _actual.set(medicion)
+        try:
+            respuesta = await self.get_response(request)
+        finally:
+            _actual.reset(token)
+        return self.terminar(request, respuesta, medicion)
+
+    def process_template_response(self, request, respuesta):
+        medicion = _actual.get()
+        if medicion is not None:
+            medicion.inicio_render = perf_counter()
+            respuesta.add_post_render_callback(lambda r: self.fin_render(medicion))
+        return respuesta
+
+    @staticmethod
+    def fin_render(medicion):
+        medicion.render += perf_counter() - medicion.inicio_render
+
+    def terminar(self, request, respuesta, medicion):
+        total = perf_counter() - medicion.inicio
+        resolver = getattr(request, 'resolver_match', None)
+        ruta = resolver.url_name if resolver and resolver.url_name else 'sin_ruta'
+        metodo = request.method if request.method in METODOS else 'OTHER'
+        registro.sumar(ruta, metodo, total, medicion)
+        respuesta['Server-Timing'] = server_timing(medicion, total)
+        return respuesta
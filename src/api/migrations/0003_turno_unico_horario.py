@@ -0,0 +1,50 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:01
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def verificar_turnos_duplicados(apps, schema_editor):
+    # Las restricciones fallarian con un error poco claro si ya hay turnos superpuestos
+    Turno = apps.get_model('api', 'Turno')
+    conflictos = []
+    for campo in ('empleado', 'cliente'):
+        duplicados = (
+            Turno.objects.using(schema_editor.connection.alias)
+            .values(campo, 'fecha', 'hora')
+            .annotate(cantidad=Count('id'))
+            .filter(cantidad__gt=1)
+        )
+        for fila in duplicados:
+            ids = Turno.objects.using(schema_editor.connection.alias).filter(
+                **{campo: fila[campo], 'fecha': fila['fecha'], 'hora': fila['hora']}
+            ).values_list('id', flat=True)
+            conflictos.append(f"{campo}={fila[campo]} {fila['fecha']} {fila['hora']}: turnos {sorted(ids)}")
+    if conflictos:
+        raise RuntimeError(
+            'Hay turnos superpuestos que deben resolverse antes de migrar:\n' + '\n'.join(conflictos)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_remove_cliente_password_remove_empleado_password'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cliente',
+            name='celular',
+            field=models.CharField(max_length=25, unique=True),
+        ),
+        migrations.RunPython(verificar_turnos_duplicados, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='turno',
+            constraint=models.UniqueConstraint(fields=('empleado', 'fecha', 'hora'), name='turno_unico_empleado_horario'),
+        ),
+        migrations.AddConstraint(
+            model_name='turno',
+            constraint=models.UniqueConstraint(fields=('cliente', 'fecha', 'hora'), name='turno_unico_cliente_horario'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_turno_unico_horario'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='turno',
+            index=models.Index(fields=['fecha', 'hora'], name='turno_fecha_hora_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='turno',
+            index=models.Index(fields=['producto', 'fecha', 'hora'], name='turno_producto_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:43
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Copia del tokenizador de api/busqueda.py tal como estaba al crear la tabla: la migracion
+# no puede depender del codigo actual, que puede cambiar despues
+CAMPOS_BUSQUEDA = ('nombre', 'apellido', 'usuario', 'email', 'celular', 'nro_socio')
+COMIENZO, MEDIO = 0, 1
+_PALABRA = re.compile(r'[^\W_]+')
+_LARGO = 45
+
+
+def normalizar(texto):
+    descompuesto = unicodedata.normalize('NFKD', str(texto))
+    return ''.join(caracter for caracter in descompuesto if not unicodedata.combining(caracter)).lower()
+
+
+def palabras(texto):
+    return [palabra[:_LARGO] for palabra in _PALABRA.findall(normalizar(texto))]
+
+
+def terminos(valores):
+    resultado = {}
+    for valor in valores:
+        partes = palabras(valor)
+        for posicion, palabra in enumerate(partes):
+            resultado[palabra] = min(resultado.get(palabra, MEDIO), COMIENZO if posicion == 0 else MEDIO)
+        if len(partes) > 1:
+            resultado[''.join(partes)[:_LARGO]] = COMIENZO
+    return resultado
+
+
+def indexar_existentes(apps, schema_editor):
+    Cliente = apps.get_model('api', 'Cliente')
+    TerminoCliente = apps.get_model('api', 'TerminoCliente')
+    db = schema_editor.connection.alias
+    lote = []
+    for fila in Cliente.objects.using(db).order_by('id').values_list('id', *CAMPOS_BUSQUEDA).iterator(chunk_size=2000):
+        lote.extend(TerminoCliente(cliente_id=fila[0], termino=termino, rango=rango) for termino, rango in terminos(fila[1:]).items())
+        if len(lote) >= 5000:
+            TerminoCliente.objects.using(db).bulk_create(lote)
+            lote = []
+    TerminoCliente.objects.using(db).bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_turno_producto_fecha_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TerminoCliente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('termino', models.CharField(max_length=45)),
+                ('rango', models.PositiveSmallIntegerField()),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terminos', to='api.cliente')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['rango', 'termino', 'cliente'], name='termino_busqueda_idx')],
+                'constraints': [models.UniqueConstraint(fields=('cliente', 'termino'), name='termino_cliente_unico')],
+            },
+        ),
+        migrations.RunPython(indexar_existentes, migrations.RunPython.noop),
+    ]
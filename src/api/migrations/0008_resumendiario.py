@@ -0,0 +1,45 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def resumir_existentes(apps, schema_editor):
+    Turno = apps.get_model('api', 'Turno')
+    ResumenDiario = apps.get_model('api', 'ResumenDiario')
+    db = schema_editor.connection.alias
+    filas = Turno.objects.using(db).order_by().values('fecha', 'empleado_id', 'producto_id').annotate(cantidad=Count('id'))
+    lote = []
+    for fila in filas.iterator(chunk_size=5000):
+        lote.append(ResumenDiario(fecha=fila['fecha'], empleado_id=fila['empleado_id'],
+                                  producto_id=fila['producto_id'], turnos=fila['cantidad']))
+        if len(lote) >= 5000:
+            ResumenDiario.objects.using(db).bulk_create(lote)
+            lote = []
+    ResumenDiario.objects.using(db).bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_terminocliente'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('turnos', models.PositiveIntegerField(default=0)),
+                ('empleado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes', to='api.empleado')),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes', to='api.producto')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['fecha', 'producto', 'turnos'], name='resumen_producto_idx'), models.Index(fields=['fecha', 'empleado', 'turnos'], name='resumen_empleado_idx')],
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'empleado', 'producto'), name='resumen_diario_unico')],
+            },
+        ),
+        migrations.RunPython(resumir_existentes, migrations.RunPython.noop),
+    ]
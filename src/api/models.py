@@ -4,6 +4,7 @@ from django.db import models
 
 class Servicio(models.Model):
     nombre= models.CharField(max_length=20)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     def __str__(self):
         return f'{self.nombre}'
@@ -12,6 +13,7 @@ class Producto(models.Model):
     servicio = models.ForeignKey(Servicio,on_delete=models.CASCADE)
     nombre = models.CharField(max_length=30)
     precio = models.DecimalField(max_digits=8,decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.servicio.nombre} {self.nombre}"
@@ -25,10 +27,27 @@ class Cliente(models.Model):
     email = models.EmailField(max_length=45, unique=True)
     celular = models.CharField(max_length=25, unique=True)
     nro_socio = models.IntegerField(unique=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.nombre} {self.apellido}"
 
+
+class TerminoCliente(models.Model):
+    """Palabra normalizada (minusculas, sin acentos) de un campo buscable del cliente; ver busqueda.py."""
+    cliente = models.ForeignKey(Cliente, on_delete=models.CASCADE, related_name='terminos')
+    termino = models.CharField(max_length=45)
+    # 0: el termino es el comienzo del campo (o el campo entero), 1: esta en el medio. Los 0 van primero
+    rango = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['cliente', 'termino'], name='termino_cliente_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['rango', 'termino', 'cliente'], name='termino_busqueda_idx'),
+        ]
+
 class Empleado(models.Model):
     nombre = models.CharField(max_length=36)
     apellido = models.CharField(max_length=36)
@@ -37,6 +56,7 @@ class Empleado(models.Model):
     legajo = models.IntegerField(unique=True, )
     sueldo= models.DecimalField(max_digits=8,decimal_places=2)
     servicio= models.ForeignKey(Servicio, on_delete=models.CASCADE, related_name='Servicio')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.nombre} {self.apellido} {self.servicio.nombre}"
@@ -48,6 +68,35 @@ class Turno(models.Model):
     producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='producto_turno')
     hora = models.TimeField()
     fecha = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['empleado', 'fecha', 'hora'], name='turno_unico_empleado_horario'),
+            models.UniqueConstraint(fields=['cliente', 'fecha', 'hora'], name='turno_unico_cliente_horario'),
+        ]
+        # Las restricciones unicas ya indexan (empleado, fecha, hora) y (cliente, fecha, hora)
+        indexes = [
+            models.Index(fields=['fecha', 'hora'], name='turno_fecha_hora_idx'),
+            models.Index(fields=['producto', 'fecha', 'hora'], name='turno_producto_fecha_idx'),
+        ]
 
     def __str__(self):
-        return f'{self.hora}/{self.fecha}/{self.producto}/{self.empleado.nombre} {self.empleado.apellido}'
\ No newline at end of file
+        return f'{self.hora}/{self.fecha}/{self.producto}/{self.empleado.nombre} {self.empleado.apellido}'
+
+class ResumenDiario(models.Model):
+    """Turnos por (fecha, empleado, producto), mantenido al guardar y borrar turnos; ver analitica.py."""
+    fecha = models.DateField()
+    empleado = models.ForeignKey(Empleado, on_delete=models.CASCADE, related_name='resumenes')
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='resumenes')
+    turnos = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['fecha', 'empleado', 'producto'], name='resumen_diario_unico'),
+        ]
+        # Cubren las sumas por rango de fechas de analitica.py sin leer la tabla
+        indexes = [
+            models.Index(fields=['fecha', 'producto', 'turnos'], name='resumen_producto_idx'),
+            models.Index(fields=['fecha', 'empleado', 'turnos'], name='resumen_empleado_idx'),
+        ]
@@ -0,0 +1,158 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def filtro_keyset(orden, posicion):
+    """
+    Filas posteriores a `posicion` segun `orden`: a >= x AND ((a > x) OR (a = x AND b > y) OR ...).
+    La cota redundante sobre el primer campo deja al planificador un rango sobre el indice
+    aunque la consulta ya tenga otra condicion sobre ese campo (los filtros de fecha de turnos).
+    """
+    filtro = Q()
+    iguales = {}
+    for campo, valor in zip(orden, posicion):
+        nombre = campo.lstrip('-')
+        operador = 'lt' if campo.startswith('-') else 'gt'
+        filtro |= Q(**iguales, **{f'{nombre}__{operador}': valor})
+        iguales[nombre] = valor
+    primero = orden[0]
+    cota = Q(**{f'{primero.lstrip("-")}__{"lte" if primero.startswith("-") else "gte"}': posicion[0]})
+    return cota & filtro
+
+
+class PaginacionCursor(BasePagination):
+    """
+    Paginacion por keyset: cada pagina filtra por la ultima posicion vista sobre un
+    orden estable en lugar de usar OFFSET, asi que cuesta lo mismo sin importar la profundidad.
+    El ultimo campo de `ordering` tiene que ser unico (normalmente `id`).
+    """
+    ordering = ('id',)
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Cursor invalido'
+
+    def __init__(self, ordering=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+        self.page_size = getattr(settings, 'PAGINACION_PAGE_SIZE', 10)
+        self.max_page_size = getattr(settings, 'PAGINACION_MAX_PAGE_SIZE', 100)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = queryset.count() if self.pide_count(request) else None
+        pagina, posicion = self.preparar(queryset, request)
+        return self.recortar(list(pagina), posicion)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.count = await queryset.acount() if self.pide_count(request) else None
+        pagina, posicion = self.preparar(queryset, request)
+        return self.recortar([fila async for fila in pagina], posicion)
+
+    def preparar(self, queryset, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.limite = self.get_page_size(request)
+        posicion, self.reverso = self.decode_cursor(request, queryset.model)
+        if posicion is not None:
+            queryset = queryset.filter(self.filtro_keyset(posicion))
+        return queryset.order_by(*self.orden_efectivo())[:self.limite + 1], posicion
+
+    def recortar(self, resultados, posicion):
+        hay_mas = len(resultados) > self.limite
+        resultados = resultados[:self.limite]
+        if self.reverso:
+            resultados.reverse()
+            self.has_next = posicion is not None
+            self.has_previous = hay_mas
+        else:
+            self.has_next = hay_mas
+            self.has_previous = posicion is not None
+        self.page = resultados
+        return resultados
+
+    def get_paginated_response(self, data):
+        respuesta = OrderedDict()
+        if self.count is not None:
+            respuesta['count'] = self.count
+        respuesta['next'] = self.get_next_link()
+        respuesta['previous'] = self.get_previous_link()
+        respuesta['results'] = data
+        return Response(respuesta)
+
+    def get_page_size(self, request):
+        valor = request.query_params.get(self.page_size_query_param)
+        if valor is None:
+            return self.page_size
+        try:
+            tamanio = int(valor)
+        except ValueError:
+            return self.page_size
+        if tamanio <= 0:
+            return self.page_size
+        return min(tamanio, self.max_page_size)
+
+    def pide_count(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'si')
+
+    def orden_efectivo(self):
+        if not self.reverso:
+            return self.ordering
+        return tuple(campo[1:] if campo.startswith('-') else '-' + campo for campo in self.ordering)
+
+    def filtro_keyset(self, posicion):
+        return filtro_keyset(self.orden_efectivo(), posicion)
+
+    def posicion_de(self, instancia):
+        # Las filas pueden ser instancias o dicts de .values() (ver representacion.py)
+        if isinstance(instancia, dict):
+            return [str(instancia[campo.lstrip('-')]) for campo in self.ordering]
+        return [str(getattr(instancia, campo.lstrip('-'))) for campo in self.ordering]
+
+    def encode_cursor(self, instancia, reverso):
+        crudo = json.dumps({'p': self.posicion_de(instancia), 'r': int(reverso)}, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(crudo.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, modelo):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            datos = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('ascii'))
+            valores = datos['p']
+            if len(valores) != len(self.ordering):
+                raise ValueError
+            posicion = [
+                modelo._meta.get_field(campo.lstrip('-')).to_python(valor)
+                for campo, valor in zip(self.ordering, valores)
+            ]
+            return posicion, bool(datos.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[-1], reverso=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverso=True)
+
+
+class PaginacionTurnos(PaginacionCursor):
+    ordering = ('fecha', 'hora', 'id')
@@ -0,0 +1,99 @@
+import datetime
+
+from django.db import connections
+from django.db.models import Q
+
+from .analitica import sumas_por_dia
+from .busqueda import COMIENZO, consulta_terminos
+from .filtros import combinaciones_de_filtros, filtrar_turnos
+from .models import Turno
+from .pagination import PaginacionTurnos, filtro_keyset
+
+
+def consultas_clave():
+    """Consultas calientes que tienen que resolverse por indice."""
+    fecha = datetime.date(2025, 1, 1)
+    hora = datetime.time(11, 0)
+    consultas = {
+        'turnos del cliente': Turno.objects.filter(cliente_id=1).order_by('fecha', 'hora'),
+        'turnos del empleado': Turno.objects.filter(empleado_id=1).order_by('fecha', 'hora'),
+        'agenda del empleado por rango': Turno.objects.filter(
+            empleado_id__in=[1], fecha__gte=fecha, fecha__lte=fecha + datetime.timedelta(days=30)
+        ).values_list('empleado_id', 'fecha', 'hora'),
+        'agenda del dia': Turno.objects.filter(fecha=fecha).order_by('hora'),
+        'listado de turnos': Turno.objects.order_by('fecha', 'hora', 'id')[:11],
+        'listado de turnos con cursor': Turno.objects.filter(
+            filtro_keyset(PaginacionTurnos.ordering, [fecha, hora, 1])
+        ).order_by('fecha', 'hora', 'id')[:11],
+        'ETag del listado de turnos': Turno.objects.order_by('fecha', 'hora', 'id').values_list(
+            'pk', 'updated_at', 'cliente__updated_at', 'empleado__updated_at', 'producto__updated_at'
+        )[:11],
+        'busqueda de clientes': consulta_terminos('cli', ['sint'], COMIENZO)[:20],
+        'ingresos por dia': sumas_por_dia(Q(fecha__gte=fecha, fecha__lte=fecha + datetime.timedelta(days=30)), 'producto_id'),
+        'admin de turnos': Turno.objects.order_by('-fecha', '-hora', '-pk')[:100],
+        'fechas del admin de turnos': Turno.objects.order_by().values_list('fecha', flat=True).distinct(),
+        'ocupacion por dia': sumas_por_dia(Q(fecha__gte=fecha, fecha__lte=fecha + datetime.timedelta(days=30)), 'empleado_id'),
+    }
+    for parametros in combinaciones_de_filtros():
+        queryset, orden = filtrar_turnos(Turno.objects.all(), parametros)
+        nombre = 'listado de turnos ' + _consulta(parametros)
+        consultas[nombre] = queryset.order_by(*orden)[:11]
+        consultas[nombre + ' con cursor'] = queryset.filter(filtro_keyset(orden, [fecha, hora, 1])).order_by(*orden)[:11]
+    return consultas
+
+
+def filtros_de_turnos():
+    """
+    Filas que selecciona cada combinacion de filtros de la lista de turnos (lo que cuenta
+    ?count=true). Tienen que buscarse por indice: recorrer uno entero no alcanza.
+    """
+    consultas = {}
+    for parametros in combinaciones_de_filtros():
+        parametros.pop('ordering')
+        if parametros:
+            queryset, _ = filtrar_turnos(Turno.objects.all(), parametros)
+            consultas['filtro de turnos ' + _consulta(parametros)] = queryset.order_by().values_list('id')
+    return consultas
+
+
+def _consulta(parametros):
+    return '?' + '&'.join(f'{clave}={valor}' for clave, valor in parametros.items())
+
+
+def problemas_de_plan(queryset, using='default', recorrer_indice=True):
+    """
+    Devuelve la lista de problemas (scan completo o filesort) del plan de `queryset`.
+    Con `recorrer_indice=False` tambien cuenta como scan leer un indice entero.
+    """
+    conexion = connections[using]
+    sql, params = queryset.query.sql_with_params()
+    with conexion.cursor() as cursor:
+        if conexion.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return _problemas_sqlite(cursor.fetchall(), recorrer_indice)
+        if conexion.vendor == 'mysql':
+            cursor.execute('EXPLAIN ' + sql, params)
+            columnas = [col[0] for col in cursor.description]
+            return _problemas_mysql([dict(zip(columnas, fila)) for fila in cursor.fetchall()], recorrer_indice)
+    raise NotImplementedError(f'Motor no soportado: {conexion.vendor}')
+
+
+def _problemas_sqlite(filas, recorrer_indice):
+    problemas = []
+    for fila in filas:
+        detalle = fila[-1]
+        if detalle.startswith('SCAN ') and (' USING ' not in detalle or not recorrer_indice):
+            problemas.append(f'scan completo: {detalle}')
+        if 'USE TEMP B-TREE' in detalle:
+            problemas.append(f'filesort: {detalle}')
+    return problemas
+
+
+def _problemas_mysql(filas, recorrer_indice):
+    problemas = []
+    for fila in filas:
+        if fila.get('type') == 'ALL' or (fila.get('type') == 'index' and not recorrer_indice):
+            problemas.append(f"scan completo sobre {fila.get('table')}")
+        if 'filesort' in (fila.get('Extra') or ''):
+            problemas.append(f"filesort sobre {fila.get('table')}")
+    return problemas
@@ -0,0 +1,116 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from inspect import iscoroutinefunction
+
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+METODOS_LECTURA = ('GET', 'HEAD', 'OPTIONS')
+COOKIE = 'bd_primaria'
+
+# True mientras se atiende una lectura que puede ir a una replica. Por defecto (comandos,
+# escrituras, tareas fuera de una peticion) todo va a la primaria
+_lectura = ContextVar('lectura_en_replica', default=False)
+
+
+class RouterReplicas:
+    """Lecturas de peticiones GET a una replica al azar de settings.REPLICAS; el resto a `default`."""
+
+    def db_for_read(self, model, **hints):
+        if _lectura.get() and settings.REPLICAS:
+            return random.choice(settings.REPLICAS)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Las replicas tienen los mismos datos que la primaria
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+@contextmanager
+def en_primaria():
+    """Fuerza la primaria dentro del bloque, para lecturas que no pueden ver datos atrasados."""
+    token = _lectura.set(False)
+    try:
+        yield
+    finally:
+        _lectura.reset(token)
+
+
+def _usuario_del_token(request):
+    encabezado = request.META.get('HTTP_AUTHORIZATION', '').split()
+    if len(encabezado) != 2 or encabezado[0] not in jwt_settings.AUTH_HEADER_TYPES:
+        return None
+    try:
+        return AccessToken(encabezado[1]).get(jwt_settings.USER_ID_CLAIM)
+    except TokenError:
+        return None
+
+
+def _clave(usuario):
+    return f'replicas:primaria:{usuario}'
+
+
+class ReplicasMiddleware:
+    """
+    Habilita las replicas para las lecturas y da consistencia lectura-de-escritura: despues de
+    una escritura exitosa el cliente lee de la primaria durante REPLICAS_PRIMARIA_SEGUNDOS.
+    Se recuerda con una cookie y, para los clientes con JWT que no guardan cookies, en la cache
+    por el claim de usuario del token (hace falta una cache compartida entre procesos).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REPLICAS', None):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        token = _lectura.set(self.puede_usar_replica(request))
+        try:
+            respuesta = self.get_response(request)
+        finally:
+            _lectura.reset(token)
+        return self.terminar(request, respuesta)
+
+    async def __acall__(self, request):
+        token = _lectura.set(self.puede_usar_replica(request))
+        try:
+            respuesta = await self.get_response(request)
+        finally:
+            _lectura.reset(token)
+        return self.terminar(request, respuesta)
+
+    def puede_usar_replica(self, request):
+        if request.method not in METODOS_LECTURA or COOKIE in request.COOKIES:
+            return False
+        usuario = _usuario_del_token(request)
+        return usuario is None or cache.get(_clave(usuario)) is None
+
+    def terminar(self, request, respuesta):
+        if request.method in METODOS_LECTURA or respuesta.status_code >= 400:
+            return respuesta
+        segundos = settings.REPLICAS_PRIMARIA_SEGUNDOS
+        respuesta.set_cookie(COOKIE, str(int(time.time()) + segundos), max_age=segundos, httponly=True, samesite='Lax')
+        usuario = _usuario_del_token(request)
+        if usuario is not None:
+            cache.set(_clave(usuario), 1, segundos)
+        return respuesta
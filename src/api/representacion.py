@@ -0,0 +1,139 @@
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from rest_framework import serializers
+
+from .campos import EXPANSIBLES, expandido, seleccion_de
+from .metricas import medir_serializacion
+from .serializers import ClienteSerializer, EmpleadoSerializer, TurnoSerializer
+
+# Campos cuyo to_representation no cambia el valor que devuelve la base
+SIN_CONVERSION = (serializers.IntegerField, serializers.CharField, serializers.PrimaryKeyRelatedField)
+
+# Campos calculados de los serializers que se arman con una consulta aparte:
+# clave -> (campo del hijo que apunta al padre, serializer del hijo)
+ANIDADOS = {
+    ClienteSerializer: {'turnos': ('cliente', TurnoSerializer)},
+    EmpleadoSerializer: {'turnos': ('empleado', TurnoSerializer)},
+}
+
+
+COLUMNA, ANIDADO, EXPANDIDO = range(3)
+
+
+class Representacion:
+    """
+    Arma la misma salida que `serializer_class(..., many=True).data` a partir de `.values()`,
+    sin instanciar modelos ni serializers por fila. El plan de columnas se deriva de los
+    campos del serializer, asi que sigue a los cambios de los serializers. `campos` y
+    `expandir` corresponden a ?fields= y ?expand= (ver campos.py); las relaciones expandidas
+    se leen con JOIN en la misma consulta.
+    """
+
+    def __init__(self, serializer_class, campos=None, expandir=(), prefijo=''):
+        modelo = serializer_class.Meta.model
+        anidados = ANIDADOS.get(serializer_class, {})
+        self.plan = []
+        self.anidados = []
+        self.columnas = []
+        for clave, campo in serializer_class().fields.items():
+            if campo.write_only or (campos is not None and clave not in campos):
+                continue
+            if clave in expandir:
+                sub = Representacion(expandido(EXPANSIBLES[serializer_class][clave]), prefijo=f'{prefijo}{campo.source}__')
+                self.plan.append((EXPANDIDO, clave, sub, None))
+                self.columnas.extend(sub.columnas)
+                continue
+            if clave in anidados:
+                campo_padre, serializer_hijo = anidados[clave]
+                self.plan.append((ANIDADO, clave, None, None))
+                self.anidados.append((clave, campo_padre, representacion(serializer_hijo)))
+                continue
+            if isinstance(campo, serializers.SerializerMethodField):
+                raise ValueError(f'{serializer_class.__name__}.{clave} no tiene lectura rapida')
+            columna = prefijo + modelo._meta.get_field(campo.source).name
+            convertir = None if isinstance(campo, SIN_CONVERSION) else campo.to_representation
+            self.plan.append((COLUMNA, clave, columna, convertir))
+            self.columnas.append(columna)
+        self.modelo = modelo
+        self.prefijo = prefijo
+
+    def valores(self, queryset, extra=()):
+        """`extra`: columnas que no van en la salida pero hacen falta (orden de la paginacion, id de los anidados)."""
+        columnas = list(dict.fromkeys([*self.columnas, *(campo.lstrip('-') for campo in extra)]))
+        if self.anidados and 'id' not in columnas:
+            columnas.append('id')
+        return queryset.prefetch_related(None).values(*columnas)
+
+    def _consultas_hijas(self, filas):
+        ids = [fila['id'] for fila in filas]
+        for clave, campo_padre, hija in self.anidados:
+            # Mismo orden que prefetch_turnos
+            queryset = hija.modelo.objects.filter(**{f'{campo_padre}__in': ids}).order_by('fecha', 'hora')
+            yield clave, campo_padre, hija, hija.valores(queryset)
+
+    @medir_serializacion
+    def _armar(self, filas, hijos):
+        agrupados = {}
+        for clave, campo_padre, hija, filas_hijas in hijos:
+            por_padre = defaultdict(list)
+            for fila in hija.convertir(filas_hijas):
+                por_padre[fila[campo_padre]].append(fila)
+            agrupados[clave] = por_padre
+        return [self._fila(fila, agrupados) for fila in filas]
+
+    def _fila(self, fila, agrupados=None):
+        item = {}
+        for tipo, clave, columna, convertir in self.plan:
+            if tipo == COLUMNA:
+                valor = fila[columna]
+                item[clave] = valor if convertir is None or valor is None else convertir(valor)
+            elif tipo == ANIDADO:
+                item[clave] = agrupados[clave].get(fila['id'], [])
+            else:
+                item[clave] = None if fila[columna.prefijo + 'id'] is None else columna._fila(fila)
+        return item
+
+    def convertir(self, filas):
+        if not filas or not self.anidados:
+            return self._armar(filas, ())
+        return self._armar(filas, [
+            (clave, campo_padre, hija, list(queryset))
+            for clave, campo_padre, hija, queryset in self._consultas_hijas(filas)
+        ])
+
+    async def aconvertir(self, filas):
+        if not filas or not self.anidados:
+            return self._armar(filas, ())
+        hijos = []
+        for clave, campo_padre, hija, queryset in self._consultas_hijas(filas):
+            hijos.append((clave, campo_padre, hija, [fila async for fila in queryset]))
+        return self._armar(filas, hijos)
+
+
+@lru_cache(maxsize=None)
+def representacion(serializer_class, campos=None, expandir=()):
+    return Representacion(serializer_class, campos, expandir)
+
+
+def pagina_serializada(queryset, serializer_class, paginator, request):
+    """
+    Pagina `queryset` y la serializa aplicando ?fields= / ?expand=. Con API_LISTADOS_RAPIDOS
+    usa `.values()` en lugar del serializer.
+    """
+    seleccion = seleccion_de(request, serializer_class)
+    if not settings.API_LISTADOS_RAPIDOS:
+        pagina = paginator.paginate_queryset(seleccion.queryset(queryset, paginator.ordering), request)
+        return serializer_class(pagina, many=True, context={'seleccion': seleccion}).data
+    rapida = representacion(serializer_class, seleccion.campos, seleccion.expandir)
+    return rapida.convertir(paginator.paginate_queryset(rapida.valores(queryset, paginator.ordering), request))
+
+
+async def apagina_serializada(queryset, serializer_class, paginator, request):
+    seleccion = seleccion_de(request, serializer_class)
+    if not settings.API_LISTADOS_RAPIDOS:
+        pagina = await paginator.apaginate_queryset(seleccion.queryset(queryset, paginator.ordering), request)
+        return serializer_class(pagina, many=True, context={'seleccion': seleccion}).data
+    rapida = representacion(serializer_class, seleccion.campos, seleccion.expandir)
+    return await rapida.aconvertir(await paginator.apaginate_queryset(rapida.valores(queryset, paginator.ordering), request))
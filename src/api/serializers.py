@@ -1,151 +1,82 @@
 from rest_framework import serializers
-import re
+from django.db.models import Prefetch
 from .models import Servicio, Producto, Cliente, Empleado, Turno
-import datetime
+from .disponibilidad import HORA_APERTURA, HORA_CIERRE, MINUTOS_VALIDOS
+from .metricas import SerializacionMedida
+from .validadores import UnicidadEnUnaConsulta, ValidacionPersona, celular
 
+TURNOS_ORDENADOS = 'turnos_ordenados'
 
-class ServicioSerializer(serializers.ModelSerializer):
+def prefetch_turnos(relacion):
+    # Los serializers de cliente y empleado leen los turnos desde este atributo si la vista lo precargo
+    return Prefetch(relacion, queryset=Turno.objects.order_by('fecha', 'hora'), to_attr=TURNOS_ORDENADOS)
+
+def turnos_ordenados(obj, relacion):
+    turnos = getattr(obj, TURNOS_ORDENADOS, None)
+    if turnos is None:
+        turnos = getattr(obj, relacion).all().order_by('fecha', 'hora')
+    return turnos
+
+
+class CamposDinamicos:
+    # Aplica el ?fields= / ?expand= que la vista pasa en context['seleccion'] (ver campos.py)
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        seleccion = self.context.get('seleccion')
+        if seleccion is not None and not seleccion.vacia:
+            seleccion.aplicar(self)
+
+
+class ServicioSerializer(CamposDinamicos, SerializacionMedida, serializers.ModelSerializer):
    class Meta:
       model = Servicio
-      fields='__all__'
+      exclude=['updated_at']
    
-class ProductoSerializer(serializers.ModelSerializer):
+class ProductoSerializer(CamposDinamicos, SerializacionMedida, serializers.ModelSerializer):
  servicio = serializers.PrimaryKeyRelatedField(queryset=Servicio.objects.all())
  class Meta:
    model = Producto
-   fields='__all__'
+   exclude=['updated_at']
    def validate_precio(self, value):
        if value < 0:
          raise serializers.ValidationError('El precio no puede ser negativo')
        return value
 
-class ClienteSerializer(serializers.ModelSerializer):
+class ClienteSerializer(CamposDinamicos, SerializacionMedida, UnicidadEnUnaConsulta, ValidacionPersona, serializers.ModelSerializer):
     turnos = serializers.SerializerMethodField()
 
     class Meta:
         model = Cliente
-        fields = '__all__'
-
-    def validate_nombre(self, value):
-        if not value or not value.strip():
-            raise serializers.ValidationError({"nombre":'El nombre no puede estar vacío.'})
-        
-        if not re.match(r'^[a-zA-ZáéíóúÁÉÍÓÚñÑ]+$', value):
-            raise serializers.ValidationError({"nombre":"El nombre solo puede contener letras y no puede tener espacios u otros caracteres."})
-        
-        if len(value) < 2:
-            raise serializers.ValidationError({'nombre':'El nombre debe tener al menos 2 caracteres.'})
-        if len(value) > 36:
-            raise serializers.ValidationError({"nombre":"El nombre no puede exceder los 36 caracteres."})
-            
-        return value
+        exclude = ['updated_at']
 
-    def validate_apellido(self, value):
-        if not value or not value.strip():
-            raise serializers.ValidationError({"apellido":"El apellido no puede estar vacío."})
-        if not re.match(r'^[a-zA-ZáéíóúÁÉÍÓÚñÑ]+$', value):
-            raise serializers.ValidationError({'apellido':"El apellido solo puede contener letras y no puede tener espacios u otros caracteres."})
-        if len(value) < 2:
-            raise serializers.ValidationError({'apellido':'El apellido debe tener al menos 2 caracteres.'})
-        if len(value) > 36:
-            raise serializers.ValidationError({'apellido':'El apellido no puede exceder los 36 caracteres.'})
-            
-        return value
-    
-    def validate_password(self, value):
-        pass_length=len(str(value))
-        if pass_length < 8:
-            raise serializers.ValidationError({'password':'La contraseña tiene que ser mayor a 8 caracteres'})
-        if pass_length>50:
-            raise serializers.ValidationError({'password':'La contraseña debe ser menor a 50 caracteres'})
-    
     def validate_edad(self, value):
         if value < 13:
             raise serializers.ValidationError('La edad del cliente no puede ser menor a 13 años.')
         return value
-    
-    def validate_usuario(self, value): 
-     user_length = len(str(value))
-
-     if user_length < 3:
-        raise serializers.ValidationError({'usuario': 'El usuario no puede ser menor a 3 caracteres'})
-     elif user_length >18:
-        raise serializers.ValidationError({'usuario':'El usuario no puede ser mayor a 18 caracteres'})
-     return value 
-    
+
     def validate_nro_socio(self, value):
         if value < 0:
             raise serializers.ValidationError({'nro_socio': 'El numero de socio no puede ser negativo'})
         return value
 
     def validate_celular(self, value):
-         celular_str = str(value)
-         celular_length = len(celular_str)
-
-         if celular_length < 10:
-            raise serializers.ValidationError({'celular': 'El celular no puede ser menor a 10 dígitos.'})
-         elif celular_length > 25:
-            raise serializers.ValidationError({'celular': 'El celular no puede ser mayor a 25 dígitos.'})
-         
-         if not celular_str.isdigit():
-             raise serializers.ValidationError({'celular': 'El celular solo puede contener dígitos numéricos.'})
-         return value
+        return celular(value)
 
     def get_turnos(self, obj):
-        turnos_cliente = obj.cliente_turno.all().order_by('fecha', 'hora')
+        turnos_cliente = turnos_ordenados(obj, 'cliente_turno')
         return TurnoSerializer(turnos_cliente, many=True).data
 
-class EmpleadoSerializer(serializers.ModelSerializer):
+class EmpleadoSerializer(CamposDinamicos, SerializacionMedida, UnicidadEnUnaConsulta, ValidacionPersona, serializers.ModelSerializer):
     turnos = serializers.SerializerMethodField()
 
     class Meta:
         model = Empleado
-        fields = '__all__'
-
-    def validate_nombre(self, value):
-        if not value or not value.strip():
-            raise serializers.ValidationError({"nombre":'El nombre no puede estar vacío.'})
-        
-        if not re.match(r'^[a-zA-ZáéíóúÁÉÍÓÚñÑ]+$', value):
-            raise serializers.ValidationError({"nombre":"El nombre solo puede contener letras y no puede tener espacios u otros caracteres."})
-        
-        if len(value) < 2:
-            raise serializers.ValidationError({'nombre':'El nombre debe tener al menos 2 caracteres.'})
-        if len(value) > 36:
-            raise serializers.ValidationError({"nombre":"El nombre no puede exceder los 36 caracteres."})
-            
-        return value
+        exclude = ['updated_at']
 
-    def validate_apellido(self, value):
-        if not value or not value.strip():
-            raise serializers.ValidationError({"apellido":"El apellido no puede estar vacío."})
-        if not re.match(r'^[a-zA-ZáéíóúÁÉÍÓÚñÑ]+$', value):
-            raise serializers.ValidationError({'apellido':"El apellido solo puede contener letras y no puede tener espacios u otros caracteres."})
-        if len(value) < 2:
-            raise serializers.ValidationError({'apellido':'El apellido debe tener al menos 2 caracteres.'})
-        if len(value) > 36:
-            raise serializers.ValidationError({'apellido':'El apellido no puede exceder los 36 caracteres.'})
-            
-        return value
-    
-    def validate_password(self, value):
-        pass_length=len(str(value))
-        if pass_length < 8:
-            raise serializers.ValidationError({'password':'La contraseña tiene que ser mayor a 8 caracteres'})
-        if pass_length>50:
-            raise serializers.ValidationError({'password':'La contraseña debe ser menor a 50 caracteres'})
-
-    def validate_usuario(self, value): 
-       user_length = len(str(value))
-       if user_length < 3:
-        raise serializers.ValidationError({'usuario': 'El usuario no puede ser menor a 3 caracteres'})
-       elif user_length >18:
-        raise serializers.ValidationError({'usuario':'El usuario no puede ser mayor a 18 caracteres'})
-       return value 
-    
     def validate_legajo(self,value):
         if value < 0:
             raise serializers.ValidationError({'legajo': 'El legajo no puede ser negativo'})
+        return value
 
     def validate_sueldo(self, value):
         if value < 0:
@@ -153,17 +84,25 @@ class EmpleadoSerializer(serializers.ModelSerializer):
         return value
 
     def get_turnos(self, obj):
-        turnos_empleado = obj.empleado_turno.all().order_by('fecha', 'hora')
+        turnos_empleado = turnos_ordenados(obj, 'empleado_turno')
         return TurnoSerializer(turnos_empleado, many=True).data
 
-class TurnoSerializer(serializers.ModelSerializer):
+class TurnoSerializer(CamposDinamicos, SerializacionMedida, serializers.ModelSerializer):
    class Meta:
       model= Turno
-      fields='__all__'
+      exclude=['updated_at']
+      # Los horarios superpuestos los rechazan las restricciones unicas de la base (ver reservar_turno)
+      validators = []
    def validate_hora(self, value):
-        if not (datetime.time(11, 0) <= value <= datetime.time(20, 0)):
+        if not (HORA_APERTURA <= value <= HORA_CIERRE):
             raise serializers.ValidationError('La hora del turno debe ser entre las 11:00 y las 20:00.')
-        if value.minute not in [0, 30]:
+        if value.minute not in MINUTOS_VALIDOS:
             raise serializers.ValidationError('Los minutos del turno deben ser en punto (00) o y media (30).')
         return value
-   
\ No newline at end of file
+   
+
+class TurnoLoteSerializer(TurnoSerializer):
+   # Las relaciones se resuelven en bloque (ver lote_turnos.py), sin una consulta por item
+   cliente = serializers.IntegerField()
+   empleado = serializers.IntegerField()
+   producto = serializers.IntegerField()
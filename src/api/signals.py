@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import analitica, catalogo
+from .autenticacion import usuarios
+from .busqueda import CAMPOS_BUSQUEDA, indexar
+from .models import Cliente, Producto, Servicio, Turno
+
+
+@receiver([post_save, post_delete], sender=Servicio)
+@receiver([post_save, post_delete], sender=Producto)
+def invalidar_catalogo(sender, **kwargs):
+    # Se invalida recien al confirmar: antes, un lector podria cachear la fila vieja con la version nueva
+    transaction.on_commit(lambda: catalogo.invalidar(sender))
+    if sender is Servicio:
+        # Las respuestas de productos con ?expand=servicio incluyen el servicio
+        transaction.on_commit(lambda: catalogo.invalidar(Producto))
+
+
+@receiver(post_save, sender=Cliente)
+def indexar_cliente(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields is None or set(update_fields) & set(CAMPOS_BUSQUEDA):
+        indexar([instance], nuevos=created)
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def descartar_usuario(sender, instance, **kwargs):
+    # Guardar cubre desactivar y cambiar la clave; los demas procesos lo ven al vencer JWT_USUARIOS_TTL
+    usuarios.descartar(str(instance.pk))
+
+
+@receiver(pre_save, sender=Turno)
+def recordar_resumen(sender, instance, **kwargs):
+    # Clave del resumen antes del cambio, para moverle el turno si cambia la fecha, el empleado o el producto
+    instance._clave_resumen = None
+    if instance.pk is not None:
+        instance._clave_resumen = Turno.objects.filter(pk=instance.pk).values_list('fecha', 'empleado_id', 'producto_id').first()
+
+
+@receiver(post_save, sender=Turno)
+def actualizar_resumen(sender, instance, **kwargs):
+    anterior, actual = instance._clave_resumen, analitica.clave(instance)
+    if anterior != actual:
+        if anterior is not None:
+            analitica.sumar([anterior], signo=-1)
+        analitica.sumar([actual])
+
+
+@receiver(post_delete, sender=Turno)
+def descontar_resumen(sender, instance, **kwargs):
+    analitica.sumar([analitica.clave(instance)], signo=-1)
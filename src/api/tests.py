@@ -1,3 +1,1475 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import gzip
+import io
+import json
+import uuid
+import os
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Count
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import catalogo, documentacion, views_async
+from .admision import Compuerta, compuertas
+from .compresion import brotli, negociar
+from .autenticacion import CacheTTL, usuarios
+from .benchmark import arranque, autenticacion, comparar, escenarios, escrituras, medir, muestras, rutas_sin_escenario
+from .datos_sinteticos import sembrar
+from .models import Cliente, Empleado, Producto, ResumenDiario, Servicio, Turno
+from .exportacion import turnos_en_rango
+from .filtros import FILTROS_TURNO
+from .json_rapido import JSONParserRapido, JSONRendererRapido
+from .metricas import registro
+from .planes import problemas_de_plan
+from .replicas import COOKIE, ReplicasMiddleware, RouterReplicas
+from .serializers import ClienteSerializer, EmpleadoSerializer, ServicioSerializer, TurnoSerializer
+
+
+class DatosMixin:
+    """Crea un set minimo de datos y un cliente HTTP autenticado."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='staff', password='clave-segura-123')
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+        self.servicio = Servicio.objects.create(nombre='Corte')
+        self.producto = Producto.objects.create(servicio=self.servicio, nombre='Corte clasico', precio=Decimal('1500.00'))
+
+    def crear_cliente(self, n):
+        return Cliente.objects.create(
+            nombre='Juan', apellido='Perez', usuario=f'cliente{n}', edad=30,
+            email=f'cliente{n}@mail.com', celular=f'11{n:08d}', nro_socio=n,
+        )
+
+    def crear_empleado(self, n, servicio=None):
+        return Empleado.objects.create(
+            nombre='Alfredo', apellido='Gomez', usuario=f'empleado{n}', email=f'empleado{n}@mail.com',
+            legajo=n, sueldo=Decimal('1000.00'), servicio=servicio or self.servicio,
+        )
+
+    def crear_turno(self, cliente, empleado, fecha, hora, producto=None):
+        return Turno.objects.create(
+            cliente=cliente, empleado=empleado, producto=producto or self.producto, fecha=fecha, hora=hora,
+        )
+
+
+class TurnosAnidadosTests(DatosMixin, TestCase):
+
+    def poblar(self, cantidad):
+        empleado = self.crear_empleado(1000 + cantidad)
+        for n in range(cantidad):
+            cliente = self.crear_cliente(cantidad * 100 + n)
+            dia = datetime.date(2025, 1, 1) + datetime.timedelta(days=2 * n)
+            self.crear_turno(cliente, empleado, dia + datetime.timedelta(days=1), datetime.time(12, 0))
+            self.crear_turno(cliente, empleado, dia, datetime.time(11, 30))
+
+    def test_lista_clientes_cantidad_fija_de_queries(self):
+        self.poblar(1)
+        # resumen de clientes y de turnos para el ETag, clientes y turnos precargados
+        with self.assertNumQueries(4):
+            self.api.get(reverse('cliente-lista'))
+        self.poblar(6)
+        with self.assertNumQueries(4):
+            respuesta = self.api.get(reverse('cliente-lista'))
+        self.assertEqual(len(respuesta.data['results']), 7)
+
+    def test_lista_empleados_cantidad_fija_de_queries(self):
+        self.poblar(1)
+        with self.assertNumQueries(4):
+            self.api.get(reverse('empleado-lista'))
+        self.poblar(6)
+        with self.assertNumQueries(4):
+            respuesta = self.api.get(reverse('empleado-lista'))
+        self.assertEqual(len(respuesta.data['results']), 2)
+
+    def test_turnos_ordenados_por_fecha_y_hora(self):
+        self.poblar(1)
+        cliente = Cliente.objects.get()
+        respuesta = self.api.get(reverse('cliente-detalle', args=[cliente.pk]))
+        self.assertEqual([t['fecha'] for t in respuesta.data['turnos']], ['2025-01-01', '2025-01-02'])
+
+    def test_serializer_sin_prefetch(self):
+        self.poblar(1)
+        datos = ClienteSerializer(Cliente.objects.get()).data
+        self.assertEqual([t['hora'] for t in datos['turnos']], ['11:30:00', '12:00:00'])
+
+
+class PaginacionCursorTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cliente = self.crear_cliente(1)
+        self.empleado = self.crear_empleado(1)
+        horas = [datetime.time(11, 0), datetime.time(11, 30), datetime.time(12, 0)]
+        for dia in (3, 1, 2):
+            for hora in horas:
+                self.crear_turno(self.cliente, self.empleado, datetime.date(2025, 1, dia), hora)
+
+    def recorrer(self, url):
+        vistos = []
+        while url:
+            respuesta = self.api.get(url)
+            self.assertEqual(respuesta.status_code, 200)
+            vistos.extend(respuesta.data['results'])
+            url = respuesta.data['next']
+        return vistos
+
+    def test_recorre_turnos_en_orden_estable(self):
+        vistos = self.recorrer(reverse('turno-lista') + '?page_size=4')
+        esperado = list(Turno.objects.order_by('fecha', 'hora', 'id').values_list('id', flat=True))
+        self.assertEqual([t['id'] for t in vistos], esperado)
+
+    def test_pagina_anterior(self):
+        primera = self.api.get(reverse('turno-lista') + '?page_size=4').data
+        segunda = self.api.get(primera['next']).data
+        self.assertIsNone(primera['previous'])
+        anterior = self.api.get(segunda['previous']).data
+        self.assertEqual([t['id'] for t in anterior['results']], [t['id'] for t in primera['results']])
+
+    def test_count_opcional_y_limite_de_pagina(self):
+        respuesta = self.api.get(reverse('turno-lista')).data
+        self.assertNotIn('count', respuesta)
+        respuesta = self.api.get(reverse('turno-lista') + '?count=true&page_size=1000').data
+        self.assertEqual(respuesta['count'], 9)
+        with self.settings(PAGINACION_MAX_PAGE_SIZE=2):
+            respuesta = self.api.get(reverse('turno-lista') + '?page_size=1000').data
+        self.assertEqual(len(respuesta['results']), 2)
+
+    def test_costo_constante_en_paginas_profundas(self):
+        url = reverse('turno-lista') + '?page_size=2'
+        with self.assertNumQueries(2):
+            url = self.api.get(url).data['next']
+        for _ in range(2):
+            url = self.api.get(url).data['next']
+        with self.assertNumQueries(2):
+            self.api.get(url)
+
+    def test_cursor_invalido(self):
+        respuesta = self.api.get(reverse('turno-lista') + '?cursor=basura')
+        self.assertEqual(respuesta.status_code, 404)
+
+    def test_listados_paginados(self):
+        for nombre in ('producto-lista', 'cliente-lista', 'empleado-lista', 'servicio-lista'):
+            respuesta = self.api.get(reverse(nombre))
+            self.assertIn('results', respuesta.data)
+
+
+class BusquedaClientesTests(DatosMixin, TestCase):
+
+    def crear(self, n, nombre, apellido, email=None, celular=None):
+        return Cliente.objects.create(
+            nombre=nombre, apellido=apellido, usuario=f'usuario{n}', edad=30,
+            email=email or f'cliente{n}@mail.com', celular=celular or f'11{n:08d}', nro_socio=n,
+        )
+
+    def buscar(self, texto, **parametros):
+        respuesta = self.api.get(reverse('cliente-buscar'), {'q': texto, **parametros})
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta.data['results']
+
+    def test_sin_acentos_ni_mayusculas(self):
+        jose = self.crear(1, 'José', 'Martínez')
+        self.crear(2, 'Ana', 'Lopez')
+        self.assertEqual([c['id'] for c in self.buscar('MARTIN')], [jose.id])
+        self.assertEqual([c['id'] for c in self.buscar('jose mart')], [jose.id])
+        self.assertEqual(self.buscar('jose lopez'), [])
+
+    def test_comienzo_de_campo_primero(self):
+        en_el_email = self.crear(1, 'Juan', 'Gomez', email='juan.perez@mail.com')
+        apellido = self.crear(2, 'Ana', 'Perez')
+        self.assertEqual([c['id'] for c in self.buscar('perez')], [apellido.id, en_el_email.id])
+
+    def test_celular_y_socio(self):
+        cliente = self.crear(4321, 'Ana', 'Lopez', celular='11 4444-5555')
+        self.assertEqual([c['id'] for c in self.buscar('114444')], [cliente.id])
+        self.assertEqual([c['id'] for c in self.buscar('4321')], [cliente.id])
+
+    def test_se_actualiza_al_guardar(self):
+        cliente = self.crear(1, 'Ana', 'Lopez')
+        cliente.apellido = 'Fernández'
+        cliente.save()
+        self.assertEqual(self.buscar('lopez'), [])
+        self.assertEqual(self.buscar('fernandez')[0]['apellido'], 'Fernández')
+
+    def test_respuesta_sin_turnos_y_limitada(self):
+        for n in range(5):
+            self.crear(n, 'Ana', 'Lopez')
+        resultados = self.buscar('ana', limite=3)
+        self.assertEqual(len(resultados), 3)
+        self.assertNotIn('turnos', resultados[0])
+        self.assertEqual(self.buscar('ana', fields='id,usuario')[0].keys(), {'id', 'usuario'})
+        # Terminos al comienzo de un campo, terminos en el medio y los clientes encontrados
+        with self.assertNumQueries(3):
+            self.buscar('lopez')
+
+    def test_sin_texto(self):
+        respuesta = self.api.get(reverse('cliente-buscar'), {'q': ' '})
+        self.assertEqual(respuesta.status_code, 400)
+
+
+class FiltrosTurnosTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.clientes = [self.crear_cliente(n) for n in range(2)]
+        self.empleados = [self.crear_empleado(n) for n in range(2)]
+        otro_servicio = Servicio.objects.create(nombre='Barba')
+        self.otro_producto = Producto.objects.create(servicio=otro_servicio, nombre='Perfilado', precio=Decimal('800.00'))
+        for dia in range(1, 5):
+            for n in range(2):
+                self.crear_turno(self.clientes[n], self.empleados[n], datetime.date(2025, 1, dia), datetime.time(11 + n, 0),
+                                 producto=self.otro_producto if dia % 2 else None)
+
+    def ids(self, consulta):
+        respuesta = self.api.get(reverse('turno-lista') + '?page_size=100&' + consulta)
+        self.assertEqual(respuesta.status_code, 200)
+        return [turno['id'] for turno in respuesta.data['results']]
+
+    def esperado(self, **filtros):
+        return list(Turno.objects.filter(**filtros).order_by('fecha', 'hora', 'id').values_list('id', flat=True))
+
+    def test_filtros(self):
+        self.assertEqual(self.ids('desde=2025-01-02&hasta=2025-01-03'),
+                         self.esperado(fecha__range=(datetime.date(2025, 1, 2), datetime.date(2025, 1, 3))))
+        self.assertEqual(self.ids(f'empleado={self.empleados[0].id}'), self.esperado(empleado=self.empleados[0]))
+        self.assertEqual(self.ids(f'cliente={self.clientes[1].id}&desde=2025-01-03'),
+                         self.esperado(cliente=self.clientes[1], fecha__gte=datetime.date(2025, 1, 3)))
+        self.assertEqual(self.ids(f'producto={self.producto.id}'), self.esperado(producto=self.producto))
+        self.assertEqual(self.ids(f'servicio={self.otro_producto.servicio_id}'), self.esperado(producto=self.otro_producto))
+
+    def test_orden_descendente_con_cursor(self):
+        url = reverse('turno-lista') + f'?ordering=-fecha&page_size=3&empleado={self.empleados[1].id}'
+        vistos = []
+        while url:
+            respuesta = self.api.get(url).data
+            vistos.extend(turno['id'] for turno in respuesta['results'])
+            url = respuesta['next']
+        self.assertEqual(vistos, self.esperado(empleado=self.empleados[1])[::-1])
+
+    def test_parametros_invalidos(self):
+        for consulta in ('empleado=uno', 'desde=ayer', 'desde=2025-01-03&hasta=2025-01-01', 'ordering=hora'):
+            respuesta = self.api.get(reverse('turno-lista') + '?' + consulta)
+            self.assertEqual(respuesta.status_code, 400, consulta)
+            self.assertIn('error', respuesta.data)
+
+
+class DisponibilidadTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cliente = self.crear_cliente(1)
+        self.otro_cliente = self.crear_cliente(2)
+        self.alfredo = self.crear_empleado(1)
+        self.otro = self.crear_empleado(2)
+        self.dia = datetime.date(2025, 3, 10)
+        self.crear_turno(self.cliente, self.alfredo, self.dia, datetime.time(11, 0))
+        self.crear_turno(self.cliente, self.alfredo, self.dia, datetime.time(15, 30))
+        self.crear_turno(self.otro_cliente, self.otro, self.dia, datetime.time(11, 0))
+
+    def test_horarios_libres_de_un_empleado(self):
+        url = reverse('empleado-disponibilidad', args=[self.alfredo.pk])
+        respuesta = self.api.get(url, {'desde': '2025-03-10', 'hasta': '2025-03-11'})
+        self.assertEqual(respuesta.status_code, 200)
+        primer_dia, segundo_dia = respuesta.data['dias']
+        self.assertEqual(primer_dia['fecha'], '2025-03-10')
+        self.assertNotIn('11:00', primer_dia['libres'])
+        self.assertNotIn('15:30', primer_dia['libres'])
+        self.assertEqual(len(primer_dia['libres']), 17)
+        self.assertEqual(segundo_dia['libres'][0], '11:00')
+        self.assertEqual(segundo_dia['libres'][-1], '20:00')
+        self.assertEqual(len(segundo_dia['libres']), 19)
+
+    def test_una_sola_consulta_de_turnos(self):
+        url = reverse('empleado-disponibilidad', args=[self.alfredo.pk])
+        with self.assertNumQueries(2):
+            self.api.get(url, {'desde': '2025-03-01', 'hasta': '2025-03-30'})
+
+    def test_combina_empleados_del_servicio(self):
+        respuesta = self.api.get(reverse('servicio-disponibilidad'), {
+            'servicio': self.servicio.pk, 'desde': '2025-03-10', 'hasta': '2025-03-10',
+        })
+        libres = respuesta.data['dias'][0]['libres']
+        self.assertNotIn('11:00', libres)
+        self.assertIn('15:30', libres)
+
+    def test_rango_invalido(self):
+        url = reverse('empleado-disponibilidad', args=[self.alfredo.pk])
+        self.assertEqual(self.api.get(url, {'desde': '2025-03-10', 'hasta': '2025-03-01'}).status_code, 400)
+        self.assertEqual(self.api.get(url, {'desde': '2025-01-01', 'hasta': '2025-12-31'}).status_code, 400)
+        self.assertEqual(self.api.get(url, {'desde': 'ayer'}).status_code, 400)
+        self.assertEqual(self.api.get(reverse('empleado-disponibilidad', args=[999])).status_code, 404)
+
+
+class ReservaTurnoTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cliente = self.crear_cliente(1)
+        self.otro_cliente = self.crear_cliente(2)
+        self.empleado = self.crear_empleado(1)
+        self.crear_turno(self.cliente, self.empleado, datetime.date(2025, 3, 10), datetime.time(11, 0))
+
+    def datos(self, cliente, hora='11:00'):
+        return {
+            'cliente': cliente.pk, 'empleado': self.empleado.pk, 'producto': self.producto.pk,
+            'fecha': '2025-03-10', 'hora': hora,
+        }
+
+    def test_horario_ocupado_devuelve_409_con_alternativas(self):
+        respuesta = self.api.post(reverse('turno-lista'), self.datos(self.otro_cliente), format='json')
+        self.assertEqual(respuesta.status_code, 409)
+        self.assertEqual(respuesta.data['alternativas'][0], {'fecha': '2025-03-10', 'hora': '11:30'})
+        self.assertEqual(Turno.objects.count(), 1)
+
+    def test_cliente_no_puede_tener_dos_turnos_a_la_misma_hora(self):
+        otro_empleado = self.crear_empleado(2)
+        datos = dict(self.datos(self.cliente), empleado=otro_empleado.pk)
+        respuesta = self.api.post(reverse('turno-lista'), datos, format='json')
+        self.assertEqual(respuesta.status_code, 409)
+
+    def test_mover_turno_a_horario_ocupado(self):
+        turno = self.crear_turno(self.otro_cliente, self.empleado, datetime.date(2025, 3, 10), datetime.time(12, 0))
+        respuesta = self.api.put(reverse('turno-detalle', args=[turno.pk]), self.datos(self.otro_cliente), format='json')
+        self.assertEqual(respuesta.status_code, 409)
+        turno.refresh_from_db()
+        self.assertEqual(turno.hora, datetime.time(12, 0))
+
+    def test_reserva_simultanea_pierde_con_409(self):
+        # Otra peticion confirma el mismo horario entre la validacion y el insert: decide la restriccion unica
+        validar = TurnoSerializer.is_valid
+
+        def validar_y_perder_la_carrera(serializer, *args, **kwargs):
+            valido = validar(serializer, *args, **kwargs)
+            self.crear_turno(self.cliente, self.empleado, datetime.date(2025, 3, 10), datetime.time(11, 30))
+            return valido
+
+        with mock.patch.object(TurnoSerializer, 'is_valid', validar_y_perder_la_carrera):
+            respuesta = self.api.post(reverse('turno-lista'), self.datos(self.otro_cliente, '11:30'), format='json')
+        self.assertEqual(respuesta.status_code, 409)
+        self.assertEqual(respuesta.data['alternativas'][0], {'fecha': '2025-03-10', 'hora': '12:00'})
+        self.assertFalse(Turno.objects.filter(cliente=self.otro_cliente).exists())
+
+    def test_horario_libre(self):
+        respuesta = self.api.post(reverse('turno-lista'), self.datos(self.otro_cliente, '11:30'), format='json')
+        self.assertEqual(respuesta.status_code, 201)
+
+
+class ReservaConcurrenteTests(DatosMixin, TransactionTestCase):
+    reservas = 20
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('la base SQLite en memoria se bloquea con escrituras desde varios hilos')
+        super().setUp()
+
+    def test_un_solo_ganador(self):
+        empleado = self.crear_empleado(1)
+        clientes = [self.crear_cliente(n) for n in range(self.reservas)]
+        barrera = threading.Barrier(self.reservas)
+        estados = []
+
+        def reservar(cliente):
+            api = APIClient()
+            api.force_authenticate(self.user)
+            try:
+                barrera.wait()
+                respuesta = api.post(reverse('turno-lista'), {
+                    'cliente': cliente.pk, 'empleado': empleado.pk, 'producto': self.producto.pk,
+                    'fecha': '2025-03-10', 'hora': '11:00',
+                }, format='json')
+                estados.append(respuesta.status_code)
+            finally:
+                connection.close()
+
+        hilos = [threading.Thread(target=reservar, args=(cliente,)) for cliente in clientes]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(estados.count(201), 1)
+        self.assertEqual(estados.count(409), self.reservas - 1)
+        self.assertEqual(Turno.objects.filter(empleado=empleado).count(), 1)
+
+
+class PlanesDeConsultaTests(TestCase):
+
+    def test_consultas_clave_usan_indices(self):
+        salida = StringIO()
+        call_command('verificar_indices', sembrar=3000, stdout=salida)
+        self.assertNotIn('FALLA', salida.getvalue())
+        self.assertEqual(Turno.objects.count(), 0)
+
+    def test_detecta_consulta_sin_indice(self):
+        self.assertTrue(problemas_de_plan(Turno.objects.order_by('producto_id', 'hora')))
+
+    def test_filtro_de_turnos_sin_indice_falla(self):
+        filtro = {'hora': ('hora__hour', int, 'La hora debe ser un numero')}
+        with mock.patch.dict(FILTROS_TURNO, filtro), self.assertRaises(CommandError):
+            call_command('verificar_indices', sembrar=3000, stdout=StringIO())
+
+
+class CacheCatalogoTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.anonimo = APIClient()
+
+    def test_lista_cacheada_hasta_que_cambia_el_catalogo(self):
+        url = reverse('producto-lista')
+        etag = self.anonimo.get(url)['ETag']
+        # el ETag sale de la version del catalogo: ni la respuesta ni el 304 consultan la base
+        with self.assertNumQueries(0):
+            respuesta = self.anonimo.get(url)
+            self.assertEqual(self.anonimo.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(len(respuesta.data['results']), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Producto.objects.create(servicio=self.servicio, nombre='Barba', precio=Decimal('800.00'))
+        respuesta = self.anonimo.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(len(respuesta.data['results']), 2)
+
+    def test_detalle_invalidado_al_editar_y_borrar(self):
+        url = reverse('servicio-detalle', args=[self.servicio.pk])
+        self.assertEqual(self.anonimo.get(url).data['nombre'], 'Corte')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api.put(url, {'nombre': 'Color'}, format='json')
+        etag = self.anonimo.get(url)['ETag']
+        # con el detalle en cache ni la respuesta ni el 304 consultan la base
+        with self.assertNumQueries(0):
+            self.assertEqual(self.anonimo.get(url).data['nombre'], 'Color')
+            self.assertEqual(self.anonimo.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.servicio.delete()
+        self.assertEqual(self.anonimo.get(url).status_code, 404)
+
+    def test_producto_borrado_en_cascada_invalida_productos(self):
+        url = reverse('producto-detalle', args=[self.producto.pk])
+        self.assertEqual(self.anonimo.get(url).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.servicio.delete()
+        self.assertEqual(self.anonimo.get(url).status_code, 404)
+
+    def test_version_perdida_no_reusa_claves_viejas(self):
+        anterior = catalogo.version(Producto)
+        cache.delete('catalogo:producto:version')
+        self.assertNotEqual(catalogo.version(Producto), anterior)
+
+
+class GetCondicionalTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cliente = self.crear_cliente(1)
+        self.empleado = self.crear_empleado(1)
+
+    def test_lista_responde_304_sin_serializar(self):
+        url = reverse('cliente-lista')
+        respuesta = self.api.get(url)
+        self.assertIn('ETag', respuesta)
+        self.assertNotIn('Last-Modified', respuesta)
+        with self.assertNumQueries(2):
+            respuesta = self.api.get(url, HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(respuesta.status_code, 304)
+
+    def test_etag_cambia_con_los_turnos_anidados(self):
+        url = reverse('cliente-detalle', args=[self.cliente.pk])
+        etag = self.api.get(url)['ETag']
+        self.crear_turno(self.cliente, self.empleado, datetime.date(2025, 1, 1), datetime.time(11, 0))
+        respuesta = self.api.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta['ETag'], etag)
+
+    def test_etag_cambia_al_borrar(self):
+        otro = self.crear_cliente(2)
+        url = reverse('cliente-lista')
+        etag = self.api.get(url)['ETag']
+        otro.delete()
+        self.assertEqual(self.api.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_if_modified_since(self):
+        turno = self.crear_turno(self.cliente, self.empleado, datetime.date(2025, 1, 1), datetime.time(11, 0))
+        url = reverse('turno-detalle', args=[turno.pk])
+        ultima = self.api.get(url)['Last-Modified']
+        self.assertEqual(self.api.get(url, HTTP_IF_MODIFIED_SINCE=ultima).status_code, 304)
+
+    def test_if_modified_since_no_oculta_borrados(self):
+        otro = Servicio.objects.create(nombre='Barba')
+        desde = http_date(time.time() + 60)
+        url = reverse('servicio-lista')
+        self.assertNotIn('Last-Modified', self.api.get(url))
+        with self.captureOnCommitCallbacks(execute=True):
+            otro.delete()
+        respuesta = self.api.get(url, HTTP_IF_MODIFIED_SINCE=desde)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(len(respuesta.data['results']), 1)
+        turno = self.crear_turno(self.cliente, self.empleado, datetime.date(2025, 1, 1), datetime.time(11, 0))
+        url = reverse('cliente-detalle', args=[self.cliente.pk])
+        self.assertNotIn('Last-Modified', self.api.get(url))
+        turno.delete()
+        self.assertEqual(self.api.get(url, HTTP_IF_MODIFIED_SINCE=desde).status_code, 200)
+
+    def test_etag_de_turnos_solo_depende_de_la_pagina(self):
+        for dia in range(1, 4):
+            self.crear_turno(self.cliente, self.empleado, datetime.date(2025, 1, dia), datetime.time(11, 0))
+        url = reverse('turno-lista') + '?page_size=2'
+        with CaptureQueriesContext(connection) as consultas:
+            etag = self.api.get(url)['ETag']
+        self.assertFalse(any('COUNT' in consulta['sql'] for consulta in consultas))
+        ultimo = Turno.objects.get(fecha=datetime.date(2025, 1, 3))
+        ultimo.hora = datetime.time(12, 0)
+        ultimo.save()
+        # El tercer turno solo cuenta para saber si hay pagina siguiente
+        self.assertEqual(self.api.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        primero = Turno.objects.get(fecha=datetime.date(2025, 1, 1))
+        primero.hora = datetime.time(12, 0)
+        primero.save()
+        self.assertEqual(self.api.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_de_clientes_solo_depende_de_la_pagina(self):
+        otro = self.crear_cliente(2)
+        url = reverse('cliente-lista') + '?page_size=1'
+        with CaptureQueriesContext(connection) as consultas:
+            etag = self.api.get(url)['ETag']
+        # la pagina con sus ids, el resumen de sus turnos y despues la respuesta
+        self.assertEqual(len(consultas), 4)
+        self.crear_turno(otro, self.empleado, datetime.date(2025, 1, 1), datetime.time(11, 0))
+        self.assertEqual(self.api.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.crear_turno(self.cliente, self.empleado, datetime.date(2025, 1, 2), datetime.time(11, 0))
+        self.assertEqual(self.api.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_put_con_if_match_detecta_actualizacion_perdida(self):
+        url = reverse('servicio-detalle', args=[self.servicio.pk])
+        etag = self.api.get(url, HTTP_ACCEPT='application/json')['ETag']
+        # el ETag del catalogo cambia con la version, que se incrementa al confirmar
+        with self.captureOnCommitCallbacks(execute=True):
+            primera = self.api.put(url, {'nombre': 'Color'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(primera.status_code, 200)
+        segunda = self.api.put(url, {'nombre': 'Barba'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(segunda.status_code, 412)
+        self.assertEqual(Servicio.objects.get(pk=self.servicio.pk).nombre, 'Color')
+
+
+class TurnoLoteTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.clientes = [self.crear_cliente(n) for n in range(3)]
+        self.empleado = self.crear_empleado(1)
+        self.crear_turno(self.clientes[0], self.empleado, datetime.date(2025, 3, 10), datetime.time(11, 0))
+
+    def item(self, cliente, hora, **extra):
+        return dict({
+            'cliente': cliente.pk, 'empleado': self.empleado.pk, 'producto': self.producto.pk,
+            'fecha': '2025-03-10', 'hora': hora,
+        }, **extra)
+
+    def test_consultas_fijas_sin_importar_el_tamanio(self):
+        items = [self.item(self.clientes[n % 3], f'{12 + n // 2}:{30 * (n % 2):02d}') for n in range(12)]
+        # 3 IN de relaciones, 1 rango de ocupados, el insert (con su savepoint) y el resumen diario
+        # (la fila del dia ya existe: se busca y se actualiza)
+        with self.assertNumQueries(9):
+            respuesta = self.api.post(reverse('turno-lote'), items, format='json')
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(len(respuesta.data['datos']), 12)
+        self.assertTrue(all(turno['id'] for turno in respuesta.data['datos']))
+
+    def test_todo_o_nada(self):
+        items = [
+            self.item(self.clientes[1], '12:00'),
+            self.item(self.clientes[1], '11:00'),
+            self.item(self.clientes[2], '12:00'),
+            self.item(self.clientes[2], '12:15'),
+            self.item(self.clientes[2], '13:00', producto=999),
+        ]
+        respuesta = self.api.post(reverse('turno-lote'), items, format='json')
+        self.assertEqual(respuesta.status_code, 400)
+        errores = {error['indice']: error['errores'] for error in respuesta.data['errores']}
+        self.assertEqual(sorted(errores), [1, 2, 3, 4])
+        self.assertIn('non_field_errors', errores[1])
+        self.assertIn('non_field_errors', errores[2])
+        self.assertIn('hora', errores[3])
+        self.assertIn('producto', errores[4])
+        self.assertEqual(Turno.objects.count(), 1)
+
+    def test_parcial(self):
+        items = [self.item(self.clientes[1], '12:00'), self.item(self.clientes[2], '11:00')]
+        respuesta = self.api.post(reverse('turno-lote') + '?modo=parcial', items, format='json')
+        self.assertEqual(respuesta.status_code, 201)
+        self.assertEqual(len(respuesta.data['datos']), 1)
+        self.assertEqual(respuesta.data['errores'][0]['indice'], 1)
+        self.assertEqual(Turno.objects.count(), 2)
+
+    def test_cuerpo_invalido(self):
+        self.assertEqual(self.api.post(reverse('turno-lote'), {'cliente': 1}, format='json').status_code, 400)
+        self.assertEqual(self.api.post(reverse('turno-lote') + '?modo=otro', [], format='json').status_code, 400)
+
+
+class ExportacionTurnosTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        otro_servicio = Servicio.objects.create(nombre='Color')
+        otro_producto = Producto.objects.create(servicio=otro_servicio, nombre='Tintura', precio=Decimal('3000.50'))
+        self.cliente = self.crear_cliente(1)
+        self.empleado = self.crear_empleado(1)
+        for dia in range(1, 4):
+            for hora in (datetime.time(11, 0), datetime.time(11, 30)):
+                self.crear_turno(self.cliente, self.empleado, datetime.date(2025, 5, dia), hora)
+        self.crear_turno(self.cliente, self.empleado, datetime.date(2025, 5, 4), datetime.time(12, 0), otro_producto)
+        self.crear_turno(self.cliente, self.empleado, datetime.date(2025, 6, 1), datetime.time(12, 0))
+
+    def exportar(self, **parametros):
+        respuesta = self.api.get(reverse('turno-exportar'), dict({'desde': '2025-05-01', 'hasta': '2025-05-31'}, **parametros))
+        self.assertEqual(respuesta.status_code, 200)
+        return b''.join(respuesta.streaming_content).decode()
+
+    def test_csv(self):
+        lineas = self.exportar().splitlines()
+        self.assertEqual(lineas[0].split(',')[:3], ['id', 'fecha', 'hora'])
+        self.assertEqual(len(lineas), 8)
+        self.assertIn('Tintura,3000.50', lineas[-1])
+
+    def test_ndjson_filtrado_por_servicio(self):
+        lineas = self.exportar(formato='ndjson', servicio=self.servicio.pk).splitlines()
+        self.assertEqual(len(lineas), 6)
+        self.assertEqual(json.loads(lineas[0])['cliente_nombre'], 'Juan')
+
+    def test_ventanas_sobre_el_indice(self):
+        turnos = turnos_en_rango(datetime.date(2025, 5, 1), datetime.date(2025, 5, 31), tamanio=2)
+        # 7 turnos en ventanas de 2: 4 consultas
+        with self.assertNumQueries(4):
+            ids = [turno.id for turno in turnos]
+        self.assertEqual(ids, list(Turno.objects.filter(fecha__month=5).order_by('fecha', 'hora', 'id').values_list('id', flat=True)))
+
+    def test_parametros_invalidos(self):
+        url = reverse('turno-exportar')
+        self.assertEqual(self.api.get(url, {'formato': 'xml'}).status_code, 400)
+        self.assertEqual(self.api.get(url, {'empleado': 'x'}).status_code, 400)
+
+
+class ImportarTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.crear_cliente(1)
+        self.directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directorio.cleanup)
+
+    def archivo(self, nombre, contenido):
+        ruta = os.path.join(self.directorio.name, nombre)
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            archivo.write(contenido)
+        return ruta
+
+    def clientes_csv(self, desde, hasta):
+        lineas = ['nombre,apellido,usuario,edad,email,celular,nro_socio']
+        lineas += [f'Ana,Lopez,ana{n},25,ana{n}@mail.com,{n:010d},{n}' for n in range(desde, hasta)]
+        return '\n'.join(lineas) + '\n'
+
+    def test_importa_clientes_y_rechaza_duplicados(self):
+        contenido = self.clientes_csv(100, 110)
+        contenido += 'Ana,Lopez,ana100,25,otra@mail.com,9999999999,999\n'
+        contenido += 'Ana,Lopez,cliente1,25,x@mail.com,8888888888,998\n'
+        contenido += 'A,Lopez,corto,25,y@mail.com,7777777777,997\n'
+        ruta = self.archivo('clientes.csv', contenido)
+        rechazados = os.path.join(self.directorio.name, 'rechazados.jsonl')
+        salida = StringIO()
+        # 1 carga de unicos existentes + por lote: savepoint, insert, terminos de busqueda, release
+        with self.assertNumQueries(1 + 4 * 2):
+            call_command('importar', 'cliente', ruta, lote=7, rechazados=rechazados, stdout=salida)
+        self.assertIn('10 clientes importados, 3 filas rechazadas', salida.getvalue())
+        self.assertEqual(Cliente.objects.count(), 11)
+        with open(rechazados, encoding='utf-8') as archivo:
+            errores = [json.loads(linea) for linea in archivo]
+        self.assertEqual([error['fila'] for error in errores], [11, 12, 13])
+        self.assertEqual(errores[0]['errores'], {'usuario': ['cliente with this usuario already exists.']})
+        self.assertIn('nombre', errores[2]['errores'])
+
+    def test_reanuda_desde_checkpoint(self):
+        ruta = self.archivo('clientes.csv', self.clientes_csv(100, 105))
+        checkpoint = os.path.join(self.directorio.name, 'avance.json')
+        with open(checkpoint, 'w') as archivo:
+            json.dump({'modelo': 'cliente', 'archivo': ruta, 'procesadas': 3}, archivo)
+        call_command('importar', 'cliente', ruta, checkpoint=checkpoint, stdout=StringIO())
+        self.assertEqual(sorted(Cliente.objects.values_list('nro_socio', flat=True)), [1, 103, 104])
+        with open(checkpoint) as archivo:
+            self.assertEqual(json.load(archivo)['procesadas'], 5)
+
+    def test_importa_empleados_y_turnos_json(self):
+        empleados = [
+            {'nombre': 'Luis', 'apellido': 'Diaz', 'usuario': 'luis', 'email': 'luis@mail.com',
+             'legajo': 7, 'sueldo': '1000.00', 'servicio': self.servicio.pk},
+            {'nombre': 'Eva', 'apellido': 'Diaz', 'usuario': 'eva', 'email': 'eva@mail.com',
+             'legajo': 8, 'sueldo': '1000.00', 'servicio': 999},
+        ]
+        call_command('importar', 'empleado', self.archivo('empleados.json', json.dumps(empleados)), stdout=StringIO())
+        empleado = Empleado.objects.get()
+        self.assertEqual(empleado.legajo, 7)
+
+        cliente = Cliente.objects.get()
+        turnos = [
+            {'cliente': cliente.pk, 'empleado': empleado.pk, 'producto': self.producto.pk, 'fecha': '2025-03-10', 'hora': hora}
+            for hora in ('11:00', '11:30', '11:30')
+        ]
+        contenido = '\n'.join(json.dumps(turno) for turno in turnos)
+        salida = StringIO()
+        call_command('importar', 'turno', self.archivo('turnos.ndjson', contenido), stdout=salida)
+        self.assertIn('2 turnos importados, 1 filas rechazadas', salida.getvalue())
+
+    def test_archivo_invalido(self):
+        with self.assertRaises(CommandError):
+            call_command('importar', 'cliente', self.archivo('clientes.xml', ''), stdout=StringIO())
+
+
+class VistasAsyncTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.factory = AsyncRequestFactory()
+        self.cliente = self.crear_cliente(1)
+        self.empleado = self.crear_empleado(1)
+        self.crear_turno(self.cliente, self.empleado, datetime.date(2025, 3, 10), datetime.time(11, 0))
+
+    async def llamar(self, vista, metodo, ruta, datos=None, usuario=True, **kwargs):
+        if datos is None:
+            request = getattr(self.factory, metodo)(ruta)
+        else:
+            request = getattr(self.factory, metodo)(ruta, json.dumps(datos), content_type='application/json')
+        if usuario:
+            force_authenticate(request, self.user)
+        respuesta = await vista.as_view()(request, **kwargs)
+        respuesta.render()
+        return respuesta
+
+    async def test_mismas_respuestas_que_las_vistas_sincronas(self):
+        ruta = reverse('cliente-lista')
+        asincrona = await self.llamar(views_async.ClienteAPIView, 'get', ruta)
+        sincrona = await sync_to_async(self.api.get)(ruta)
+        self.assertEqual(json.loads(asincrona.content), sincrona.json())
+        self.assertEqual(asincrona['ETag'], sincrona['ETag'])
+
+        ruta = reverse('empleado-detalle', args=[self.empleado.pk])
+        asincrona = await self.llamar(views_async.EmpleadoDetalleAPIView, 'get', ruta, id_empleado=self.empleado.pk)
+        sincrona = await sync_to_async(self.api.get)(ruta)
+        self.assertEqual(json.loads(asincrona.content), sincrona.json())
+
+    async def test_requiere_autenticacion(self):
+        respuesta = await self.llamar(views_async.TurnoAPIView, 'get', reverse('turno-lista'), usuario=False)
+        sincrona = await sync_to_async(APIClient().get)(reverse('turno-lista'))
+        self.assertEqual(respuesta.status_code, sincrona.status_code)
+
+    async def test_crear_actualizar_y_eliminar(self):
+        ruta = reverse('servicio-lista')
+        respuesta = await self.llamar(views_async.ServicioAPIView, 'post', ruta, {'nombre': 'Barba'})
+        self.assertEqual(respuesta.status_code, 201)
+        pk = respuesta.data['datos']['id']
+
+        ruta = reverse('servicio-detalle', args=[pk])
+        respuesta = await self.llamar(views_async.ServicioDetalleAPIView, 'put', ruta, {'nombre': 'Barba y bigote'}, id_servicio=pk)
+        self.assertEqual(respuesta.data['datos']['nombre'], 'Barba y bigote')
+        respuesta = await self.llamar(views_async.ServicioDetalleAPIView, 'delete', ruta, id_servicio=pk)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertFalse(await Servicio.objects.filter(pk=pk).aexists())
+        respuesta = await self.llamar(views_async.ServicioDetalleAPIView, 'delete', ruta, id_servicio=pk)
+        self.assertEqual(respuesta.status_code, 404)
+
+    async def test_guardan_con_el_save_del_serializer(self):
+        ruta = reverse('servicio-lista')
+        with mock.patch.object(ServicioSerializer, 'create', autospec=True, side_effect=ServicioSerializer.create) as crear:
+            respuesta = await self.llamar(views_async.ServicioAPIView, 'post', ruta, {'nombre': 'Barba'})
+        self.assertEqual(respuesta.status_code, 201)
+        crear.assert_called_once()
+        pk = respuesta.data['datos']['id']
+        ruta = reverse('servicio-detalle', args=[pk])
+        with mock.patch.object(ServicioSerializer, 'update', autospec=True, side_effect=ServicioSerializer.update) as actualizar:
+            await self.llamar(views_async.ServicioDetalleAPIView, 'put', ruta, {'nombre': 'Color'}, id_servicio=pk)
+        actualizar.assert_called_once()
+
+    async def test_reserva_ocupada_devuelve_409(self):
+        otro_cliente = await sync_to_async(self.crear_cliente)(2)
+        datos = {
+            'cliente': otro_cliente.pk, 'empleado': self.empleado.pk, 'producto': self.producto.pk,
+            'fecha': '2025-03-10', 'hora': '11:00',
+        }
+        respuesta = await self.llamar(views_async.TurnoAPIView, 'post', reverse('turno-lista'), datos)
+        self.assertEqual(respuesta.status_code, 409)
+        self.assertEqual(await Turno.objects.acount(), 1)
+
+
+@override_settings(REPLICAS=['replica1'], REPLICAS_PRIMARIA_SEGUNDOS=5)
+class ReplicasTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.usadas = []
+
+        def vista(request):
+            self.usadas.append(RouterReplicas().db_for_read(Turno))
+            return HttpResponse(status=400 if request.GET.get('falla') else 200)
+        self.middleware = ReplicasMiddleware(vista)
+
+    def test_lecturas_a_replica_y_escrituras_a_primaria(self):
+        self.middleware(self.factory.get('/turnos/'))
+        respuesta = self.middleware(self.factory.post('/turnos/'))
+        self.assertEqual(self.usadas, ['replica1', 'default'])
+        self.assertEqual(respuesta.cookies[COOKIE]['max-age'], 5)
+        self.assertEqual(RouterReplicas().db_for_read(Turno), 'default')
+        self.assertEqual(RouterReplicas().db_for_write(Turno), 'default')
+
+    def test_cookie_fija_la_primaria(self):
+        request = self.factory.get('/turnos/')
+        request.COOKIES[COOKIE] = '1'
+        self.middleware(request)
+        self.assertEqual(self.usadas, ['default'])
+
+    def test_escritura_fallida_no_fija_la_primaria(self):
+        respuesta = self.middleware(self.factory.post('/turnos/?falla=1'))
+        self.assertNotIn(COOKIE, respuesta.cookies)
+
+    def test_claim_del_token_fija_la_primaria(self):
+        escritor = User.objects.create_user(username='escritor', password='clave-segura-123')
+        lector = User.objects.create_user(username='lector', password='clave-segura-123')
+        encabezado = lambda usuario: {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(usuario)}'}
+        self.middleware(self.factory.post('/turnos/', **encabezado(escritor)))
+        self.middleware(self.factory.get('/turnos/', **encabezado(escritor)))
+        self.middleware(self.factory.get('/turnos/', **encabezado(lector)))
+        self.assertEqual(self.usadas, ['default', 'default', 'replica1'])
+
+    def test_catalogo_se_construye_desde_la_primaria(self):
+        def vista(request):
+            catalogo.obtener(Servicio, 'lista', 'x', lambda: self.usadas.append(RouterReplicas().db_for_read(Servicio)))
+            return HttpResponse()
+        ReplicasMiddleware(vista)(self.factory.get('/servicios/'))
+        self.assertEqual(self.usadas, ['default'])
+
+    async def test_middleware_async(self):
+        async def vista(request):
+            self.usadas.append(await sync_to_async(RouterReplicas().db_for_read)(Turno))
+            return HttpResponse()
+        await ReplicasMiddleware(vista)(AsyncRequestFactory().get('/turnos/'))
+        self.assertEqual(self.usadas, ['replica1'])
+
+
+class AutenticacionJWTTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        usuarios.limpiar()
+        self.usuario = User.objects.create_user(username='staff', password='clave-segura-123')
+        self.api = APIClient()
+        self.token = AccessToken.for_user(self.usuario)
+        self.api.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def test_ahorra_la_consulta_del_usuario(self):
+        resultados = autenticacion(self.usuario, repeticiones=2)
+        self.assertEqual(resultados['jwt']['consultas'], 1)
+        self.assertEqual(resultados['jwt_cacheada']['consultas'], 0)
+
+    def test_desactivar_invalida(self):
+        self.assertEqual(self.api.get(reverse('servicio-lista')).status_code, 200)
+        self.usuario.is_active = False
+        self.usuario.save()
+        self.assertEqual(self.api.get(reverse('servicio-lista')).status_code, 403)
+
+    @override_settings(JWT_REVOCACION=True)
+    def test_token_revocado(self):
+        self.assertEqual(self.api.post('/api/token/revocar').status_code, 200)
+        self.assertEqual(self.api.get(reverse('servicio-lista')).status_code, 403)
+        otro = APIClient()
+        otro.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.usuario)}')
+        self.assertEqual(otro.get(reverse('servicio-lista')).status_code, 200)
+
+    def test_revocacion_deshabilitada(self):
+        self.assertEqual(self.api.post('/api/token/revocar').status_code, 400)
+
+    def test_cache_acotada_y_con_vencimiento(self):
+        lru = CacheTTL(maximo=2, ttl=60)
+        for clave in 'abc':
+            lru.guardar(clave, clave)
+        self.assertIsNone(lru.obtener('a'))
+        self.assertEqual(lru.obtener('c'), 'c')
+        vencida = CacheTTL(maximo=2, ttl=-1)
+        vencida.guardar('a', 'a')
+        self.assertIsNone(vencida.obtener('a'))
+
+
+class DocumentacionTests(TestCase):
+
+    def setUp(self):
+        descriptor, self.ruta = tempfile.mkstemp(suffix='.json')
+        os.close(descriptor)
+        self.addCleanup(os.remove, self.ruta)
+        self.addCleanup(documentacion.descartar)
+        documentacion.descartar()
+
+    def test_generar_esquema(self):
+        call_command('generar_esquema', salida=self.ruta, stdout=StringIO())
+        esquema = json.loads(open(self.ruta).read())
+        self.assertIn('/turnos/', esquema['paths'])
+        parametros = [parametro['name'] for parametro in esquema['paths']['/turnos/']['get']['parameters']]
+        self.assertIn('desde', parametros)
+
+    def test_sirve_el_archivo_con_etag(self):
+        with open(self.ruta, 'w') as archivo:
+            archivo.write('{"swagger": "2.0"}')
+        with override_settings(OPENAPI_ESQUEMA=self.ruta):
+            respuesta = self.client.get(reverse('openapi'))
+            self.assertEqual(respuesta.content, b'{"swagger": "2.0"}')
+            etag = respuesta['ETag']
+            self.assertEqual(self.client.get(reverse('openapi'), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_interfaces_usan_el_esquema(self):
+        for url in ('/swagger/', '/redoc/'):
+            respuesta = self.client.get(url)
+            self.assertEqual(respuesta.status_code, 200)
+            self.assertContains(respuesta, reverse('openapi'))
+
+    def test_los_workers_no_cargan_drf_yasg(self):
+        resultados = arranque(repeticiones=1)
+        self.assertFalse(resultados['sin_drf_yasg']['drf_yasg'])
+        self.assertTrue(resultados['con_drf_yasg']['drf_yasg'])
+
+
+class AnaliticaTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.empleado = self.crear_empleado(1)
+        self.clientes = [self.crear_cliente(n) for n in range(2)]
+        self.otro = Producto.objects.create(servicio=self.servicio, nombre='Barba', precio=Decimal('700.00'))
+        self.dia = datetime.date(2025, 3, 10)
+
+    def resumen(self):
+        return sorted(ResumenDiario.objects.filter(turnos__gt=0).values_list('fecha', 'empleado_id', 'producto_id', 'turnos'))
+
+    def esperado(self):
+        filas = Turno.objects.values('fecha', 'empleado_id', 'producto_id').annotate(cantidad=Count('id'))
+        return sorted((fila['fecha'], fila['empleado_id'], fila['producto_id'], fila['cantidad']) for fila in filas)
+
+    def test_se_mantiene_al_crear_modificar_y_borrar(self):
+        turno = self.crear_turno(self.clientes[0], self.empleado, self.dia, datetime.time(11, 0))
+        self.crear_turno(self.clientes[1], self.empleado, self.dia, datetime.time(11, 30))
+        self.assertEqual(self.resumen(), [(self.dia, self.empleado.pk, self.producto.pk, 2)])
+        respuesta = self.api.put(reverse('turno-detalle', args=[turno.pk]), {
+            'cliente': self.clientes[0].pk, 'empleado': self.empleado.pk, 'producto': self.otro.pk,
+            'fecha': '2025-03-11', 'hora': '11:00',
+        }, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(self.resumen(), self.esperado())
+        self.api.post(reverse('turno-lote'), [{
+            'cliente': self.clientes[1].pk, 'empleado': self.empleado.pk, 'producto': self.otro.pk,
+            'fecha': '2025-03-11', 'hora': hora,
+        } for hora in ('12:00', '12:30')], format='json')
+        self.assertEqual(self.resumen(), self.esperado())
+        self.clientes[1].delete()
+        self.assertEqual(self.resumen(), self.esperado())
+
+    def test_borrar_el_ultimo_turno_borra_la_fila(self):
+        turno = self.crear_turno(self.clientes[0], self.empleado, self.dia, datetime.time(11, 0))
+        otro = self.crear_turno(self.clientes[1], self.empleado, self.dia, datetime.time(11, 30))
+        turno.delete()
+        self.assertEqual(list(ResumenDiario.objects.values_list('turnos', flat=True)), [1])
+        otro.delete()
+        self.assertFalse(ResumenDiario.objects.exists())
+
+    def test_resumen_desviado_no_impide_borrar(self):
+        turno = self.crear_turno(self.clientes[0], self.empleado, self.dia, datetime.time(11, 0))
+        otro = self.crear_turno(self.clientes[1], self.empleado, self.dia, datetime.time(11, 30))
+        ResumenDiario.objects.update(turnos=1)
+        turno.delete()
+        otro.delete()
+        self.assertFalse(Turno.objects.exists())
+        self.assertFalse(ResumenDiario.objects.exists())
+
+    def test_reconstruir_un_rango(self):
+        self.crear_turno(self.clientes[0], self.empleado, self.dia, datetime.time(11, 0))
+        self.crear_turno(self.clientes[0], self.empleado, self.dia + datetime.timedelta(days=40), datetime.time(11, 0))
+        Turno.objects.filter(fecha=self.dia).update(producto=self.otro)
+        self.assertNotEqual(self.resumen(), self.esperado())
+        call_command('reconstruir_resumenes', '--desde=2025-03-01', '--hasta=2025-03-31', '--dias=7', stdout=StringIO())
+        self.assertEqual(self.resumen(), self.esperado())
+
+    def test_ingresos_por_servicio_y_producto(self):
+        for hora in ('11:00', '11:30'):
+            self.crear_turno(self.clientes[0], self.empleado, self.dia, hora)
+        self.crear_turno(self.clientes[0], self.empleado, self.dia + datetime.timedelta(days=1), '11:00', producto=self.otro)
+        url = reverse('analitica-ingresos')
+        respuesta = self.api.get(url, {'desde': '2025-03-01', 'hasta': '2025-03-31', 'periodo': 'mes'})
+        self.assertEqual(respuesta.data['resultados'], [
+            {'periodo': '2025-03', 'servicio': self.servicio.pk, 'nombre': 'Corte', 'turnos': 3, 'ingresos': '3700.00'},
+        ])
+        respuesta = self.api.get(url, {'desde': '2025-03-10', 'hasta': '2025-03-11', 'agrupar': 'producto'})
+        self.assertEqual([(fila['periodo'], fila['producto'], fila['ingresos']) for fila in respuesta.data['resultados']], [
+            ('2025-03-10', self.producto.pk, '3000.00'), ('2025-03-11', self.otro.pk, '700.00'),
+        ])
+        self.assertEqual(self.api.get(url, {'agrupar': 'cliente'}).status_code, 400)
+
+    def test_ocupacion_sobre_los_slots_del_dia(self):
+        for hora in ('11:00', '11:30'):
+            self.crear_turno(self.clientes[0], self.empleado, self.dia, hora)
+        url = reverse('analitica-ocupacion')
+        respuesta = self.api.get(url, {'desde': '2025-03-10', 'hasta': '2025-03-16', 'periodo': 'mes'})
+        self.assertEqual(respuesta.data['resultados'], [{
+            'periodo': '2025-03', 'empleado': self.empleado.pk, 'turnos': 2, 'capacidad': 7 * 19, 'ocupacion': round(2 / 133, 4),
+        }])
+        respuesta = self.api.get(url, {'desde': '2025-03-10', 'hasta': '2025-03-10', 'empleado': self.empleado.pk + 1})
+        self.assertEqual(respuesta.data['resultados'], [])
+        self.assertEqual(self.api.get(url, {'periodo': 'anio'}).status_code, 400)
+
+
+class ValidacionUnicaTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cliente = self.crear_cliente(1)
+
+    def datos(self, n, **cambios):
+        datos = {
+            'nombre': 'Ana', 'apellido': 'Diaz', 'usuario': f'nuevo{n}', 'edad': 25,
+            'email': f'nuevo{n}@mail.com', 'celular': f'22{n:08d}', 'nro_socio': 1000 + n,
+        }
+        datos.update(cambios)
+        return datos
+
+    def test_repetidos_con_una_consulta_y_los_mismos_mensajes(self):
+        datos = self.datos(2, usuario='cliente1', email='cliente1@mail.com')
+        with CaptureQueriesContext(connection) as consultas:
+            serializer = ClienteSerializer(data=datos)
+            self.assertFalse(serializer.is_valid())
+        self.assertEqual(len(consultas), 1)
+        campo_por_campo = type('ClienteSerializer', (ClienteSerializer,), {'unicidad_en_una_consulta': False})(data=datos)
+        self.assertFalse(campo_por_campo.is_valid())
+        self.assertEqual(serializer.errors, campo_por_campo.errors)
+        self.assertEqual(sorted(serializer.errors), ['email', 'usuario'])
+
+    def test_many_valida_cada_item_con_sus_datos(self):
+        with CaptureQueriesContext(connection) as consultas:
+            serializer = ClienteSerializer(data=[self.datos(2, usuario='cliente1'), self.datos(3)], many=True)
+            self.assertFalse(serializer.is_valid())
+        self.assertEqual(len(consultas), 2)
+        self.assertEqual([sorted(errores) for errores in serializer.errors], [['usuario'], []])
+
+    def test_actualizar_no_choca_consigo_mismo(self):
+        respuesta = self.api.put(reverse('cliente-detalle', args=[self.cliente.pk]), self.datos(
+            1, usuario='cliente1', email='cliente1@mail.com', celular=self.cliente.celular, nro_socio=1,
+        ), format='json')
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+
+    def test_empleado_valor_invalido_no_se_consulta(self):
+        serializer = EmpleadoSerializer(data={
+            'nombre': 'Alfredo', 'apellido': 'Gomez', 'usuario': 'otro', 'email': 'no-es-email',
+            'legajo': 'abc', 'sueldo': '1000.00', 'servicio': self.servicio.pk,
+        })
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(sorted(serializer.errors), ['email', 'legajo'])
+
+    def test_benchmark_de_escrituras(self):
+        resultados = escrituras(repeticiones=3)
+        for variantes in resultados.values():
+            self.assertLess(variantes['una_consulta']['consultas'], variantes['por_campo']['consultas'])
+        self.assertEqual(Cliente.objects.count(), 1)
+
+
+class AdmisionTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        compuertas.limpiar()
+        self.addCleanup(compuertas.limpiar)
+
+    def test_compuerta_pasa_el_lugar_a_la_cola(self):
+        compuerta = Compuerta(limite=1, cola=1, espera=5)
+        self.assertTrue(compuerta.entrar())
+        resultado = []
+        hilo = threading.Thread(target=lambda: resultado.append(compuerta.entrar()))
+        hilo.start()
+        while not compuerta.esperando:
+            pass
+        compuerta.salir()
+        hilo.join()
+        self.assertEqual(resultado, [True])
+        self.assertEqual((compuerta.en_curso, compuerta.admitidas, compuerta.rechazadas), (1, 2, 0))
+
+    def test_compuerta_rechaza_con_la_cola_llena_o_al_vencer_la_espera(self):
+        compuerta = Compuerta(limite=1, cola=0, espera=5)
+        self.assertTrue(compuerta.entrar())
+        self.assertFalse(compuerta.entrar())
+        compuerta = Compuerta(limite=1, cola=1, espera=0.01)
+        self.assertTrue(compuerta.entrar())
+        self.assertFalse(compuerta.entrar())
+        self.assertEqual((len(compuerta.esperando), compuerta.rechazadas), (0, 1))
+
+    def test_compuerta_async(self):
+        async def probar():
+            compuerta = Compuerta(limite=1, cola=1, espera=5)
+            self.assertTrue(await compuerta.aentrar())
+            asyncio.get_running_loop().call_later(0.01, compuerta.salir)
+            return await compuerta.aentrar(), compuerta.en_curso
+        self.assertEqual(asyncio.run(probar()), (True, 1))
+
+    @override_settings(ADMISION_CONCURRENCIA={'lectura': 0, 'escritura': 4}, ADMISION_CONCURRENCIA_POR_CLASE={},
+                       ADMISION_ESPERA=0.01)
+    def test_saturado_responde_503_y_se_ve_en_metricas(self):
+        respuesta = self.api.get(reverse('turno-lista'))
+        self.assertEqual(respuesta.status_code, 503)
+        self.assertEqual(respuesta['Retry-After'], '1')
+        self.assertIn('error', respuesta.json())
+        texto = self.api.get(reverse('metricas')).content.decode()
+        self.assertIn('api_admision_rechazadas_total{clase="turnos",tipo="lectura"} 1', texto)
+        self.assertIn('api_admision_cola{clase="turnos",tipo="lectura"} 0', texto)
+
+    @override_settings(ADMISION_CUBETA={'lectura': (2, 0.01), 'escritura': (5, 1)})
+    def test_cubeta_por_usuario(self):
+        for _ in range(2):
+            self.assertEqual(self.api.get(reverse('servicio-lista')).status_code, 200)
+        respuesta = self.api.get(reverse('servicio-lista'))
+        self.assertEqual(respuesta.status_code, 429)
+        self.assertGreater(int(respuesta['Retry-After']), 0)
+        # Las escrituras y los demas usuarios tienen su propia cubeta
+        self.assertEqual(self.api.post(reverse('servicio-lista'), {'nombre': 'Barba'}, format='json').status_code, 201)
+        otro = APIClient()
+        otro.force_authenticate(User.objects.create_user(username='otro'))
+        self.assertEqual(otro.get(reverse('servicio-lista')).status_code, 200)
+        self.assertIn('api_cubeta_rechazadas_total{tipo="lectura"} 1', self.api.get(reverse('metricas')).content.decode())
+
+
+class JSONRapidoTests(DatosMixin, TestCase):
+
+    def test_misma_salida_que_drf(self):
+        datos = {
+            'precio': Decimal('1500.00'), 'sueldo': '1000.00', 'fecha': datetime.date(2025, 3, 10),
+            'hora': datetime.time(11, 30, 15, 123456), 'creado': datetime.datetime(2025, 3, 10, 11, 0, tzinfo=datetime.timezone.utc),
+            'id': uuid.UUID(int=7), 'texto': 'ñandú \u2028 "citas" \x00', 'error': [ErrorDetail('Invalido', code='invalid')],
+            1: None, 'ocupacion': 0.0526, 'lista': (x for x in range(3)),
+        }
+        esperado = JSONRenderer().render(dict(datos, lista=[0, 1, 2]))
+        self.assertEqual(JSONRendererRapido().render(datos), esperado)
+        self.assertEqual(JSONRendererRapido().render(None), b'')
+        # Lo que orjson no representa lo arma el de DRF
+        self.assertEqual(JSONRendererRapido().render({'grande': 2 ** 70}), b'{"grande":1180591620717411303424}')
+        self.assertEqual(JSONRendererRapido().render([1], 'application/json; indent=2'), JSONRenderer().render([1], 'application/json; indent=2'))
+
+    def test_respuestas_iguales_con_y_sin_json_rapido(self):
+        cliente = self.crear_cliente(1)
+        self.crear_turno(cliente, self.crear_empleado(1), datetime.date(2025, 3, 10), datetime.time(11, 0))
+        for ruta in (reverse('cliente-lista'), reverse('turno-lista'), reverse('producto-lista'), reverse('cliente-detalle', args=[cliente.pk])):
+            rapida = self.api.get(ruta).content
+            with override_settings(JSON_RAPIDO=False):
+                cache.clear()
+                self.assertEqual(self.api.get(ruta).content, rapida, ruta)
+
+    def test_parser(self):
+        def parsear(parser, contenido):
+            try:
+                return parser.parse(io.BytesIO(contenido))
+            except ParseError as error:
+                return str(error)
+        for contenido in (b'{"a": [1, 2.5, "\\u00f1"], "b": null}', b'{"n": 123456789012345678901234567890}', b'{"a": NaN}', b'{"a": '):
+            self.assertEqual(parsear(JSONParserRapido(), contenido), parsear(JSONParser(), contenido), contenido)
+        self.assertEqual(JSONParserRapido().parse(io.BytesIO(b'{"n": 123456789012345678901234567890}'))['n'], 123456789012345678901234567890)
+
+
+class CompresionTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        cliente = self.crear_cliente(1)
+        empleado = self.crear_empleado(1)
+        for dia in range(1, 21):
+            self.crear_turno(cliente, empleado, datetime.date(2025, 5, dia), datetime.time(11, 0))
+
+    def test_negociacion(self):
+        self.assertEqual(negociar(''), None)
+        self.assertEqual(negociar('gzip, deflate'), 'gzip')
+        self.assertEqual(negociar('gzip;q=0, identity'), None)
+        self.assertEqual(negociar('*;q=0.5'), 'br' if brotli else 'gzip')
+        self.assertEqual(negociar('br;q=0.2, gzip;q=0.8'), 'gzip')
+
+    def test_gzip_con_umbral(self):
+        ruta = reverse('turno-lista') + '?page_size=20'
+        sin_comprimir = self.api.get(ruta)
+        respuesta = self.api.get(ruta, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(respuesta['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', respuesta['Vary'])
+        self.assertEqual(gzip.decompress(respuesta.content), sin_comprimir.content)
+        self.assertLess(len(respuesta.content), len(sin_comprimir.content))
+        with override_settings(COMPRESION_MINIMO=len(sin_comprimir.content) + 1):
+            self.assertFalse(self.api.get(ruta, HTTP_ACCEPT_ENCODING='gzip').has_header('Content-Encoding'))
+
+    @skipUnless(brotli, 'brotli no esta instalado')
+    def test_brotli(self):
+        ruta = reverse('turno-lista') + '?page_size=20'
+        respuesta = self.api.get(ruta, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(respuesta['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(respuesta.content), self.api.get(ruta).content)
+
+    @override_settings(COMPRESION_MINIMO=0)
+    def test_if_match_con_etag_de_respuesta_comprimida(self):
+        url = reverse('cliente-detalle', args=[Cliente.objects.get().pk])
+        respuesta = self.api.get(url, HTTP_ACCEPT='application/json', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(respuesta['Content-Encoding'], 'gzip')
+        etag = respuesta['ETag']
+        self.assertTrue(etag.startswith('"') and etag.endswith('-gzip"'))
+        revalidada = self.api.get(url, HTTP_ACCEPT='application/json', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(revalidada.status_code, 304)
+        self.assertEqual(revalidada['ETag'], etag)
+        datos = {'nombre': 'Pedro', 'apellido': 'Perez', 'usuario': 'cliente1', 'edad': 30,
+                 'email': 'cliente1@mail.com', 'celular': '1100000001', 'nro_socio': 1}
+        primera = self.api.put(url, datos, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(primera.status_code, 200)
+        segunda = self.api.put(url, dict(datos, nombre='Jose'), format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(segunda.status_code, 412)
+        self.assertEqual(Cliente.objects.get().nombre, 'Pedro')
+
+    def test_exportacion_en_streaming(self):
+        parametros = {'desde': '2025-05-01', 'hasta': '2025-05-31'}
+        plano = b''.join(self.api.get(reverse('turno-exportar'), parametros).streaming_content)
+        respuesta = self.api.get(reverse('turno-exportar'), parametros, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(respuesta['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(respuesta.streaming_content)), plano)
+
+
+class AdminTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.create_superuser(username='admin', password='clave-segura-123'))
+        self.dia = datetime.date(2025, 3, 10)
+
+    def crear(self, cantidad, desde=0):
+        for n in range(desde, desde + cantidad):
+            servicio = Servicio.objects.create(nombre=f'Servicio{n}')
+            producto = Producto.objects.create(servicio=servicio, nombre=f'Producto{n}', precio=Decimal('100.00'))
+            self.crear_turno(self.crear_cliente(n), self.crear_empleado(n, servicio), self.dia, datetime.time(11, 0), producto)
+
+    def consultas(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(consultas)
+
+    def test_listados_sin_n_mas_1(self):
+        urls = [reverse(f'admin:api_{modelo}_changelist') for modelo in ('turno', 'producto', 'empleado', 'cliente')]
+        self.crear(2)
+        antes = [self.consultas(url) for url in urls]
+        self.crear(8, desde=2)
+        self.assertEqual([self.consultas(url) for url in urls], antes)
+
+    def test_date_hierarchy_y_formulario(self):
+        self.crear(3)
+        self.crear_turno(Cliente.objects.first(), Empleado.objects.first(), datetime.date(2024, 7, 1), datetime.time(11, 0))
+        respuesta = self.client.get(reverse('admin:api_turno_changelist'))
+        self.assertContains(respuesta, 'fecha__year=2024')
+        self.assertContains(respuesta, 'fecha__year=2025')
+        respuesta = self.client.get(reverse('admin:api_turno_changelist'), {'fecha__year': 2025})
+        self.assertContains(respuesta, 'fecha__month=3')
+        self.assertEqual(len(respuesta.context['cl'].result_list), 3)
+        formulario = self.client.get(reverse('admin:api_turno_change', args=[Turno.objects.first().pk]))
+        # Autocompletado: no se cargan todos los clientes en un <select>
+        self.assertContains(formulario, 'admin-autocomplete')
+        self.assertNotContains(formulario, 'cliente2@mail.com')
+
+    def test_autocompletado_de_clientes_usa_la_busqueda(self):
+        self.crear(3)
+        respuesta = self.client.get(reverse('admin:autocomplete'), {
+            'app_label': 'api', 'model_name': 'turno', 'field_name': 'cliente', 'term': 'cliente1',
+        })
+        self.assertEqual([resultado['id'] for resultado in respuesta.json()['results']], [str(Cliente.objects.get(usuario='cliente1').pk)])
+        respuesta = self.client.get(reverse('admin:api_empleado_changelist'), {'q': 'abc'})
+        self.assertEqual(respuesta.status_code, 200)
+
+
+class MetricasTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        registro.limpiar()
+        cliente = self.crear_cliente(1)
+        self.crear_turno(cliente, self.crear_empleado(1), datetime.date(2025, 3, 10), datetime.time(11, 0))
+
+    def test_server_timing_cuenta_consultas(self):
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.api.get(reverse('cliente-lista'))
+        self.assertIn(f'desc="{len(consultas)} consultas"', respuesta['Server-Timing'])
+        for metrica in ('db;dur=', 'ser;dur=', 'render;dur=', 'total;dur='):
+            self.assertIn(metrica, respuesta['Server-Timing'])
+
+    def test_agregados_por_nombre_de_ruta(self):
+        self.api.get(reverse('turno-lista'))
+        self.api.get(reverse('turno-lista'))
+        self.api.get(reverse('cliente-detalle', args=[999]))
+        texto = self.api.get(reverse('metricas')).content.decode()
+        self.assertIn('api_peticion_duracion_segundos_count{ruta="turno-lista",metodo="GET"} 2', texto)
+        self.assertIn('api_peticion_duracion_segundos_bucket{ruta="turno-lista",metodo="GET",le="+Inf"} 2', texto)
+        self.assertIn('api_consultas_sql_total{ruta="cliente-detalle",metodo="GET"} 2', texto)
+
+    def test_metodos_desconocidos_en_una_sola_etiqueta(self):
+        for metodo in ('FOO', 'BAR'):
+            self.api.generic(metodo, reverse('turno-lista'))
+        texto = self.api.get(reverse('metricas')).content.decode()
+        self.assertIn('api_peticion_duracion_segundos_count{ruta="turno-lista",metodo="OTHER"} 2', texto)
+        self.assertNotIn('metodo="FOO"', texto)
+
+    @override_settings(METRICAS_TOKEN='secreto')
+    def test_token_requerido(self):
+        self.assertEqual(self.client.get(reverse('metricas')).status_code, 401)
+        respuesta = self.client.get(reverse('metricas'), HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(respuesta.status_code, 200)
+
+
+class BenchmarkTests(TestCase):
+
+    def test_todas_las_rutas_tienen_escenario_y_responden(self):
+        sembrar(servicios=2, productos=4, clientes=30, empleados=3, turnos=60, desde=datetime.date(2025, 1, 1))
+        usuario = User.objects.create_user(username='bench')
+        cliente = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(usuario)}')
+        por_ruta = escenarios(muestras(datetime.date(2025, 1, 1)))
+        self.assertEqual(rutas_sin_escenario(por_ruta), [])
+        for lista in por_ruta.values():
+            for escenario in lista:
+                medicion = medir(cliente, escenario, repeticiones=2, calentamiento=0)
+                self.assertLess(medicion['estado'], 400, escenario.nombre)
+        # las escrituras se deshacen
+        self.assertEqual(Turno.objects.count(), 60)
+
+    def test_comparar_detecta_regresiones(self):
+        base = {'turno-lista': {'p95_ms': 10.0, 'consultas': 3, 'bytes': 100}}
+        actual = {'turno-lista': {'p95_ms': 13.0, 'consultas': 4, 'bytes': 100}}
+        _, regresiones = comparar(actual, base, tolerancia=0.2)
+        self.assertEqual(len(regresiones), 2)
+        _, regresiones = comparar(actual, base, tolerancia=0.5)
+        self.assertEqual(regresiones, ['turno-lista: 1 consultas mas'])
+
+
+class ListadosRapidosTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        Producto.objects.create(servicio=self.servicio, nombre='Barba', precio=Decimal('1234.5'))
+        clientes = [self.crear_cliente(n) for n in range(1, 5)]
+        empleados = [self.crear_empleado(n) for n in range(1, 4)]
+        for n, cliente in enumerate(clientes[:3]):
+            for dia in (2, 1):
+                self.crear_turno(cliente, empleados[n % 2], datetime.date(2025, 5, dia), datetime.time(11 + n, 30))
+
+    def paginas(self, url, rapido):
+        cache.clear()
+        contenidos = []
+        with self.settings(API_LISTADOS_RAPIDOS=rapido), CaptureQueriesContext(connection) as consultas:
+            while url:
+                respuesta = self.api.get(url)
+                self.assertEqual(respuesta.status_code, 200)
+                contenidos.append(respuesta.content)
+                url = respuesta.data['next']
+        return contenidos, len(consultas)
+
+    def test_mismo_json_que_los_serializers(self):
+        for nombre in ('producto-lista', 'servicio-lista', 'cliente-lista', 'empleado-lista', 'turno-lista'):
+            url = reverse(nombre) + '?page_size=2&count=1'
+            esperado, consultas_serializer = self.paginas(url, rapido=False)
+            obtenido, consultas = self.paginas(url, rapido=True)
+            self.assertEqual(obtenido, esperado, nombre)
+            self.assertEqual(consultas, consultas_serializer, nombre)
+
+    async def test_vistas_async(self):
+        request = AsyncRequestFactory().get(reverse('cliente-lista'))
+        force_authenticate(request, self.user)
+        respuesta = await views_async.ClienteAPIView.as_view()(request)
+        respuesta.render()
+        sincrona = await sync_to_async(self.api.get)(reverse('cliente-lista'))
+        self.assertEqual(respuesta.content, sincrona.content)
+
+
+class CamposYExpansionTests(DatosMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cliente = self.crear_cliente(1)
+        self.empleado = self.crear_empleado(1)
+        self.turno = self.crear_turno(self.cliente, self.empleado, datetime.date(2025, 5, 2), datetime.time(11, 30))
+
+    def get(self, url, rapido=True):
+        cache.clear()
+        with self.settings(API_LISTADOS_RAPIDOS=rapido), CaptureQueriesContext(connection) as consultas:
+            respuesta = self.api.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        return respuesta, [consulta['sql'] for consulta in consultas]
+
+    def test_fields_recorta_salida_y_columnas(self):
+        respuesta, consultas = self.get(reverse('cliente-lista') + '?fields=id,nombre')
+        self.assertEqual(respuesta.data['results'], [{'id': self.cliente.pk, 'nombre': 'Juan'}])
+        # resumenes del ETag y la pagina, sin la consulta de turnos
+        self.assertEqual(len(consultas), 3)
+        self.assertNotIn('email', consultas[-1])
+
+        respuesta, consultas = self.get(reverse('cliente-detalle', args=[self.cliente.pk]) + '?fields=nombre,turnos')
+        self.assertEqual(set(respuesta.data), {'nombre', 'turnos'})
+        self.assertEqual(len(respuesta.data['turnos']), 1)
+
+    def test_expand_en_una_sola_consulta(self):
+        url = reverse('turno-lista') + '?expand=cliente,empleado,producto'
+        respuesta, consultas = self.get(url)
+        turno = respuesta.data['results'][0]
+        self.assertEqual(turno['cliente']['usuario'], 'cliente1')
+        self.assertNotIn('turnos', turno['cliente'])
+        self.assertEqual(turno['empleado']['servicio'], self.servicio.pk)
+        self.assertEqual(turno['producto']['precio'], '1500.00')
+        # las filas de la pagina con las fechas de sus relaciones para el ETag, y la pagina con JOIN
+        self.assertEqual(len(consultas), 2)
+        self.assertIn('JOIN', consultas[-1])
+
+        respuesta, _ = self.get(reverse('turno-detalle', args=[self.turno.pk]) + '?expand=producto&fields=id,fecha')
+        self.assertEqual(respuesta.data, {
+            'id': self.turno.pk, 'fecha': '2025-05-02',
+            'producto': {'id': self.producto.pk, 'servicio': self.servicio.pk, 'nombre': 'Corte clasico', 'precio': '1500.00'},
+        })
+
+    def test_mismo_json_con_y_sin_lectura_rapida(self):
+        for url in (
+            reverse('turno-lista') + '?expand=cliente,producto&fields=id,hora,cliente',
+            reverse('producto-lista') + '?expand=servicio',
+            reverse('empleado-lista') + '?fields=id,turnos&expand=servicio',
+        ):
+            rapida, _ = self.get(url)
+            serializer, _ = self.get(url, rapido=False)
+            self.assertEqual(rapida.content, serializer.content, url)
+
+    def test_campos_invalidos(self):
+        respuesta = self.api.get(reverse('turno-lista') + '?fields=id,clave')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(respuesta.json(), {'error': 'Campos desconocidos: clave'})
+        respuesta = self.api.get(reverse('servicio-detalle', args=[self.servicio.pk]) + '?expand=productos')
+        self.assertEqual(respuesta.status_code, 400)
+
+    def test_etag_del_detalle_depende_de_la_seleccion(self):
+        url = reverse('turno-detalle', args=[self.turno.pk])
+        completo = self.api.get(url)['ETag']
+        self.assertNotEqual(self.api.get(url + '?fields=id')['ETag'], completo)
+        expandido = self.api.get(url + '?expand=cliente')['ETag']
+        Cliente.objects.filter(pk=self.cliente.pk).update(nombre='Pedro', updated_at=timezone.now() + datetime.timedelta(seconds=1))
+        self.assertNotEqual(self.api.get(url + '?expand=cliente')['ETag'], expandido)
+        self.assertEqual(self.api.get(url)['ETag'], completo)
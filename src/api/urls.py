@@ -1,17 +1,28 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, views_async
 from .views import index
 
+vistas = views_async if settings.API_VISTAS_ASYNC else views
+
 urlpatterns =[
     path('',index, name='inicio'),
-    path('productos/', views.ProductoAPIView.as_view(), name='producto-lista'),
-    path('productos/<int:id_producto>/', views.ProductoDetalleAPIView.as_view(), name='producto-detalle'),
-    path('clientes/', views.ClienteAPIView.as_view(),name='cliente-lista'),
-    path('clientes/<int:id_cliente>/', views.ClienteDetalleAPIView.as_view(), name='cliente-detalle'),
-    path('empleados/', views.EmpleadoAPIView.as_view(), name='empleado-lista'),
-    path('empleados/<int:id_empleado>/', views.EmpleadoDetalleAPIView.as_view(), name='empleado-detalle'),
-    path('turnos/', views.TurnoAPIView.as_view(), name='turno-lista'),
-    path('turnos/<int:id_turno>/', views.TurnoDetalleAPIView.as_view(), name='turno-detalle'),
-    path('servicios/', views.ServicioAPIView.as_view(), name='servicio-lista'),
-    path('servicios/<int:id_servicio>/', views.ServicioDetalleAPIView.as_view(), name='servicio-detalle'),
+    path('metrics', views.metricas, name='metricas'),
+    path('productos/', vistas.ProductoAPIView.as_view(), name='producto-lista'),
+    path('productos/<int:id_producto>/', vistas.ProductoDetalleAPIView.as_view(), name='producto-detalle'),
+    path('clientes/', vistas.ClienteAPIView.as_view(),name='cliente-lista'),
+    path('clientes/buscar/', views.ClienteBuscarAPIView.as_view(), name='cliente-buscar'),
+    path('clientes/<int:id_cliente>/', vistas.ClienteDetalleAPIView.as_view(), name='cliente-detalle'),
+    path('empleados/', vistas.EmpleadoAPIView.as_view(), name='empleado-lista'),
+    path('empleados/<int:id_empleado>/', vistas.EmpleadoDetalleAPIView.as_view(), name='empleado-detalle'),
+    path('empleados/<int:id_empleado>/disponibilidad/', views.EmpleadoDisponibilidadAPIView.as_view(), name='empleado-disponibilidad'),
+    path('empleados/disponibilidad/', views.ServicioDisponibilidadAPIView.as_view(), name='servicio-disponibilidad'),
+    path('turnos/', vistas.TurnoAPIView.as_view(), name='turno-lista'),
+    path('turnos/bulk/', views.TurnoLoteAPIView.as_view(), name='turno-lote'),
+    path('turnos/exportar/', views.TurnoExportarAPIView.as_view(), name='turno-exportar'),
+    path('turnos/<int:id_turno>/', vistas.TurnoDetalleAPIView.as_view(), name='turno-detalle'),
+    path('servicios/', vistas.ServicioAPIView.as_view(), name='servicio-lista'),
+    path('servicios/<int:id_servicio>/', vistas.ServicioDetalleAPIView.as_view(), name='servicio-detalle'),
+    path('analitica/ingresos/', views.IngresosAPIView.as_view(), name='analitica-ingresos'),
+    path('analitica/ocupacion/', views.OcupacionAPIView.as_view(), name='analitica-ocupacion'),
 ]
\ No newline at end of file
@@ -0,0 +1,143 @@
+import re
+from functools import lru_cache, reduce
+from operator import or_
+
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
+
+SOLO_LETRAS = re.compile(r'^[a-zA-ZáéíóúÁÉÍÓÚñÑ]+$')
+
+
+def nombre_propio(campo, value):
+    etiqueta = f'El {campo}'
+    if not value or not value.strip():
+        raise serializers.ValidationError({campo: f'{etiqueta} no puede estar vacío.'})
+    if not SOLO_LETRAS.match(value):
+        raise serializers.ValidationError({campo: f'{etiqueta} solo puede contener letras y no puede tener espacios u otros caracteres.'})
+    if len(value) < 2:
+        raise serializers.ValidationError({campo: f'{etiqueta} debe tener al menos 2 caracteres.'})
+    if len(value) > 36:
+        raise serializers.ValidationError({campo: f'{etiqueta} no puede exceder los 36 caracteres.'})
+    return value
+
+
+def usuario(value):
+    largo = len(str(value))
+    if largo < 3:
+        raise serializers.ValidationError({'usuario': 'El usuario no puede ser menor a 3 caracteres'})
+    elif largo > 18:
+        raise serializers.ValidationError({'usuario': 'El usuario no puede ser mayor a 18 caracteres'})
+    return value
+
+
+def celular(value):
+    texto = str(value)
+    if len(texto) < 10:
+        raise serializers.ValidationError({'celular': 'El celular no puede ser menor a 10 dígitos.'})
+    elif len(texto) > 25:
+        raise serializers.ValidationError({'celular': 'El celular no puede ser mayor a 25 dígitos.'})
+    if not texto.isdigit():
+        raise serializers.ValidationError({'celular': 'El celular solo puede contener dígitos numéricos.'})
+    return value
+
+
+class ValidacionPersona:
+    """Reglas comunes de nombre, apellido y usuario de clientes y empleados."""
+
+    def validate_nombre(self, value):
+        return nombre_propio('nombre', value)
+
+    def validate_apellido(self, value):
+        return nombre_propio('apellido', value)
+
+    def validate_usuario(self, value):
+        return usuario(value)
+
+
+@lru_cache(maxsize=None)
+def campos_unicos(modelo):
+    return tuple(campo.name for campo in modelo._meta.fields if campo.unique and not campo.primary_key)
+
+
+def mensaje_unico(modelo, campo):
+    """El mismo mensaje que arma ModelSerializer para el UniqueValidator del campo."""
+    campo_modelo = modelo._meta.get_field(campo)
+    return campo_modelo.error_messages['unique'] % {
+        'model_name': modelo._meta.verbose_name,
+        'field_label': campo_modelo.verbose_name,
+    }
+
+
+def repetidos(modelo, valores, excluir=None):
+    """
+    Campos de `valores` ({campo: valor}) que ya usa otra fila de `modelo`, con una sola consulta.
+    La comparacion la hace la base, con su collation, igual que el UniqueValidator.
+    """
+    valores = {campo: valor for campo, valor in valores.items() if valor is not None}
+    if not valores:
+        return set()
+    consulta = modelo._default_manager.filter(reduce(or_, (Q(**{campo: valor}) for campo, valor in valores.items())))
+    if excluir is not None:
+        consulta = consulta.exclude(pk=excluir.pk)
+    coincide = {
+        f'repite_{campo}': ExpressionWrapper(Q(**{campo: valor}), output_field=BooleanField())
+        for campo, valor in valores.items()
+    }
+    filas = consulta.annotate(**coincide).values_list(*coincide)
+    return {campo for fila in filas for campo, repite in zip(valores, fila) if repite}
+
+
+class UnicoEnBloque:
+    """Reemplazo del UniqueValidator que toma el resultado de la consulta compartida del serializer."""
+    requires_context = True
+
+    def __init__(self, message):
+        self.message = message
+
+    def __call__(self, value, field):
+        if field.field_name in field.parent.repetidos():
+            raise serializers.ValidationError(self.message, code='unique')
+
+
+class UnicidadEnUnaConsulta:
+    """
+    Verifica todos los campos unique del modelo con una sola consulta OR en lugar de una por
+    UniqueValidator. Los errores quedan en el mismo lugar y con el mismo mensaje: cada campo
+    conserva su validador, que consulta el resultado compartido.
+    """
+    unicidad_en_una_consulta = True
+
+    def get_fields(self):
+        campos = super().get_fields()
+        if self.unicidad_en_una_consulta:
+            for nombre in campos_unicos(self.Meta.model):
+                campo = campos.get(nombre)
+                if campo is not None:
+                    campo.validators = [
+                        UnicoEnBloque(validador.message) if isinstance(validador, UniqueValidator) else validador
+                        for validador in campo.validators
+                    ]
+        return campos
+
+    def to_internal_value(self, data):
+        # Con many=True el mismo serializer hijo valida cada item y no tiene initial_data:
+        # el resultado compartido es el de los datos que se estan validando
+        self._datos_unicidad, self._repetidos = data, None
+        return super().to_internal_value(data)
+
+    def repetidos(self):
+        if self._repetidos is None:
+            datos = self._datos_unicidad
+            valores = {}
+            for nombre in campos_unicos(self.Meta.model):
+                campo = self.fields.get(nombre)
+                if campo is None or campo.read_only or nombre not in datos:
+                    continue
+                try:
+                    valores[nombre] = campo.to_internal_value(datos[nombre])
+                except serializers.ValidationError:
+                    # El campo ya falla por su cuenta
+                    continue
+            self._repetidos = repetidos(self.Meta.model, valores, self.instance)
+        return self._repetidos
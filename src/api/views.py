@@ -1,33 +1,100 @@
+import datetime
+import json
+
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.db import IntegrityError, transaction
 from django.db.models.deletion import RestrictedError
+from django.utils.crypto import constant_time_compare
 
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAuthenticatedOrReadOnly
-from rest_framework.pagination import PageNumberPagination
 
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg.openapi import Response as OpenAPIResponse, Parameter, IN_PATH, TYPE_INTEGER
+from rest_framework_simplejwt.tokens import Token
 
-from .serializers import ProductoSerializer, ClienteSerializer, EmpleadoSerializer, TurnoSerializer, ServicioSerializer
+from .serializers import ProductoSerializer, ClienteSerializer, EmpleadoSerializer, TurnoSerializer, ServicioSerializer, prefetch_turnos
 from .models import Cliente, Empleado, Producto, Turno, Servicio
+from .pagination import PaginacionCursor, PaginacionTurnos
+from .disponibilidad import libres, horas_de, alternativas
+from . import catalogo
+from .condicional import condicional, estado_catalogo, estado_detalle, estado_pagina
+from .lote_turnos import validar_lote, guardar_lote
+from .exportacion import turnos_en_rango, FORMATOS
+from .metricas import registro
+from .admision import compuertas
+from .representacion import pagina_serializada, representacion
+from .campos import campos_de, parametros_seleccion, seleccion_de
+from .busqueda import MAX_RESULTADOS, buscar_clientes
+from .autenticacion import revocar
+from .filtros import filtrar_turnos, parametros_filtro_turnos
+from .analitica import AGRUPACIONES, PERIODOS, ingresos, ocupacion
+from .documentacion import INFO, esquema, swagger_auto_schema, OpenAPIResponse, Parameter, IN_PATH, IN_QUERY, TYPE_INTEGER, TYPE_STRING
 
 # Create your views here.
 def index(request):
     return render(request,'api/index.html')
 
+def metricas(request):
+    token = settings.METRICAS_TOKEN
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=401)
+    return HttpResponse(registro.exportar() + compuertas.exportar(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+def esquema_openapi(request):
+    contenido, etag = esquema()
+    etag = quote_etag(etag)
+    respuesta = get_conditional_response(request, etag=etag) or HttpResponse(contenido, content_type='application/json')
+    respuesta['ETag'] = etag
+    respuesta['Cache-Control'] = 'no-cache'
+    return respuesta
+
+# Las interfaces de drf_yasg (sus plantillas y estaticos) apuntando al esquema pregenerado
+def swagger(request):
+    ajustes = {'url': reverse('openapi'), 'validatorUrl': None, 'csrfCookie': settings.CSRF_COOKIE_NAME, 'csrfHeader': 'X-CSRFToken'}
+    return render(request, 'drf-yasg/swagger-ui.html', {
+        'title': INFO['title'], 'swagger_settings': json.dumps(ajustes), 'oauth2_config': '{}',
+    })
+
+def redoc(request):
+    return render(request, 'drf-yasg/redoc.html', {'title': INFO['title'], 'redoc_settings': json.dumps({'url': reverse('openapi')})})
+
+class RevocarTokenAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description='Revoca el token de acceso con el que se hace la peticion (requiere JWT_REVOCACION)',
+        responses={200: 'Token revocado', 400: 'La revocacion no esta habilitada o la peticion no usa un JWT'}
+    )
+    def post(self, request):
+        if not settings.JWT_REVOCACION:
+            return Response({'error': 'La revocacion de tokens no esta habilitada'}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(request.auth, Token):
+            return Response({'error': 'La peticion no se autentico con un token'}, status=status.HTTP_400_BAD_REQUEST)
+        revocar(request.auth)
+        return Response({'mensaje': 'Token revocado'}, status=status.HTTP_200_OK)
+
 class ProductoAPIView(APIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     @swagger_auto_schema(
         operation_description='Obtiene la lista de productos',
-        responses={200: ProductoSerializer(many=True)}
+        responses={200: ProductoSerializer(many=True)},
+        manual_parameters=parametros_seleccion
     )
+    @condicional(estado_catalogo(Producto))
     def get(self, request):
-        productos = Producto.objects.all()
-        serializer = ProductoSerializer(productos, many=True)
-        return Response(serializer.data)
+        def construir():
+            productos = Producto.objects.all()
+            paginator = PaginacionCursor()
+            datos = pagina_serializada(productos, ProductoSerializer, paginator, request)
+            return paginator.get_paginated_response(datos).data
+        return Response(catalogo.obtener(Producto, 'lista', request.build_absolute_uri(), construir))
 
     @swagger_auto_schema(
         operation_description='API para crear nuevo producto',
@@ -58,15 +125,22 @@ class ProductoDetalleAPIView(APIView):
 
     @swagger_auto_schema(
         operation_description='Obtiene un producto por id',
-        responses={200: ProductoSerializer()}
+        responses={200: ProductoSerializer()},
+        manual_parameters=parametros_seleccion
     )
+    @condicional(estado_catalogo(Producto))
     def get(self, request, id_producto):
-        try:
-            producto = Producto.objects.get(pk=id_producto)
-        except Producto.DoesNotExist:
+        seleccion = seleccion_de(request, ProductoSerializer)
+        def construir():
+            try:
+                producto = seleccion.queryset(Producto.objects.all()).get(pk=id_producto)
+            except Producto.DoesNotExist:
+                return None
+            return ProductoSerializer(producto, context={'seleccion': seleccion}).data
+        datos = catalogo.obtener(Producto, 'detalle', (id_producto, seleccion.clave()), construir)
+        if datos is None:
             return Response({'message': 'El producto no existe'}, status=status.HTTP_404_NOT_FOUND)
-        serializer = ProductoSerializer(producto)
-        return Response(serializer.data)
+        return Response(datos)
 
     def delete(self, request, id_producto):
         try:
@@ -78,6 +152,7 @@ class ProductoDetalleAPIView(APIView):
         except RestrictedError:
             return Response({'error': 'No se puede eliminar el producto porque tiene elementos relacionados'}, status=status.HTTP_400_BAD_REQUEST)
 
+    @condicional(estado_catalogo(Producto))
     def put(self, request, id_producto):
         try:
             producto = Producto.objects.get(pk=id_producto)
@@ -94,12 +169,14 @@ class ClienteAPIView(APIView):
     permission_classes= [IsAuthenticated]
     @swagger_auto_schema(
             operation_description='Obtiene la lista de clientes',
-            responses={200:ClienteSerializer(many=True)}
+            responses={200:ClienteSerializer(many=True)},
+            manual_parameters=parametros_seleccion
     )
+    @condicional(estado_pagina(Cliente, relacionado=Turno, relacion='cliente_id'))
     def get (self, request):
-        cliente = Cliente.objects.all()
-        serializer = ClienteSerializer(cliente, many=True)
-        return Response(serializer.data)
+        cliente = Cliente.objects.prefetch_related(prefetch_turnos('cliente_turno'))
+        paginator = PaginacionCursor()
+        return paginator.get_paginated_response(pagina_serializada(cliente, ClienteSerializer, paginator, request))
     @swagger_auto_schema(
             operation_description='API para crear nuevo cliente',
             request_body=ClienteSerializer,
@@ -137,16 +214,20 @@ class ClienteDetalleAPIView(APIView):
     permission_classes= [IsAuthenticated]
     @swagger_auto_schema(
             operation_description='Obtiene la lista de los turnos de cada cliente',
-            responses={200:ClienteSerializer(many=True)}
+            responses={200:ClienteSerializer(many=True)},
+            manual_parameters=parametros_seleccion
     )
+    @condicional(estado_detalle(Cliente, Turno, 'cliente_id'))
     def get(self, request, id_cliente):
+        seleccion = seleccion_de(request, ClienteSerializer)
         try:
-            cliente = Cliente.objects.get(pk=id_cliente)
+            cliente = seleccion.queryset(Cliente.objects.prefetch_related(prefetch_turnos('cliente_turno'))).get(pk=id_cliente)
         except Cliente.DoesNotExist:
             return Response({'error': 'Cliente no existente'}, status=status.HTTP_404_NOT_FOUND)
-        serializer = ClienteSerializer(cliente)
+        serializer = ClienteSerializer(cliente, context={'seleccion': seleccion})
         return Response(serializer.data)
 
+    @condicional(estado_detalle(Cliente, Turno, 'cliente_id'))
     def put(self, request, id_cliente):
         try:
             cliente = Cliente.objects.get(pk=id_cliente)
@@ -170,17 +251,50 @@ class ClienteDetalleAPIView(APIView):
             return Response({'error':'No se puede eliminar el cliente porque tiene elementos relacionados'},status=status.HTTP_400_BAD_REQUEST)
         
 
+class ClienteBuscarAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description='Busca clientes por nombre, apellido, usuario, email, celular o numero de socio. '
+                              'Cada palabra tiene que coincidir con el comienzo de una palabra de esos campos, sin '
+                              'distinguir mayusculas ni acentos; primero van los clientes con un campo que empieza '
+                              'con el texto. Por defecto no incluye los turnos.',
+        responses={200: ClienteSerializer(many=True)},
+        manual_parameters=[
+            Parameter('q', IN_QUERY, description='Texto a buscar', type=TYPE_STRING, required=True),
+            Parameter('limite', IN_QUERY, description=f'Cantidad de resultados, por defecto 10 y como maximo {MAX_RESULTADOS}', type=TYPE_INTEGER),
+            parametros_seleccion[0],
+        ]
+    )
+    def get(self, request):
+        texto = request.query_params.get('q', '').strip()
+        if not texto:
+            return Response({'error': 'Debe indicar el texto a buscar'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limite = min(max(int(request.query_params.get('limite', 10)), 1), MAX_RESULTADOS)
+        except ValueError:
+            return Response({'error': 'El limite debe ser un numero'}, status=status.HTTP_400_BAD_REQUEST)
+        seleccion = seleccion_de(request, ClienteSerializer)
+        campos = seleccion.campos or tuple(campo for campo in campos_de(ClienteSerializer) if campo != 'turnos')
+        ids = buscar_clientes(texto, limite)
+        rapida = representacion(ClienteSerializer, campos)
+        filas = {fila['id']: fila for fila in rapida.valores(Cliente.objects.filter(id__in=ids), extra=('id',))}
+        return Response({'results': rapida.convertir([filas[cliente_id] for cliente_id in ids if cliente_id in filas])})
+
+
 class EmpleadoAPIView(APIView):
     model = Empleado
     permission_classes= [IsAuthenticated]
     @swagger_auto_schema(
             operation_description='Obtiene la lista de empleados',
-            responses={200:EmpleadoSerializer(many=True)}
+            responses={200:EmpleadoSerializer(many=True)},
+            manual_parameters=parametros_seleccion
     )
+    @condicional(estado_pagina(Empleado, relacionado=Turno, relacion='empleado_id'))
     def get (self, request):
-        empleado = Empleado.objects.all()
-        serializer = EmpleadoSerializer(empleado, many=True)
-        return Response(serializer.data)
+        empleado = Empleado.objects.prefetch_related(prefetch_turnos('empleado_turno'))
+        paginator = PaginacionCursor()
+        return paginator.get_paginated_response(pagina_serializada(empleado, EmpleadoSerializer, paginator, request))
     @swagger_auto_schema(
             operation_description='API para crear nuevo empleado',
             request_body=EmpleadoSerializer,
@@ -217,16 +331,20 @@ class EmpleadoDetalleAPIView(APIView):
 
     @swagger_auto_schema(
         operation_description='Obtiene los datos de un empleado por ID',
-        responses={200: EmpleadoSerializer()}
+        responses={200: EmpleadoSerializer()},
+        manual_parameters=parametros_seleccion
     )
+    @condicional(estado_detalle(Empleado, Turno, 'empleado_id'))
     def get(self, request, id_empleado):
+        seleccion = seleccion_de(request, EmpleadoSerializer)
         try:
-            empleado = Empleado.objects.get(pk=id_empleado)
+            empleado = seleccion.queryset(Empleado.objects.prefetch_related(prefetch_turnos('empleado_turno'))).get(pk=id_empleado)
         except Empleado.DoesNotExist:
             return Response({'error': 'Empleado no existente'}, status=status.HTTP_404_NOT_FOUND)
-        serializer = EmpleadoSerializer(empleado)
+        serializer = EmpleadoSerializer(empleado, context={'seleccion': seleccion})
         return Response(serializer.data)
 
+    @condicional(estado_detalle(Empleado, Turno, 'empleado_id'))
     def put(self, request, id_empleado):
         try:
             empleado = Empleado.objects.get(pk=id_empleado)
@@ -248,20 +366,95 @@ class EmpleadoDetalleAPIView(APIView):
         except RestrictedError:
             return Response({'error': 'No se puede eliminar el empleado porque tiene elementos relacionados'}, status=status.HTTP_400_BAD_REQUEST)
 
+MAX_DIAS_DISPONIBILIDAD = 62
+
+parametros_rango_fechas = [
+    Parameter('desde', IN_QUERY, description='Fecha inicial (AAAA-MM-DD), por defecto hoy', type=TYPE_STRING),
+    Parameter('hasta', IN_QUERY, description='Fecha final inclusive (AAAA-MM-DD), por defecto desde + 6 dias', type=TYPE_STRING),
+]
+
+def rango_fechas(request, max_dias=MAX_DIAS_DISPONIBILIDAD):
+    try:
+        desde = datetime.date.fromisoformat(request.query_params['desde']) if 'desde' in request.query_params else datetime.date.today()
+        hasta = datetime.date.fromisoformat(request.query_params['hasta']) if 'hasta' in request.query_params else desde + datetime.timedelta(days=6)
+    except ValueError:
+        return None, None, 'Las fechas deben tener el formato AAAA-MM-DD'
+    if hasta < desde:
+        return None, None, 'La fecha hasta no puede ser anterior a la fecha desde'
+    if (hasta - desde).days >= max_dias:
+        return None, None, f'El rango no puede superar los {max_dias} dias'
+    return desde, hasta, None
+
+def respuesta_disponibilidad(empleado_ids, desde, hasta):
+    dias = [
+        {'fecha': fecha.isoformat(), 'libres': horas_de(mascara)}
+        for fecha, mascara in libres(empleado_ids, desde, hasta).items()
+    ]
+    return Response({'desde': desde.isoformat(), 'hasta': hasta.isoformat(), 'dias': dias})
+
+class EmpleadoDisponibilidadAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description='Obtiene los horarios libres de un empleado por dia',
+        manual_parameters=parametros_rango_fechas
+    )
+    def get(self, request, id_empleado):
+        if not Empleado.objects.filter(pk=id_empleado).exists():
+            return Response({'error': 'Empleado no existente'}, status=status.HTTP_404_NOT_FOUND)
+        desde, hasta, error = rango_fechas(request)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        return respuesta_disponibilidad([id_empleado], desde, hasta)
+
+class ServicioDisponibilidadAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description='Obtiene los horarios en que al menos un empleado del servicio esta libre',
+        manual_parameters=parametros_rango_fechas + [
+            Parameter('servicio', IN_QUERY, description='ID del servicio', type=TYPE_INTEGER, required=True),
+        ]
+    )
+    def get(self, request):
+        try:
+            id_servicio = int(request.query_params['servicio'])
+        except (KeyError, ValueError):
+            return Response({'error': 'Debe indicar el servicio'}, status=status.HTTP_400_BAD_REQUEST)
+        if not Servicio.objects.filter(pk=id_servicio).exists():
+            return Response({'error': 'El servicio no existe'}, status=status.HTTP_404_NOT_FOUND)
+        desde, hasta, error = rango_fechas(request)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        empleado_ids = list(Empleado.objects.filter(servicio_id=id_servicio).values_list('id', flat=True))
+        return respuesta_disponibilidad(empleado_ids, desde, hasta)
+
+def reservar_turno(serializer, mensaje, estado):
+    # Sin lock global: la restriccion unica decide quien gana y el resto recibe 409 con otras opciones
+    try:
+        with transaction.atomic():
+            serializer.save()
+    except IntegrityError:
+        datos = serializer.validated_data
+        return Response({
+            'error': 'El empleado o el cliente ya tiene un turno en ese horario',
+            'alternativas': alternativas(datos['empleado'].pk, datos['cliente'].pk, datos['fecha']),
+        }, status=status.HTTP_409_CONFLICT)
+    return Response({'mensaje': mensaje, 'datos': serializer.data}, status=estado)
+
 class TurnoAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     @swagger_auto_schema(
-        operation_description='Obtiene la lista de turnos',
-        responses={200: TurnoSerializer(many=True)}
+        operation_description='Obtiene la lista de turnos, filtrada por rango de fechas, empleado, cliente, producto o servicio',
+        responses={200: TurnoSerializer(many=True)},
+        manual_parameters=parametros_seleccion + parametros_filtro_turnos
     )
+    @condicional(estado_pagina(Turno, filtrar_turnos, PaginacionTurnos))
     def get(self, request):
-        turnos = Turno.objects.all()
-        paginator = PageNumberPagination()
-        paginator.page_size = 10
-        paginated_queryset = paginator.paginate_queryset(turnos, request)
-        serializer = TurnoSerializer(paginated_queryset, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        turnos, orden = filtrar_turnos(Turno.objects.all(), request.query_params)
+        paginator = PaginacionTurnos(orden)
+        return paginator.get_paginated_response(pagina_serializada(turnos, TurnoSerializer, paginator, request))
 
     @swagger_auto_schema(
         operation_description='API para crear nuevo turno',
@@ -280,31 +473,124 @@ class TurnoAPIView(APIView):
                     }
                 }
             ),
-            403: 'No tiene permisos para acceder al recurso'
+            403: 'No tiene permisos para acceder al recurso',
+            409: OpenAPIResponse(
+                description='El horario ya esta reservado',
+                examples={
+                    'application/json': {
+                        'error': 'El empleado o el cliente ya tiene un turno en ese horario',
+                        'alternativas': [{'fecha': '2025-03-10', 'hora': '11:30'}],
+                    }
+                }
+            ),
         }
     )
     def post(self, request):
         serializer = TurnoSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
-            return Response({'mensaje': 'Turno creado exitosamente', 'datos': serializer.data}, status=status.HTTP_201_CREATED)
+            return reservar_turno(serializer, 'Turno creado exitosamente', status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+MAX_LOTE_TURNOS = 500
+
+class TurnoLoteAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description='Crea varios turnos en una sola peticion. Con ?modo=parcial se guardan los '
+                              'turnos validos aunque otros tengan errores; por defecto es todo o nada.',
+        request_body=TurnoSerializer(many=True),
+        manual_parameters=[
+            Parameter('modo', IN_QUERY, description='todo (por defecto) o parcial', type=TYPE_STRING),
+        ],
+        responses={
+            201: TurnoSerializer(many=True),
+            400: OpenAPIResponse(
+                description='Errores por turno, indicados por su posicion en la lista',
+                examples={
+                    'application/json': {
+                        'errores': [{'indice': 0, 'errores': {'hora': ['La hora del turno debe ser entre las 11:00 y las 20:00.']}}]
+                    }
+                }
+            ),
+            403: 'No tiene permisos para acceder al recurso'
+        }
+    )
+    def post(self, request):
+        modo = request.query_params.get('modo', 'todo')
+        if modo not in ('todo', 'parcial'):
+            return Response({'error': 'El modo debe ser todo o parcial'}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(request.data, list) or not request.data:
+            return Response({'error': 'Se espera una lista de turnos'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(request.data) > MAX_LOTE_TURNOS:
+            return Response({'error': f'No se pueden crear mas de {MAX_LOTE_TURNOS} turnos por peticion'}, status=status.HTTP_400_BAD_REQUEST)
+
+        turnos, errores = validar_lote(request.data)
+        creados = guardar_lote(turnos, errores, parcial=modo == 'parcial')
+        respuesta = {
+            'errores': [{'indice': indice, 'errores': errores[indice]} for indice in sorted(errores)],
+        }
+        if not creados:
+            return Response(respuesta, status=status.HTTP_400_BAD_REQUEST)
+        respuesta = {
+            'mensaje': 'Turnos creados exitosamente',
+            'datos': TurnoSerializer(creados, many=True).data,
+            **respuesta,
+        }
+        return Response(respuesta, status=status.HTTP_201_CREATED)
+
+MAX_DIAS_EXPORTACION = 366
+
+class TurnoExportarAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description='Exporta los turnos de un rango de fechas con cliente, empleado y producto en CSV o NDJSON',
+        manual_parameters=parametros_rango_fechas + [
+            Parameter('formato', IN_QUERY, description='csv (por defecto) o ndjson', type=TYPE_STRING),
+            Parameter('empleado', IN_QUERY, description='ID del empleado', type=TYPE_INTEGER),
+            Parameter('servicio', IN_QUERY, description='ID del servicio', type=TYPE_INTEGER),
+        ]
+    )
+    def get(self, request):
+        formato = request.query_params.get('formato', 'csv')
+        if formato not in FORMATOS:
+            return Response({'error': 'El formato debe ser csv o ndjson'}, status=status.HTTP_400_BAD_REQUEST)
+        desde, hasta, error = rango_fechas(request, max_dias=MAX_DIAS_EXPORTACION)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        filtros = {}
+        for campo in ('empleado', 'servicio'):
+            if campo in request.query_params:
+                try:
+                    filtros[campo] = int(request.query_params[campo])
+                except ValueError:
+                    return Response({'error': f'El {campo} debe ser un numero'}, status=status.HTTP_400_BAD_REQUEST)
+
+        generador, content_type = FORMATOS[formato]
+        respuesta = StreamingHttpResponse(generador(turnos_en_rango(desde, hasta, **filtros)), content_type=content_type)
+        respuesta['Content-Disposition'] = f'attachment; filename="turnos_{desde}_{hasta}.{formato}"'
+        return respuesta
+
 class TurnoDetalleAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     @swagger_auto_schema(
         operation_description='Obtiene los datos de un turno por ID',
-        responses={200: TurnoSerializer()}
+        responses={200: TurnoSerializer()},
+        manual_parameters=parametros_seleccion
     )
+    @condicional(estado_detalle(Turno))
     def get(self, request, id_turno):
+        seleccion = seleccion_de(request, TurnoSerializer)
         try:
-            turno = Turno.objects.get(pk=id_turno)
+            turno = seleccion.queryset(Turno.objects.all()).get(pk=id_turno)
         except Turno.DoesNotExist:
             return Response({'error': 'El turno no existe'}, status=status.HTTP_404_NOT_FOUND)
-        serializer = TurnoSerializer(turno)
+        serializer = TurnoSerializer(turno, context={'seleccion': seleccion})
         return Response(serializer.data)
 
+    @condicional(estado_detalle(Turno))
     def put(self, request, id_turno):
         try:
             turno = Turno.objects.get(pk=id_turno)
@@ -312,8 +598,7 @@ class TurnoDetalleAPIView(APIView):
             return Response({'message': 'El turno no existe'}, status=status.HTTP_404_NOT_FOUND)
         serializer = TurnoSerializer(turno, data=request.data)
         if serializer.is_valid():
-            serializer.save()
-            return Response({'mensaje': 'Turno actualizado exitosamente', 'datos': serializer.data}, status=status.HTTP_200_OK)
+            return reservar_turno(serializer, 'Turno actualizado exitosamente', status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request, id_turno):
@@ -331,12 +616,17 @@ class ServicioAPIView(APIView):
 
     @swagger_auto_schema(
         operation_description='Obtiene la lista de servicios',
-        responses={200: ServicioSerializer(many=True)}
+        responses={200: ServicioSerializer(many=True)},
+        manual_parameters=parametros_seleccion
     )
+    @condicional(estado_catalogo(Servicio))
     def get(self, request):
-        servicios = Servicio.objects.all()
-        serializer = ServicioSerializer(servicios, many=True)
-        return Response(serializer.data)
+        def construir():
+            servicios = Servicio.objects.all()
+            paginator = PaginacionCursor()
+            datos = pagina_serializada(servicios, ServicioSerializer, paginator, request)
+            return paginator.get_paginated_response(datos).data
+        return Response(catalogo.obtener(Servicio, 'lista', request.build_absolute_uri(), construir))
 
     @swagger_auto_schema(
         operation_description='API para crear nuevo servicio',
@@ -366,16 +656,24 @@ class ServicioDetalleAPIView(APIView):
 
     @swagger_auto_schema(
         operation_description='Obtiene los datos de un servicio por ID',
-        responses={200: ServicioSerializer()}
+        responses={200: ServicioSerializer()},
+        manual_parameters=parametros_seleccion
     )
+    @condicional(estado_catalogo(Servicio))
     def get(self, request, id_servicio):
-        try:
-            servicio = Servicio.objects.get(pk=id_servicio)
-        except Servicio.DoesNotExist:
+        seleccion = seleccion_de(request, ServicioSerializer)
+        def construir():
+            try:
+                servicio = seleccion.queryset(Servicio.objects.all()).get(pk=id_servicio)
+            except Servicio.DoesNotExist:
+                return None
+            return ServicioSerializer(servicio, context={'seleccion': seleccion}).data
+        datos = catalogo.obtener(Servicio, 'detalle', (id_servicio, seleccion.clave()), construir)
+        if datos is None:
             return Response({'error': 'El servicio no existe'}, status=status.HTTP_404_NOT_FOUND)
-        serializer = ServicioSerializer(servicio)
-        return Response(serializer.data)
+        return Response(datos)
 
+    @condicional(estado_catalogo(Servicio))
     def put(self, request, id_servicio):
         try:
             servicio = Servicio.objects.get(pk=id_servicio)
@@ -395,4 +693,65 @@ class ServicioDetalleAPIView(APIView):
         except Servicio.DoesNotExist:
             return Response({'message': 'El servicio no existe'}, status=status.HTTP_404_NOT_FOUND)
         except RestrictedError:
-            return Response({'error': 'No se puede eliminar el servicio porque tiene elementos relacionados'}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+            return Response({'error': 'No se puede eliminar el servicio porque tiene elementos relacionados'}, status=status.HTTP_400_BAD_REQUEST)
+
+MAX_DIAS_ANALITICA = 366
+
+parametro_periodo = Parameter('periodo', IN_QUERY, description='dia (por defecto) o mes', type=TYPE_STRING)
+
+def periodo_de(request):
+    periodo = request.query_params.get('periodo', 'dia')
+    return periodo, None if periodo in PERIODOS else 'El periodo debe ser dia o mes'
+
+class IngresosAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description='Turnos e ingresos (precio actual del producto por cantidad de turnos) por dia o mes, '
+                              'agrupados por servicio o producto. Se calcula desde el resumen diario de turnos.',
+        manual_parameters=parametros_rango_fechas + [
+            parametro_periodo,
+            Parameter('agrupar', IN_QUERY, description='servicio (por defecto) o producto', type=TYPE_STRING),
+        ]
+    )
+    def get(self, request):
+        desde, hasta, error = rango_fechas(request, max_dias=MAX_DIAS_ANALITICA)
+        periodo, error_periodo = periodo_de(request)
+        agrupar = request.query_params.get('agrupar', 'servicio')
+        if agrupar not in AGRUPACIONES:
+            error_periodo = 'Se puede agrupar por servicio o producto'
+        if error or error_periodo:
+            return Response({'error': error or error_periodo}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'desde': desde.isoformat(), 'hasta': hasta.isoformat(), 'periodo': periodo, 'agrupar': agrupar,
+            'resultados': ingresos(desde, hasta, agrupar, periodo),
+        })
+
+class OcupacionAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description='Ocupacion de los empleados por dia o mes: turnos sobre los 19 horarios de cada dia. '
+                              'Solo aparecen los empleados con turnos en el periodo.',
+        manual_parameters=parametros_rango_fechas + [
+            parametro_periodo,
+            Parameter('empleado', IN_QUERY, description='ID del empleado', type=TYPE_INTEGER),
+            Parameter('servicio', IN_QUERY, description='ID del servicio', type=TYPE_INTEGER),
+        ]
+    )
+    def get(self, request):
+        desde, hasta, error = rango_fechas(request, max_dias=MAX_DIAS_ANALITICA)
+        periodo, error_periodo = periodo_de(request)
+        if error or error_periodo:
+            return Response({'error': error or error_periodo}, status=status.HTTP_400_BAD_REQUEST)
+        filtros = {}
+        for nombre in ('empleado', 'servicio'):
+            if nombre in request.query_params:
+                try:
+                    filtros[nombre] = int(request.query_params[nombre])
+                except ValueError:
+                    return Response({'error': f'El {nombre} debe ser un numero'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'desde': desde.isoformat(), 'hasta': hasta.isoformat(), 'periodo': periodo,
+            'resultados': ocupacion(desde, hasta, periodo, **filtros),
+        })
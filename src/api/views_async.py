@@ -0,0 +1,299 @@
+from asgiref.sync import sync_to_async
+from django.db.models.deletion import RestrictedError
+
+from rest_framework.response import Response
+from rest_framework import status
+
+from . import views, catalogo
+from .asincrono import AsyncAPIView, mismo_schema
+from .campos import seleccion_de
+from .condicional import condicional, estado_catalogo, estado_detalle, estado_pagina
+from .filtros import filtrar_turnos
+from .pagination import PaginacionCursor, PaginacionTurnos
+from .representacion import apagina_serializada
+from .serializers import ProductoSerializer, ClienteSerializer, EmpleadoSerializer, TurnoSerializer, ServicioSerializer, prefetch_turnos
+from .models import Cliente, Empleado, Producto, Turno, Servicio
+
+# Versiones async de las vistas de views.py para servir con config/asgi.py (API_VISTAS_ASYNC).
+# Heredan permisos y documentacion; las lecturas usan el ORM async y solo se delega a un
+# hilo lo que Django no ofrece en async (validaciones de serializers, transacciones).
+
+async def validar(serializer):
+    return await sync_to_async(serializer.is_valid)()
+
+async def guardar(serializer):
+    # El mismo save() que las vistas sync, con los create/update del serializer
+    return await sync_to_async(serializer.save)()
+
+async def serializar(serializer):
+    # Los turnos anidados de cliente y empleado pueden necesitar una consulta si no se precargaron
+    return await sync_to_async(lambda: serializer.data)()
+
+async def listar(queryset, request, serializer_class, paginator=None):
+    paginator = paginator or PaginacionCursor()
+    return paginator.get_paginated_response(await apagina_serializada(queryset, serializer_class, paginator, request))
+
+
+class ProductoAPIView(AsyncAPIView, views.ProductoAPIView):
+
+    @mismo_schema(views.ProductoAPIView.get)
+    @condicional(estado_catalogo(Producto))
+    async def get(self, request):
+        async def construir():
+            return (await listar(Producto.objects.all(), request, ProductoSerializer)).data
+        return Response(await catalogo.aobtener(Producto, 'lista', request.build_absolute_uri(), construir))
+
+    @mismo_schema(views.ProductoAPIView.post)
+    async def post(self, request):
+        serializer = ProductoSerializer(data=request.data)
+        if await validar(serializer):
+            await guardar(serializer)
+            return Response({'mensaje': 'Producto creado exitosamente', 'datos': serializer.data}, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class ProductoDetalleAPIView(AsyncAPIView, views.ProductoDetalleAPIView):
+
+    @mismo_schema(views.ProductoDetalleAPIView.get)
+    @condicional(estado_catalogo(Producto))
+    async def get(self, request, id_producto):
+        seleccion = seleccion_de(request, ProductoSerializer)
+        async def construir():
+            try:
+                producto = await seleccion.queryset(Producto.objects.all()).aget(pk=id_producto)
+            except Producto.DoesNotExist:
+                return None
+            return ProductoSerializer(producto, context={'seleccion': seleccion}).data
+        datos = await catalogo.aobtener(Producto, 'detalle', (id_producto, seleccion.clave()), construir)
+        if datos is None:
+            return Response({'message': 'El producto no existe'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(datos)
+
+    async def delete(self, request, id_producto):
+        try:
+            producto = await Producto.objects.aget(pk=id_producto)
+            await producto.adelete()
+            return Response({'mensaje': 'Producto eliminado exitosamente'}, status=status.HTTP_200_OK)
+        except Producto.DoesNotExist:
+            return Response({'message': 'El producto no existe'}, status=status.HTTP_404_NOT_FOUND)
+        except RestrictedError:
+            return Response({'error': 'No se puede eliminar el producto porque tiene elementos relacionados'}, status=status.HTTP_400_BAD_REQUEST)
+
+    @condicional(estado_catalogo(Producto))
+    async def put(self, request, id_producto):
+        try:
+            producto = await Producto.objects.aget(pk=id_producto)
+        except Producto.DoesNotExist:
+            return Response({'message': 'El producto no existe'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = ProductoSerializer(producto, data=request.data)
+        if await validar(serializer):
+            await guardar(serializer)
+            return Response({'mensaje': 'Producto actualizado exitosamente', 'datos': serializer.data}, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class ClienteAPIView(AsyncAPIView, views.ClienteAPIView):
+
+    @mismo_schema(views.ClienteAPIView.get)
+    @condicional(estado_pagina(Cliente, relacionado=Turno, relacion='cliente_id'))
+    async def get(self, request):
+        cliente = Cliente.objects.prefetch_related(prefetch_turnos('cliente_turno'))
+        return await listar(cliente, request, ClienteSerializer)
+
+    @mismo_schema(views.ClienteAPIView.post)
+    async def post(self, request):
+        serializer = ClienteSerializer(data=request.data)
+        if await validar(serializer):
+            await guardar(serializer)
+            respuesta = {'mensaje': 'Cliente creado exitosamente', 'datos': await serializar(serializer)}
+            return Response(respuesta, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class ClienteDetalleAPIView(AsyncAPIView, views.ClienteDetalleAPIView):
+
+    @mismo_schema(views.ClienteDetalleAPIView.get)
+    @condicional(estado_detalle(Cliente, Turno, 'cliente_id'))
+    async def get(self, request, id_cliente):
+        seleccion = seleccion_de(request, ClienteSerializer)
+        try:
+            cliente = await seleccion.queryset(Cliente.objects.prefetch_related(prefetch_turnos('cliente_turno'))).aget(pk=id_cliente)
+        except Cliente.DoesNotExist:
+            return Response({'error': 'Cliente no existente'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ClienteSerializer(cliente, context={'seleccion': seleccion}).data)
+
+    @condicional(estado_detalle(Cliente, Turno, 'cliente_id'))
+    async def put(self, request, id_cliente):
+        try:
+            cliente = await Cliente.objects.prefetch_related(prefetch_turnos('cliente_turno')).aget(pk=id_cliente)
+        except Cliente.DoesNotExist:
+            return Response({'message':'El cliente no existe'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = ClienteSerializer(cliente, data=request.data)
+        if await validar(serializer):
+            await guardar(serializer)
+            respuesta = {'mensaje':'Cliente actualizado exitosamente', 'datos': await serializar(serializer)}
+            return Response(respuesta, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    async def delete(self, request, id_cliente):
+        try:
+            cliente = await Cliente.objects.aget(pk=id_cliente)
+            await cliente.adelete()
+            return Response({'mensaje':'Cliente elminado exitosamente'}, status=status.HTTP_200_OK)
+        except Cliente.DoesNotExist:
+            return Response({'message':'El cliente no existe'}, status=status.HTTP_404_NOT_FOUND)
+        except RestrictedError:
+            return Response({'error':'No se puede eliminar el cliente porque tiene elementos relacionados'},status=status.HTTP_400_BAD_REQUEST)
+
+class EmpleadoAPIView(AsyncAPIView, views.EmpleadoAPIView):
+
+    @mismo_schema(views.EmpleadoAPIView.get)
+    @condicional(estado_pagina(Empleado, relacionado=Turno, relacion='empleado_id'))
+    async def get(self, request):
+        empleado = Empleado.objects.prefetch_related(prefetch_turnos('empleado_turno'))
+        return await listar(empleado, request, EmpleadoSerializer)
+
+    @mismo_schema(views.EmpleadoAPIView.post)
+    async def post(self, request):
+        serializer = EmpleadoSerializer(data=request.data)
+        if await validar(serializer):
+            await guardar(serializer)
+            respuesta = {'mensaje':'Empleado creado exitosamente','datos': await serializar(serializer)}
+            return Response(respuesta, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class EmpleadoDetalleAPIView(AsyncAPIView, views.EmpleadoDetalleAPIView):
+
+    @mismo_schema(views.EmpleadoDetalleAPIView.get)
+    @condicional(estado_detalle(Empleado, Turno, 'empleado_id'))
+    async def get(self, request, id_empleado):
+        seleccion = seleccion_de(request, EmpleadoSerializer)
+        try:
+            empleado = await seleccion.queryset(Empleado.objects.prefetch_related(prefetch_turnos('empleado_turno'))).aget(pk=id_empleado)
+        except Empleado.DoesNotExist:
+            return Response({'error': 'Empleado no existente'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(EmpleadoSerializer(empleado, context={'seleccion': seleccion}).data)
+
+    @condicional(estado_detalle(Empleado, Turno, 'empleado_id'))
+    async def put(self, request, id_empleado):
+        try:
+            empleado = await Empleado.objects.prefetch_related(prefetch_turnos('empleado_turno')).aget(pk=id_empleado)
+        except Empleado.DoesNotExist:
+            return Response({'message': 'El empleado no existe'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = EmpleadoSerializer(empleado, data=request.data)
+        if await validar(serializer):
+            await guardar(serializer)
+            return Response({'mensaje': 'Empleado actualizado exitosamente', 'datos': await serializar(serializer)}, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    async def delete(self, request, id_empleado):
+        try:
+            empleado = await Empleado.objects.aget(pk=id_empleado)
+            await empleado.adelete()
+            return Response({'mensaje': 'Empleado eliminado exitosamente'}, status=status.HTTP_200_OK)
+        except Empleado.DoesNotExist:
+            return Response({'message': 'El empleado no existe'}, status=status.HTTP_404_NOT_FOUND)
+        except RestrictedError:
+            return Response({'error': 'No se puede eliminar el empleado porque tiene elementos relacionados'}, status=status.HTTP_400_BAD_REQUEST)
+
+class TurnoAPIView(AsyncAPIView, views.TurnoAPIView):
+
+    @mismo_schema(views.TurnoAPIView.get)
+    @condicional(estado_pagina(Turno, filtrar_turnos, PaginacionTurnos))
+    async def get(self, request):
+        turnos, orden = filtrar_turnos(Turno.objects.all(), request.query_params)
+        return await listar(turnos, request, TurnoSerializer, PaginacionTurnos(orden))
+
+    @mismo_schema(views.TurnoAPIView.post)
+    async def post(self, request):
+        serializer = TurnoSerializer(data=request.data)
+        if await validar(serializer):
+            # La reserva necesita una transaccion, que el ORM async no soporta
+            return await sync_to_async(views.reservar_turno)(serializer, 'Turno creado exitosamente', status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class TurnoDetalleAPIView(AsyncAPIView, views.TurnoDetalleAPIView):
+
+    @mismo_schema(views.TurnoDetalleAPIView.get)
+    @condicional(estado_detalle(Turno))
+    async def get(self, request, id_turno):
+        seleccion = seleccion_de(request, TurnoSerializer)
+        try:
+            turno = await seleccion.queryset(Turno.objects.all()).aget(pk=id_turno)
+        except Turno.DoesNotExist:
+            return Response({'error': 'El turno no existe'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(TurnoSerializer(turno, context={'seleccion': seleccion}).data)
+
+    @condicional(estado_detalle(Turno))
+    async def put(self, request, id_turno):
+        try:
+            turno = await Turno.objects.aget(pk=id_turno)
+        except Turno.DoesNotExist:
+            return Response({'message': 'El turno no existe'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = TurnoSerializer(turno, data=request.data)
+        if await validar(serializer):
+            return await sync_to_async(views.reservar_turno)(serializer, 'Turno actualizado exitosamente', status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    async def delete(self, request, id_turno):
+        try:
+            turno = await Turno.objects.aget(pk=id_turno)
+            await turno.adelete()
+            return Response({'mensaje': 'Turno eliminado exitosamente'}, status=status.HTTP_200_OK)
+        except Turno.DoesNotExist:
+            return Response({'message': 'El turno no existe'}, status=status.HTTP_404_NOT_FOUND)
+        except RestrictedError:
+            return Response({'error': 'No se puede eliminar el turno porque tiene elementos relacionados'}, status=status.HTTP_400_BAD_REQUEST)
+
+class ServicioAPIView(AsyncAPIView, views.ServicioAPIView):
+
+    @mismo_schema(views.ServicioAPIView.get)
+    @condicional(estado_catalogo(Servicio))
+    async def get(self, request):
+        async def construir():
+            return (await listar(Servicio.objects.all(), request, ServicioSerializer)).data
+        return Response(await catalogo.aobtener(Servicio, 'lista', request.build_absolute_uri(), construir))
+
+    @mismo_schema(views.ServicioAPIView.post)
+    async def post(self, request):
+        serializer = ServicioSerializer(data=request.data)
+        if await validar(serializer):
+            await guardar(serializer)
+            return Response({'mensaje': 'Servicio creado exitosamente', 'datos': serializer.data}, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class ServicioDetalleAPIView(AsyncAPIView, views.ServicioDetalleAPIView):
+
+    @mismo_schema(views.ServicioDetalleAPIView.get)
+    @condicional(estado_catalogo(Servicio))
+    async def get(self, request, id_servicio):
+        seleccion = seleccion_de(request, ServicioSerializer)
+        async def construir():
+            try:
+                servicio = await seleccion.queryset(Servicio.objects.all()).aget(pk=id_servicio)
+            except Servicio.DoesNotExist:
+                return None
+            return ServicioSerializer(servicio, context={'seleccion': seleccion}).data
+        datos = await catalogo.aobtener(Servicio, 'detalle', (id_servicio, seleccion.clave()), construir)
+        if datos is None:
+            return Response({'error': 'El servicio no existe'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(datos)
+
+    @condicional(estado_catalogo(Servicio))
+    async def put(self, request, id_servicio):
+        try:
+            servicio = await Servicio.objects.aget(pk=id_servicio)
+        except Servicio.DoesNotExist:
+            return Response({'message': 'El servicio no existe'}, status=status.HTTP_404_NOT_FOUND)
+        serializer = ServicioSerializer(servicio, data=request.data)
+        if await validar(serializer):
+            await guardar(serializer)
+            return Response({'mensaje': 'Servicio actualizado exitosamente', 'datos': serializer.data}, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    async def delete(self, request, id_servicio):
+        try:
+            servicio = await Servicio.objects.aget(pk=id_servicio)
+            await servicio.adelete()
+            return Response({'mensaje': 'Servicio eliminado exitosamente'}, status=status.HTTP_200_OK)
+        except Servicio.DoesNotExist:
+            return Response({'message': 'El servicio no existe'}, status=status.HTTP_404_NOT_FOUND)
+        except RestrictedError:
+            return Response({'error': 'No se puede eliminar el servicio porque tiene elementos relacionados'}, status=status.HTTP_400_BAD_REQUEST)
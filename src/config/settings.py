@@ -46,6 +46,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metricas.MetricasMiddleware',
+    'api.compresion.CompresionMiddleware',
+    'api.admision.AdmisionMiddleware',
+    'api.replicas.ReplicasMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -88,7 +92,32 @@ DATABASES = {
         'PORT': os.getenv('DB_PORT'),
     }
 }
- 
+
+# Replicas de solo lectura: DB_REPLICA_HOSTS=host1,host2 (mismo nombre, usuario y clave que la primaria).
+# Las lecturas de las peticiones GET van a una replica; ver api/replicas.py
+REPLICAS = []
+for numero, host in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    DATABASES[f'replica{numero}'] = {**DATABASES['default'], 'HOST': host.strip(), 'TEST': {'MIRROR': 'default'}}
+    REPLICAS.append(f'replica{numero}')
+if REPLICAS:
+    DATABASE_ROUTERS = ['api.replicas.RouterReplicas']
+
+# Segundos que un cliente sigue leyendo de la primaria despues de escribir
+REPLICAS_PRIMARIA_SEGUNDOS = int(os.getenv('REPLICAS_PRIMARIA_SEGUNDOS', '5'))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'donalfredo',
+    }
+}
+
+# Segundos que se guardan las respuestas del catalogo de servicios y productos (api/catalogo.py)
+CATALOGO_CACHE_TIMEOUT = 300
 
 
 # Password validation
@@ -135,13 +164,71 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES':[
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication'
+        'api.autenticacion.JWTAuthenticationCacheada'
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.admision.CubetaPorUsuario',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.json_rapido.JSONRendererRapido',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.json_rapido.JSONParserRapido',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# JSON con orjson, con la misma salida que el JSONRenderer de DRF (api/json_rapido.py); sin orjson
+# instalado o en 0 se usa el de DRF
+JSON_RAPIDO = os.getenv('JSON_RAPIDO', '1') == '1'
+
+# Compresion br/gzip segun Accept-Encoding de las respuestas JSON, NDJSON y CSV (api/compresion.py)
+COMPRESION_HABILITADA = os.getenv('COMPRESION_HABILITADA', '1') == '1'
+COMPRESION_MINIMO = 1024
+COMPRESION_NIVEL = {'br': 4, 'gzip': 6}
+
+# Control de admision (api/admision.py): peticiones simultaneas por proceso para cada clase de
+# endpoint (primer segmento de la ruta), lecturas y escrituras por separado. Las que exceden el
+# limite esperan hasta ADMISION_ESPERA segundos (a lo sumo ADMISION_COLA) y reciben 503
+ADMISION_HABILITADA = os.getenv('ADMISION_HABILITADA', '1') == '1'
+ADMISION_CLASES = ('turnos', 'clientes', 'empleados', 'productos', 'servicios', 'analitica', 'api', 'admin')
+ADMISION_CONCURRENCIA = {'lectura': 16, 'escritura': 4}
+ADMISION_CONCURRENCIA_POR_CLASE = {'turnos': {'lectura': 12, 'escritura': 6}}
+ADMISION_COLA = 64
+ADMISION_ESPERA = 0.5
+# Token bucket por usuario en CACHES: (capacidad, tokens por segundo); None no limita (429 al agotarse)
+ADMISION_CUBETA = {'lectura': (300, 50), 'escritura': (60, 10)}
+
+# El usuario del JWT se resuelve desde una cache en memoria por proceso (api/autenticacion.py):
+# hasta JWT_USUARIOS_MAX usuarios durante JWT_USUARIOS_TTL segundos; 0 consulta la base en cada peticion
+JWT_USUARIOS_TTL = int(os.getenv('JWT_USUARIOS_TTL', '60'))
+JWT_USUARIOS_MAX = 10000
+# Rechaza los tokens revocados con POST api/token/revocar (la lista se guarda en CACHES)
+JWT_REVOCACION = os.getenv('JWT_REVOCACION') == '1'
+
+# Esquema OpenAPI que sirven /openapi.json, /swagger/ y /redoc/; se genera en el deploy con
+# `manage.py generar_esquema` para que los workers no carguen drf_yasg (api/documentacion.py)
+OPENAPI_ESQUEMA = os.getenv('OPENAPI_ESQUEMA', BASE_DIR / 'openapi.json')
+
+# Paginacion por cursor de los listados (api/pagination.py)
+PAGINACION_PAGE_SIZE = 10
+PAGINACION_MAX_PAGE_SIZE = 100
+
+# Los listados se arman desde .values() sin instanciar modelos ni serializers (api/representacion.py)
+API_LISTADOS_RAPIDOS = os.getenv('API_LISTADOS_RAPIDOS', '1') == '1'
+
+# Sirve las vistas CRUD con handlers async (api/views_async.py); config/asgi.py lo activa por defecto
+API_VISTAS_ASYNC = os.getenv('API_VISTAS_ASYNC') == '1'
+
+# Server-Timing y /metrics (api/metricas.py). Si METRICAS_TOKEN esta definido, /metrics exige "Bearer <token>"
+METRICAS_HABILITADAS = os.getenv('METRICAS_HABILITADAS', '1') == '1'
+METRICAS_TOKEN = os.getenv('METRICAS_TOKEN')
+
 SWAGGER_SETTINGS ={
     'SECURITY_DEFINITIONS':{
         'Bearer':{
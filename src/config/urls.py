@@ -17,26 +17,17 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-from rest_framework.permissions import AllowAny
 
+from api.views import RevocarTokenAPIView, esquema_openapi, redoc, swagger
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="API de Don Alfredo",
-        default_version='v1',
-        description='Documentacion general del proyecto API REST de DON ALFREDO'
-        ),
-    public=True,
-    permission_classes=[AllowAny]
-)
 
 urlpatterns = [
-    path('swagger/', schema_view.with_ui('swagger',cache_timeout=0)),
-    path('redoc/',schema_view.with_ui('redoc',cache_timeout=0)),
+    path('swagger/', swagger),
+    path('redoc/', redoc),
+    path('openapi.json', esquema_openapi, name='openapi'),
     path('api/token/', TokenObtainPairView.as_view()),
     path('api/token/refresh', TokenRefreshView.as_view()),
+    path('api/token/revocar', RevocarTokenAPIView.as_view()),
     path('admin/', admin.site.urls),
     path('',include('api.urls'))
 ]